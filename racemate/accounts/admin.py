@@ -1,28 +1,31 @@
 # accounts/admin.py
 from django.contrib import admin
-from .models import Registration
+from .models import Registration, OutboundEmail
+from .search import fts_available, search_registrations
 import csv
 from django.http import HttpResponse
+from django.shortcuts import redirect
 from django.utils.encoding import smart_str
+from django.utils import timezone
 import re
+from django.db.models import Q
 
-@admin.action(description="Export selected to CSV")
-def export_to_csv(modeladmin, request, queryset):
-    meta = modeladmin.model._meta
+def registration_rows(queryset):
+    """
+    Header plus one CSV row per registration: every concrete field, the
+    district_fk name and joined many-to-many values (also used by export jobs).
+    """
+    meta = Registration._meta
     # include concrete field names (legacy text 'district' is included here)
     field_names = [f.name for f in meta.fields]
     # include many-to-many names separately so we can join them
     m2m_names = [f.name for f in meta.many_to_many]
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename={meta.verbose_name_plural}.csv'
-    writer = csv.writer(response)
-
     # Write header: keep raw field names, but add a friendly column for district_fk name
-    header = field_names + ['district_fk_name'] + m2m_names
-    writer.writerow(header)
+    yield field_names + ['district_fk_name'] + m2m_names
 
-    for obj in queryset:
+    queryset = queryset.select_related('district_fk', 'state').prefetch_related(*m2m_names)
+    for obj in queryset.iterator(chunk_size=2000):
         row = []
         for field in field_names:
             value = getattr(obj, field)
@@ -35,9 +38,28 @@ def export_to_csv(modeladmin, request, queryset):
             related_qs = getattr(obj, m2m).all()
             names = [smart_str(x) for x in related_qs]
             row.append(", ".join(names))
-        writer.writerow(row)
+        yield row
+
+
+@admin.action(description="Export selected to CSV")
+def export_to_csv(modeladmin, request, queryset):
+    meta = modeladmin.model._meta
+    response = HttpResponse(content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename={meta.verbose_name_plural}.csv'
+    writer = csv.writer(response)
+    writer.writerows(registration_rows(queryset))
     return response
 
+
+@admin.action(description="Export selected to CSV (background, gzip)")
+def export_to_csv_background(modeladmin, request, queryset):
+    from app_admin.exports import create_export_job, pk_runs
+
+    ids = pk_runs(queryset.order_by('pk').values_list('pk', flat=True).iterator())
+    job = create_export_job('registrations', f"ids={ids}", user=request.user)
+    modeladmin.message_user(request, f"Export job #{job.pk} queued ({job.rows_total} rows).")
+    return redirect('export_jobs')
+
 @admin.register(Registration)
 class RegistrationAdmin(admin.ModelAdmin):
     list_display = (
@@ -57,12 +79,13 @@ class RegistrationAdmin(admin.ModelAdmin):
         'aadhar_number',
         'district',              # legacy text
         'district_fk__name',     # FK name search
+        'bib_id',
     )
-    list_filter = ('profession', 'state', 'created_at')
-    readonly_fields = ('created_at',)
+    list_filter = ('profession', 'state', 'age_band', 'created_at')
+    readonly_fields = ('created_at', 'birth_year', 'age_band')
     ordering = ('-created_at',)
     list_per_page = 25
-    actions = [export_to_csv]
+    actions = [export_to_csv, export_to_csv_background]
 
     def get_queryset(self, request):
         """
@@ -72,6 +95,26 @@ class RegistrationAdmin(admin.ModelAdmin):
         # select_related for FK, prefetch for M2M
         return qs.select_related('district_fk', 'state').prefetch_related('events')
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Full bibs are answered from the indexed bib columns, everything else
+        from the registration_search FTS index, instead of LIKE scans. A short
+        number may be a bib's trailing counter as well as part of a name or
+        mobile number, so it matches either.
+        """
+        term = (search_term or '').strip().upper()
+        if term.count('-') >= 3:
+            return queryset.filter(Q(bib_public=term) | Q(bib_id=term)), False
+        if term and fts_available():
+            # full-text index over name, father's name, mobile, bib and district
+            results, may_have_duplicates = search_registrations(queryset, search_term), False
+        else:
+            results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if term.isdigit() and len(term) <= 4:
+            results = queryset.filter(Q(bib_seq=int(term)) | Q(pk__in=results.values('pk')))
+            may_have_duplicates = False
+        return results, may_have_duplicates
+
     def events_list(self, obj):
         """
         Safe, short representation of related events for the admin list view.
@@ -98,3 +141,18 @@ class RegistrationAdmin(admin.ModelAdmin):
     get_district.short_description = "District"
     get_district.admin_order_field = 'district_fk__name'
 
+
+@admin.action(description="Retry selected emails")
+def retry_emails(modeladmin, request, queryset):
+    queryset.exclude(status=OutboundEmail.STATUS_SENT).update(
+        status=OutboundEmail.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now()
+    )
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'to_email', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('to_email', 'subject')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+    raw_id_fields = ('registration',)
+    actions = [retry_emails]
@@ -1,6 +1,23 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_triggers(sender, using='default', **kwargs):
+    from .search import ensure_triggers
+    ensure_triggers(using)
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        # signal handlers keeping RegistrationReadModel in sync
+        from . import signals  # noqa: F401
+
+        # resolve where Registration keeps its events once, at startup
+        from .projections import event_layout
+        event_layout()
+
+        # registration_search sync triggers (lost whenever SQLite rebuilds the read model table)
+        post_migrate.connect(ensure_search_triggers, sender=self, dispatch_uid='accounts_search_triggers')
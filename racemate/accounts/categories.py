@@ -0,0 +1,154 @@
+# accounts/categories.py
+"""
+Category rulebooks (app_admin.CategoryRule) compiled for fast lookups.
+
+Each rulebook (the default one, plus one per event that has rules of its own)
+is compiled once into sorted interval bounds, so finding the category for an
+age is a bisect instead of a walk through if/elif branches. Compiled
+rulebooks are cached in-process; saving or deleting a rule clears the cache
+(see accounts.signals), and other processes pick the change up after
+CATEGORY_RULES_CACHE_SECONDS.
+
+recategorize() applies the same rules to a whole queryset in SQL, as one
+CASE over date_of_birth per rulebook.
+"""
+import time
+from bisect import bisect_right
+from threading import Lock
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Min, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import Registration, age_reference_date, dob_bounds
+
+CATEGORY_UNSPECIFIED = "Unspecified"
+CATEGORY_OTHER = "Other / Not categorized"
+
+# Default rulebook when no event-less CategoryRule rows exist: (min age, max age, category)
+DEFAULT_CATEGORY_RULES = [
+    (12, 14, "Youth Boys & Youth Girls (12-14)"),
+    (15, 16, "Sub-Junior Boys & Sub-Junior Girls (15 & 16)"),
+    (17, 18, "Junior Boys & Junior Girls (17 & 18)"),
+    (19, 22, "Men under-23 (19-22)"),
+    (23, 35, "Men Elite & Women Elite (19 & above)"),
+    (36, 45, "Masters Men 36 to 45 years"),
+    (46, 55, "Masters Men 46 to 55 years"),
+    (56, None, "Masters Men 56+"),
+]
+
+
+class Rulebook:
+    """Non-overlapping age intervals sorted by lower bound, searched with bisect."""
+    __slots__ = ('rules', 'lows')
+
+    def __init__(self, rules):
+        # a missing lower bound sorts first
+        self.rules = sorted(rules, key=lambda r: -1 if r[0] is None else r[0])
+        self.lows = [-1 if low is None else low for low, _, _ in self.rules]
+
+    def category_for(self, age):
+        if age is None:
+            return CATEGORY_UNSPECIFIED
+        i = bisect_right(self.lows, age) - 1
+        if i >= 0:
+            _, high, category = self.rules[i]
+            if high is None or age <= high:
+                return category
+        return CATEGORY_OTHER
+
+    def case(self, on_date):
+        """The rulebook as a SQL CASE over date_of_birth on `on_date`."""
+        whens = [
+            # isnull=False keeps the condition non-empty for an open-ended (None, None) rule
+            models.When(Q(date_of_birth__isnull=False, **dob_bounds(low, high, on_date)), then=models.Value(category))
+            for low, high, category in self.rules
+        ]
+        return models.Case(
+            models.When(date_of_birth__isnull=True, then=models.Value(CATEGORY_UNSPECIFIED)),
+            *whens,
+            default=models.Value(CATEGORY_OTHER),
+            output_field=models.CharField(),
+        )
+
+
+_cache = {'books': None, 'loaded_at': 0.0}
+_lock = Lock()
+
+
+def rulebooks():
+    """{event id or None (default): Rulebook}, compiled once and cached in-process."""
+    books = _cache['books']
+    ttl = getattr(settings, 'CATEGORY_RULES_CACHE_SECONDS', 300)
+    if books is not None and time.monotonic() - _cache['loaded_at'] < ttl:
+        return books
+
+    from app_admin.models import CategoryRule
+
+    with _lock:
+        grouped = {}
+        for event_id, low, high, category in CategoryRule.objects.values_list(
+                'event_id', 'min_age', 'max_age', 'category'):
+            grouped.setdefault(event_id, []).append((low, high, category))
+        grouped.setdefault(None, DEFAULT_CATEGORY_RULES)
+        books = {event_id: Rulebook(rules) for event_id, rules in grouped.items()}
+        _cache['books'], _cache['loaded_at'] = books, time.monotonic()
+    return books
+
+
+def clear_rulebooks():
+    _cache['books'] = None
+
+
+def rulebook_event_id(registration):
+    """
+    The event whose rulebook applies to `registration`: its lowest-id event
+    that has rules of its own, else None (the default rulebook).
+    """
+    event_ids = [pk for pk in rulebooks() if pk is not None]
+    if not event_ids or registration.pk is None:
+        return None
+    return (registration.events.filter(pk__in=event_ids)
+            .order_by('pk').values_list('pk', flat=True).first())
+
+
+def category_for_age(age, event_id=None):
+    books = rulebooks()
+    return books.get(event_id, books[None]).category_for(age)
+
+
+def recategorize(queryset=None, on_date=None, batch_size=1000):
+    """
+    Recompute Registration.category for `queryset` (default: all) in SQL, one
+    UPDATE per rulebook, touching only rows whose category changes. Returns the
+    pks of the rows updated so callers can refresh read rows / the change log.
+    """
+    if queryset is None:
+        queryset = Registration.objects.all()
+    on_date = on_date or age_reference_date()
+    books = rulebooks()
+    event_ids = [pk for pk in books if pk is not None]
+
+    through = Registration.events.through
+    ruled = through.objects.filter(dimeventcategory_id__in=event_ids)
+    # the rulebook each registration follows: its lowest-id event with rules
+    rulebook_of = (ruled.filter(registration_id=OuterRef('pk')).values('registration_id')
+                   .annotate(book=Min('dimeventcategory_id')).values('book')[:1])
+
+    changed = []
+    for event_id, book in books.items():
+        rows = queryset.alias(book=Subquery(rulebook_of)) if event_ids else queryset
+        if event_ids:
+            rows = rows.filter(book__isnull=True) if event_id is None else rows.filter(book=event_id)
+        new_category = book.case(on_date)
+        stale = rows.alias(new_category=new_category).filter(
+            Q(category__isnull=True) | ~Q(category=models.F('new_category'))
+        )
+        pks = list(stale.values_list('pk', flat=True))
+        for start in range(0, len(pks), batch_size):
+            Registration.objects.filter(pk__in=pks[start:start + batch_size]).update(
+                category=new_category, updated_at=timezone.now(),
+            )
+        changed.extend(pks)
+    return changed
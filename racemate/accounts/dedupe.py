@@ -0,0 +1,85 @@
+# accounts/dedupe.py
+"""
+Duplicate registrations by mobile number and Aadhaar.
+
+Both checks run on the indexed lookup columns Registration.mobile_normalized
+and Registration.aadhar_hash: a single registrant is an index seek, and the
+bulk report is one GROUP BY per key (HAVING COUNT > 1) plus one fetch of the
+members of those groups, never a pairwise comparison in Python.
+"""
+from itertools import islice
+
+from django.db.models import Count
+
+from .models import Registration, aadhar_digest, normalize_mobile
+
+# (kind, lookup column)
+DUPLICATE_KEYS = [
+    ('mobile', 'mobile_normalized'),
+    ('aadhar', 'aadhar_hash'),
+]
+
+
+def duplicate_check(mobile=None, aadhar=None, exclude_pk=None):
+    """
+    {'mobile': bool, 'aadhar': bool}: whether another registration already
+    uses this mobile number / Aadhaar. Only keys that were given are returned.
+    """
+    qs = Registration.objects.all()
+    if exclude_pk:
+        qs = qs.exclude(pk=exclude_pk)
+    out = {}
+    if mobile is not None:
+        key = normalize_mobile(mobile)
+        # too short to be a number yet (user still typing)
+        out['mobile'] = len(key) >= 10 and qs.filter(mobile_normalized=key).exists()
+    if aadhar is not None:
+        digits = ''.join(ch for ch in str(aadhar) if ch.isdigit())
+        out['aadhar'] = len(digits) == 12 and qs.filter(aadhar_hash=aadhar_digest(digits)).exists()
+    return out
+
+
+def duplicate_groups(column):
+    """Values of `column` shared by more than one registration, with their counts."""
+    return (Registration.objects.exclude(**{column: ''}).order_by()
+            .values(column).annotate(n=Count('id')).filter(n__gt=1).values_list(column, 'n'))
+
+
+def dedupe_rows(batch_size=500):
+    """
+    Yield one row per registration in a duplicate group:
+    (kind, group key, group size, id, name, mobile, aadhaar last 4, bib, created_at).
+    Aadhaar groups are keyed by hash; only the last four digits are reported.
+    """
+    for kind, column in DUPLICATE_KEYS:
+        groups = iter(duplicate_groups(column))
+        while True:
+            batch = dict(islice(groups, batch_size))
+            if not batch:
+                break
+            members = (Registration.objects.filter(**{f'{column}__in': list(batch)})
+                       .order_by(column, 'created_at', 'pk')
+                       .values_list(column, 'pk', 'name', 'mobile_number', 'aadhar_number', 'bib_id', 'created_at'))
+            for key, pk, name, mobile, aadhar, bib_id, created_at in members:
+                label = key if kind == 'mobile' else key[:12]
+                yield (kind, label, batch[key], pk, name, mobile, (aadhar or '')[-4:], bib_id or '', created_at)
+
+
+def rebuild_keys(batch_size=1000):
+    """Recompute mobile_normalized / aadhar_hash for every registration. Returns rows changed."""
+    changed = 0
+    rows = Registration.objects.order_by().only('id', 'mobile_number', 'aadhar_number', 'mobile_normalized', 'aadhar_hash')
+    batch = []
+    for reg in rows.iterator(chunk_size=batch_size):
+        mobile, aadhar = normalize_mobile(reg.mobile_number), aadhar_digest(reg.aadhar_number)
+        if (reg.mobile_normalized, reg.aadhar_hash) != (mobile, aadhar):
+            reg.mobile_normalized, reg.aadhar_hash = mobile, aadhar
+            batch.append(reg)
+        if len(batch) >= batch_size:
+            Registration.objects.bulk_update(batch, ['mobile_normalized', 'aadhar_hash'])
+            changed += len(batch)
+            batch = []
+    if batch:
+        Registration.objects.bulk_update(batch, ['mobile_normalized', 'aadhar_hash'])
+        changed += len(batch)
+    return changed
@@ -5,6 +5,7 @@ from django.utils import timezone
 from django.core.exceptions import ValidationError
 
 from .models import Registration
+from app_admin import refdata
 from app_admin.models import DimState, DimDistrict, DimEventCategory
 
 
@@ -52,6 +53,7 @@ class RegistrationForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
 
         # Populate districts depending on state (POST / instance / initial)
+        state_id = None
         if self.data.get('state'):
             try:
                 state_id = int(self.data.get('state'))
@@ -59,14 +61,24 @@ class RegistrationForm(forms.ModelForm):
             except (ValueError, TypeError):
                 self.fields['district_fk'].queryset = DimDistrict.objects.none()
         elif self.instance and getattr(self.instance, 'district_fk', None):
+            state_id = self.instance.state_id
             self.fields['district_fk'].queryset = DimDistrict.objects.filter(state=self.instance.state).order_by('name')
         elif initial_state_id:
+            state_id = initial_state_id
             self.fields['district_fk'].queryset = DimDistrict.objects.filter(state_id=initial_state_id).order_by('name')
         else:
             self.fields['district_fk'].queryset = DimDistrict.objects.none()
 
-        # Refresh events queryset (useful if you add event categories from admin while dev server is running)
-        self.fields['events'].queryset = DimEventCategory.objects.all().order_by('name')
+        # Rendered choices come from the cached reference data (no queries,
+        # no per-option lookups of related names); the querysets above only
+        # validate the submitted ids. Event categories added in the admin
+        # show up on the next render.
+        ref = refdata.get()
+        self.fields['state'].choices = [('', self.fields['state'].empty_label)] + ref.state_choices()
+        self.fields['district_fk'].choices = [('', self.fields['district_fk'].empty_label)] + (
+            ref.district_choices(state_id) if state_id is not None else []
+        )
+        self.fields['events'].choices = ref.event_choices()
 
     def clean_date_of_birth(self):
         dob = self.cleaned_data.get('date_of_birth')
@@ -0,0 +1,119 @@
+# accounts/management/commands/bench_rows.py
+import gc
+import time
+import tracemalloc
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts import projections
+from accounts.models import Registration, RegistrationReadModel
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _legacy_start_list(qs):
+    """
+    The start list as it was built before accounts.projections: full model
+    instances with relations prefetched, display attributes attached per row.
+    """
+    registrations = list(qs.select_related('district_fk', 'state').prefetch_related('events'))
+    today = date.today()
+    for reg in registrations:
+        age_val = reg.age_on(today)
+        reg.age_display = str(age_val) if age_val is not None else '—'
+        names = [getattr(ev, 'name', None) or getattr(ev, 'title', None) or str(ev) for ev in reg.events.all()]
+        reg.event_display = ', '.join(names) if names else '—'
+    return registrations
+
+
+def _projected_start_list(qs):
+    read_rows = RegistrationReadModel.objects.filter(registration__in=qs.values('pk'))
+    return list(projections.start_list_rows(read_rows))
+
+
+class Command(BaseCommand):
+    help = ("Compare time and peak memory of the start list built from full model "
+            "instances (before) and from row projections (after).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000,
+                            help="Rows to measure (default 10000).")
+        parser.add_argument('--synthetic', action='store_true',
+                            help="Insert --rows throwaway registrations (rolled back afterwards) "
+                                 "instead of reading existing ones.")
+        parser.add_argument('--repeat', type=int, default=3,
+                            help="Runs per variant; the best time is reported.")
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        try:
+            with transaction.atomic():
+                if options['synthetic']:
+                    self._insert_synthetic(rows)
+                qs = Registration.objects.order_by('pk')
+                pks = list(qs.values_list('pk', flat=True)[:rows])
+                n = len(pks)
+                if not n:
+                    self.stdout.write("No registrations to measure (try --synthetic).")
+                    return
+                qs = qs.filter(pk__range=(pks[0], pks[-1]))
+                for label, fn in (('before (model instances)', _legacy_start_list),
+                                  ('after (projection rows)', _projected_start_list)):
+                    seconds, peak = self._measure(fn, qs, options['repeat'])
+                    scale = 10000 / n
+                    self.stdout.write(
+                        f"{label:28s} {n} rows: {seconds * 1000:8.1f} ms, peak {peak / 1024 / 1024:6.1f} MiB "
+                        f"(per 10k: {seconds * scale * 1000:.1f} ms, {peak * scale / 1024 / 1024:.1f} MiB)"
+                    )
+                if options['synthetic']:
+                    raise _Rollback
+        except _Rollback:
+            pass
+
+    def _measure(self, fn, qs, repeat):
+        """Best wall time over `repeat` runs, then peak memory of one traced run."""
+        best_time = None
+        for _ in range(max(1, repeat)):
+            gc.collect()
+            started = time.perf_counter()
+            result = fn(qs)
+            elapsed = time.perf_counter() - started
+            del result
+            best_time = elapsed if best_time is None else min(best_time, elapsed)
+
+        # tracemalloc slows Python down a lot, so memory is measured separately
+        gc.collect()
+        tracemalloc.start()
+        result = fn(qs)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+        return best_time, peak
+
+    def _insert_synthetic(self, rows):
+        from app_admin.models import DimEventCategory
+        events = list(DimEventCategory.objects.all()[:3])
+        batch = [
+            Registration(
+                name=f"Bench Rider {i}",
+                gender=('male', 'female', 'other')[i % 3],
+                date_of_birth=date(1960 + i % 50, 1 + i % 12, 1 + i % 28),
+                address="Synthetic address line for benchmarking " * 4,
+                bib_id=f"BENCH-{i:07d}",
+                bib_public=f"B{i:07d}",
+            )
+            for i in range(rows)
+        ]
+        created = Registration.objects.bulk_create(batch, batch_size=1000)
+        if events:
+            Through = Registration.events.through
+            Through.objects.bulk_create([
+                Through(registration_id=reg.pk, dimeventcategory_id=events[i % len(events)].pk)
+                for i, reg in enumerate(created)
+            ], batch_size=1000)
+        # bulk_create sends no signals
+        RegistrationReadModel.refresh(Registration.objects.filter(pk__in=[reg.pk for reg in created]))
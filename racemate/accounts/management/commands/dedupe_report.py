@@ -0,0 +1,40 @@
+# accounts/management/commands/dedupe_report.py
+import csv
+
+from django.core.management.base import BaseCommand
+
+from accounts.dedupe import dedupe_rows, rebuild_keys
+
+HEADER = ['Match on', 'Key', 'Group size', 'Registration ID', 'Name', 'Mobile', 'Aadhaar (last 4)', 'Bib', 'Registered at']
+
+
+class Command(BaseCommand):
+    help = ("CSV of registrations sharing a mobile number or Aadhaar, one row per "
+            "registration, grouped by the shared key.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', help="Write the CSV here instead of stdout.")
+        parser.add_argument('--rebuild-keys', action='store_true',
+                            help="First recompute the normalized mobile / Aadhaar hash columns "
+                                 "(after changing PHONE_DEFAULT_COUNTRY_CODE or AADHAAR_HASH_KEY).")
+
+    def handle(self, *args, **options):
+        if options['rebuild_keys']:
+            changed = rebuild_keys()
+            self.stderr.write(f"Rebuilt duplicate keys of {changed} registrations.")
+
+        out = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else self.stdout
+        try:
+            writer = csv.writer(out)
+            writer.writerow(HEADER)
+            rows = 0
+            for kind, key, size, pk, name, mobile, aadhar_last4, bib_id, created_at in dedupe_rows():
+                writer.writerow([
+                    kind, key, size, pk, name, mobile, aadhar_last4, bib_id,
+                    created_at.strftime('%Y-%m-%d %H:%M') if created_at else '',
+                ])
+                rows += 1
+        finally:
+            if out is not self.stdout:
+                out.close()
+        self.stderr.write(f"{rows} registrations in duplicate groups.")
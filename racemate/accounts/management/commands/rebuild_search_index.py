@@ -0,0 +1,17 @@
+# accounts/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from accounts.search import ensure_triggers, fts_available, rebuild
+
+
+class Command(BaseCommand):
+    help = ("Repopulate the registration_search full-text index from the read rows "
+            "(run after refresh_read_models or a restore). SQLite only.")
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write("No registration_search index on this database; nothing to do.")
+            return
+        ensure_triggers()
+        indexed = rebuild()
+        self.stdout.write(f"Indexed {indexed} registrations.")
@@ -0,0 +1,31 @@
+# accounts/management/commands/recategorize.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.categories import recategorize
+from accounts.models import Registration, RegistrationReadModel, age_reference_date
+from app_admin import rollups
+from app_admin.models import ChangeLogEntry
+
+
+class Command(BaseCommand):
+    help = ("Recompute stored registration categories from the category rulebooks in SQL. "
+            "Run after editing CategoryRule rows or changing EVENT_DATE.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Registrations updated per statement (default 1000).")
+
+    def handle(self, *args, **options):
+        on_date = age_reference_date()
+        size = max(1, options['batch_size'])
+        with transaction.atomic():
+            pks = recategorize(on_date=on_date, batch_size=size)
+            for start in range(0, len(pks), size):
+                chunk = pks[start:start + size]
+                RegistrationReadModel.refresh(Registration.objects.filter(pk__in=chunk))
+                ChangeLogEntry.record_many(Registration, chunk, ChangeLogEntry.ACTION_UPDATE)
+            if pks:
+                # categories moved between rollup cells
+                rollups.rebuild()
+        self.stdout.write(f"Updated the category of {len(pks)} registrations (as of {on_date}).")
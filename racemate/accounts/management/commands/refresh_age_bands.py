@@ -0,0 +1,40 @@
+# accounts/management/commands/refresh_age_bands.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+
+from accounts.models import Registration, RegistrationReadModel, age_band_expression, age_reference_date
+from app_admin import rollups, summary_cache
+from app_admin.models import ChangeLogEntry
+
+
+class Command(BaseCommand):
+    help = ("Recompute stored birth years and age bands in SQL. Run after changing "
+            "EVENT_DATE, or daily when EVENT_DATE is unset (bands are then relative to today).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Registrations updated per transaction (default 1000).")
+
+    def handle(self, *args, **options):
+        on_date = age_reference_date()
+        # rows whose stored values differ from a fresh computation (NULL-aware)
+        stale = Registration.objects.alias(new_band=age_band_expression(on_date)).filter(
+            Q(age_band__isnull=True, new_band__isnull=False)
+            | Q(age_band__isnull=False, new_band__isnull=True)
+            | (Q(age_band__isnull=False, new_band__isnull=False) & ~Q(age_band=F('new_band')))
+            | Q(birth_year__isnull=True, date_of_birth__isnull=False)
+            | Q(birth_year__isnull=False, date_of_birth__isnull=True)
+            | (Q(birth_year__isnull=False, date_of_birth__isnull=False) & ~Q(birth_year=F('date_of_birth__year')))
+        )
+        pks = list(stale.values_list('pk', flat=True))
+        size = max(1, options['batch_size'])
+        for start in range(0, len(pks), size):
+            chunk = pks[start:start + size]
+            with transaction.atomic(), rollups.tracking(chunk):
+                rows = Registration.objects.filter(pk__in=chunk)
+                rows.refresh_age_bands(on_date)
+                RegistrationReadModel.refresh(rows)
+                ChangeLogEntry.record_many(Registration, chunk, ChangeLogEntry.ACTION_UPDATE)
+                summary_cache.bump_data_version()
+        self.stdout.write(f"Updated age bands of {len(pks)} registrations (as of {on_date}).")
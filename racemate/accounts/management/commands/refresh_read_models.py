@@ -0,0 +1,17 @@
+# accounts/management/commands/refresh_read_models.py
+from django.core.management.base import BaseCommand
+
+from accounts.models import Registration, RegistrationReadModel
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the denormalized registration read rows. Run daily so age "
+            "bands roll over, or after bulk changes made outside the app.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Rows upserted per statement (default 1000).")
+
+    def handle(self, *args, **options):
+        written = RegistrationReadModel.refresh(Registration.objects.all(), batch_size=options['batch_size'])
+        self.stdout.write(f"Refreshed {written} read rows.")
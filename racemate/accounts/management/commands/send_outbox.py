@@ -0,0 +1,35 @@
+# accounts/management/commands/send_outbox.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Send queued outbox emails in batches over a single mail connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help="Rows claimed per batch (default 100).")
+        parser.add_argument('--rate', type=float, default=None,
+                            help="Max messages per second (default EMAIL_OUTBOX_RATE_PER_SECOND).")
+        parser.add_argument('--max-attempts', type=int, default=None,
+                            help="Attempts before a message is marked failed (default EMAIL_OUTBOX_MAX_ATTEMPTS).")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep polling for new mail instead of exiting when the outbox is empty.")
+        parser.add_argument('--sleep', type=float, default=10.0,
+                            help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = drain_outbox(
+                batch_size=options['batch_size'],
+                rate=options['rate'],
+                max_attempts=options['max_attempts'],
+            )
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+            if not options['loop']:
+                break
+            time.sleep(options['sleep'])
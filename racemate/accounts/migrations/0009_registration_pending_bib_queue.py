@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+def empty_bib_to_null(apps, schema_editor):
+    Registration = apps.get_model('accounts', 'Registration')
+    Registration.objects.filter(bib_id='').update(bib_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_globalsequence_registration_email'),
+        ('app_admin', '0005_dimdistrict_code'),
+    ]
+
+    operations = [
+        migrations.RunPython(empty_bib_to_null, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(condition=models.Q(('bib_id__isnull', True)), fields=['id'], name='reg_pending_bib_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='registration',
+            constraint=models.CheckConstraint(condition=models.Q(('bib_id', ''), _negated=True), name='reg_bib_id_not_empty'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:47
+
+from django.db import migrations, models
+
+
+def backfill_bib_parts(apps, schema_editor):
+    """Split existing bib_ids ("[DIST]-[AGE]-[G]-[YYYY]-[0001]") into the new columns."""
+    Registration = apps.get_model('accounts', 'Registration')
+    batch = []
+    for reg in Registration.objects.filter(bib_id__isnull=False).only('id', 'bib_id').iterator(chunk_size=2000):
+        tokens = reg.bib_id.split('-')
+        # parts that don't fit their columns (hand-edited bibs) keep only bib_public
+        if (len(tokens) >= 5 and tokens[-1].isdigit() and tokens[-2].isdigit() and len(tokens[-2]) == 4
+                and len('-'.join(tokens[:-4])) <= 10 and len(tokens[-4]) <= 10 and len(tokens[-3]) <= 1):
+            reg.bib_district_code = '-'.join(tokens[:-4])
+            reg.bib_age_token = tokens[-4]
+            reg.bib_gender = tokens[-3]
+            reg.bib_year = int(tokens[-2])
+            reg.bib_seq = int(tokens[-1])
+            reg.bib_public = '-'.join(tokens[:-2] + tokens[-1:])
+        else:
+            reg.bib_public = reg.bib_id
+        batch.append(reg)
+        if len(batch) >= 2000:
+            Registration.objects.bulk_update(batch, BIB_PART_FIELDS)
+            batch = []
+    if batch:
+        Registration.objects.bulk_update(batch, BIB_PART_FIELDS)
+
+
+BIB_PART_FIELDS = ['bib_district_code', 'bib_age_token', 'bib_gender', 'bib_year', 'bib_seq', 'bib_public']
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_registration_pending_bib_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registration',
+            name='bib_age_token',
+            field=models.CharField(blank=True, max_length=10, null=True, verbose_name='Bib age category'),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='bib_district_code',
+            field=models.CharField(blank=True, db_index=True, max_length=10, null=True, verbose_name='Bib district code'),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='bib_gender',
+            field=models.CharField(blank=True, max_length=1, null=True, verbose_name='Bib gender'),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='bib_public',
+            field=models.CharField(blank=True, db_index=True, help_text='Printable bib without the year, e.g. LKO-U23-M-0001.', max_length=50, null=True, verbose_name='Public bib'),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='bib_seq',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True, verbose_name='Bib number'),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='bib_year',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Bib year'),
+        ),
+        migrations.RunPython(backfill_bib_parts, migrations.RunPython.noop),
+    ]
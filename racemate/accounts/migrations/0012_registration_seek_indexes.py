@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_outboundemail'),
+        ('app_admin', '0006_exportjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['date_of_birth', 'id'], name='reg_dob_seek_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['gender', 'id'], name='reg_gender_seek_idx'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:57
+
+import django.db.models.deletion
+from datetime import date
+
+from django.db import migrations, models
+
+
+AGE_BANDS = [
+    (56, '56+'), (46, '46-55'), (36, '36-45'), (23, '23-35'), (19, '19-22'),
+    (17, '17-18'), (15, '15-16'), (12, '12-14'), (0, '<12'),
+]
+GENDER_LABELS = {'male': 'Male', 'female': 'Female', 'other': 'Other'}
+
+
+def backfill_read_rows(apps, schema_editor):
+    """Create a read row for every existing registration."""
+    Registration = apps.get_model('accounts', 'Registration')
+    ReadRow = apps.get_model('accounts', 'RegistrationReadModel')
+    Through = Registration.events.through
+    today = date.today()
+
+    events = {}
+    for reg_id, name in Through.objects.order_by('registration_id', 'dimeventcategory__name').values_list(
+            'registration_id', 'dimeventcategory__name'):
+        if name:
+            events[reg_id] = f"{events[reg_id]}, {name}" if reg_id in events else name
+
+    batch = []
+    for (pk, name, gender, dob, mobile, district_name, district, state_name, category,
+         bib_id, bib_public, bib_released_at, created_at) in Registration.objects.values_list(
+            'pk', 'name', 'gender', 'date_of_birth', 'mobile_number', 'district_fk__name', 'district',
+            'state__name', 'category', 'bib_id', 'bib_public', 'bib_released_at', 'created_at',
+    ).iterator(chunk_size=2000):
+        band = ''
+        if dob:
+            age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+            band = next((label for minimum, label in AGE_BANDS if age >= minimum), '')
+        batch.append(ReadRow(
+            registration_id=pk, name=name or '', gender=gender,
+            gender_display=GENDER_LABELS.get(gender, gender) or '', date_of_birth=dob, age_band=band,
+            mobile_number=mobile or '', district_name=district_name or district or '',
+            state_name=state_name or '', events_display=events.get(pk, ''), category=category,
+            bib_id=bib_id, bib_public=bib_public, bib_released_at=bib_released_at, created_at=created_at,
+        ))
+        if len(batch) >= 2000:
+            ReadRow.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        ReadRow.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_registration_seek_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistrationReadModel',
+            fields=[
+                ('registration', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='read_row', serialize=False, to='accounts.registration')),
+                ('name', models.CharField(max_length=200)),
+                ('gender', models.CharField(blank=True, max_length=10, null=True)),
+                ('gender_display', models.CharField(blank=True, max_length=20)),
+                ('date_of_birth', models.DateField(blank=True, null=True)),
+                ('age_band', models.CharField(blank=True, max_length=10)),
+                ('mobile_number', models.CharField(blank=True, max_length=16)),
+                ('district_name', models.CharField(blank=True, max_length=200)),
+                ('state_name', models.CharField(blank=True, max_length=200)),
+                ('events_display', models.TextField(blank=True)),
+                ('category', models.CharField(blank=True, max_length=255, null=True)),
+                ('bib_id', models.CharField(blank=True, max_length=50, null=True)),
+                ('bib_public', models.CharField(blank=True, max_length=50, null=True)),
+                ('bib_released_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(blank=True, null=True)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Registration read row',
+                'verbose_name_plural': 'Registration read rows',
+                'indexes': [models.Index(condition=models.Q(('bib_id__isnull', False)), fields=['-created_at'], name='readrow_start_list_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_read_rows, migrations.RunPython.noop),
+    ]
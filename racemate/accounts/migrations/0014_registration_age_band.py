@@ -0,0 +1,64 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:01
+
+from datetime import date
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+# (key, min age, max age) as in accounts.models.AGE_BANDS at the time of writing
+AGE_BANDS = [('under18', None, 17), ('18to29', 18, 29), ('30to45', 30, 45), ('46to55', 46, 55), ('56plus', 56, None)]
+
+
+def backfill_age_columns(apps, schema_editor):
+    """Fill birth_year/age_band on registrations and copy the band onto their read rows."""
+    Registration = apps.get_model('accounts', 'Registration')
+    ReadRow = apps.get_model('accounts', 'RegistrationReadModel')
+    on = getattr(settings, 'EVENT_DATE', None) or date.today()
+
+    batch = []
+    for reg in Registration.objects.filter(date_of_birth__isnull=False).only('id', 'date_of_birth').iterator(chunk_size=2000):
+        dob = reg.date_of_birth
+        age = on.year - dob.year - ((on.month, on.day) < (dob.month, dob.day))
+        reg.birth_year = dob.year
+        reg.age_band = next(
+            (key for key, low, high in AGE_BANDS if (low is None or age >= low) and (high is None or age <= high)),
+            None,
+        )
+        batch.append(reg)
+        if len(batch) >= 2000:
+            Registration.objects.bulk_update(batch, ['birth_year', 'age_band'])
+            batch = []
+    if batch:
+        Registration.objects.bulk_update(batch, ['birth_year', 'age_band'])
+
+    ReadRow.objects.update(age_band=Subquery(
+        Registration.objects.filter(pk=OuterRef('registration_id')).values('age_band')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_registrationreadmodel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registration',
+            name='age_band',
+            field=models.CharField(blank=True, choices=[('under18', 'Under 18'), ('18to29', '18–29'), ('30to45', '30–45'), ('46to55', '46–55'), ('56plus', '56+')], db_index=True, help_text='Age band on the event date (settings.EVENT_DATE).', max_length=10, null=True, verbose_name='Age band'),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='birth_year',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, null=True, verbose_name='Birth year'),
+        ),
+        migrations.AlterField(
+            model_name='registrationreadmodel',
+            name='age_band',
+            field=models.CharField(blank=True, max_length=10, null=True),
+        ),
+        migrations.RunPython(backfill_age_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:06
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+# registration_search: FTS5 index over the read rows, maintained by triggers.
+# Mobile numbers are indexed whole and as their last 10 digits, so a number
+# typed without the country code still prefix-matches.
+FTS_COLUMNS = "(rowid, name, fathers_name, mobile, bib, district)"
+FTS_VALUES = (
+    "({r}.registration_id, {r}.name, {r}.fathers_name, "
+    "{r}.mobile_number || ' ' || substr({r}.mobile_number, -10), "
+    "coalesce({r}.bib_id, ''), {r}.district_name)"
+)
+TABLE = "accounts_registrationreadmodel"
+
+CREATE_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS registration_search USING fts5("
+    "name, fathers_name, mobile, bib, district, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')",
+
+    f"CREATE TRIGGER IF NOT EXISTS registration_search_ai AFTER INSERT ON {TABLE} BEGIN "
+    f"INSERT INTO registration_search {FTS_COLUMNS} VALUES {FTS_VALUES.format(r='new')}; END",
+
+    f"CREATE TRIGGER IF NOT EXISTS registration_search_au AFTER UPDATE ON {TABLE} BEGIN "
+    f"DELETE FROM registration_search WHERE rowid = old.registration_id; "
+    f"INSERT INTO registration_search {FTS_COLUMNS} VALUES {FTS_VALUES.format(r='new')}; END",
+
+    f"CREATE TRIGGER IF NOT EXISTS registration_search_ad AFTER DELETE ON {TABLE} BEGIN "
+    f"DELETE FROM registration_search WHERE rowid = old.registration_id; END",
+
+    f"INSERT INTO registration_search {FTS_COLUMNS} "
+    f"SELECT {FTS_VALUES.format(r=TABLE)[1:-1]} FROM {TABLE}",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS registration_search_ai",
+    "DROP TRIGGER IF EXISTS registration_search_au",
+    "DROP TRIGGER IF EXISTS registration_search_ad",
+    "DROP TABLE IF EXISTS registration_search",
+]
+
+
+def backfill_fathers_name(apps, schema_editor):
+    Registration = apps.get_model('accounts', 'Registration')
+    ReadRow = apps.get_model('accounts', 'RegistrationReadModel')
+    ReadRow.objects.update(fathers_name=Subquery(
+        Registration.objects.filter(pk=OuterRef('registration_id')).values('fathers_name')[:1]
+    ))
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite only; other databases keep the LIKE search
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_registration_age_band'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registrationreadmodel',
+            name='fathers_name',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.RunPython(backfill_fathers_name, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:08
+
+import hashlib
+import hmac
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_duplicate_keys(apps, schema_editor):
+    """mobile_normalized / aadhar_hash as accounts.models.normalize_mobile / aadhar_digest compute them."""
+    Registration = apps.get_model('accounts', 'Registration')
+    country = getattr(settings, 'PHONE_DEFAULT_COUNTRY_CODE', '91')
+    key = (getattr(settings, 'AADHAAR_HASH_KEY', None) or settings.SECRET_KEY).encode('utf-8')
+
+    def mobile(value):
+        digits = ''.join(ch for ch in str(value or '') if ch.isdigit())
+        if len(digits) == 11 and digits.startswith('0'):
+            digits = digits[1:]
+        return country + digits if len(digits) == 10 else digits
+
+    def aadhar(value):
+        digits = ''.join(ch for ch in str(value or '') if ch.isdigit())
+        return hmac.new(key, digits.encode('ascii'), hashlib.sha256).hexdigest() if digits else ''
+
+    batch = []
+    rows = Registration.objects.only('id', 'mobile_number', 'aadhar_number').iterator(chunk_size=2000)
+    for reg in rows:
+        reg.mobile_normalized = mobile(reg.mobile_number)
+        reg.aadhar_hash = aadhar(reg.aadhar_number)
+        batch.append(reg)
+        if len(batch) >= 2000:
+            Registration.objects.bulk_update(batch, ['mobile_normalized', 'aadhar_hash'])
+            batch = []
+    if batch:
+        Registration.objects.bulk_update(batch, ['mobile_normalized', 'aadhar_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_registration_search'),
+        ('app_admin', '0008_category_rules'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='registration',
+            name='reg_mobile_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='registration',
+            name='reg_aadhar_idx',
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='aadhar_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='mobile_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['mobile_normalized'], name='reg_mobile_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['aadhar_hash'], name='reg_aadhar_hash_idx'),
+        ),
+        migrations.RunPython(backfill_duplicate_keys, migrations.RunPython.noop),
+    ]
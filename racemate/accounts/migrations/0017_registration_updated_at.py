@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:15
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # the column was just filled with the migration time; the creation time is a truer starting point
+    Registration = apps.get_model('accounts', 'Registration')
+    Registration.objects.filter(created_at__isnull=False).update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_registration_duplicate_keys'),
+        ('app_admin', '0009_registration_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registration',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['updated_at'], name='reg_updated_idx'),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
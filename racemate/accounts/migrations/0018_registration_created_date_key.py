@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:18
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractDay, ExtractMonth, ExtractYear
+
+
+def backfill_created_date_keys(apps, schema_editor):
+    # YYYYMMDD of created_at in the project time zone, as app_admin.dates.date_key computes it
+    Registration = apps.get_model('accounts', 'Registration')
+    Registration.objects.filter(created_at__isnull=False).update(
+        created_date_key=ExtractYear('created_at') * 10000 + ExtractMonth('created_at') * 100 + ExtractDay('created_at'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0017_registration_updated_at'),
+        ('app_admin', '0010_dimdate_date_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registration',
+            name='created_date_key',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['created_date_key'], name='reg_created_key_idx'),
+        ),
+        migrations.RunPython(backfill_created_date_keys, migrations.RunPython.noop),
+    ]
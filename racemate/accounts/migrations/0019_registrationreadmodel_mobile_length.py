@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0018_registration_created_date_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='registrationreadmodel',
+            name='mobile_number',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+    ]
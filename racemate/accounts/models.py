@@ -3,18 +3,24 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
-from app_admin.models import DimState, DimDistrict
+from app_admin import summary_cache
+from app_admin.dates import date_key
+from app_admin.models import ChangeLogEntry, ChangeLoggedModel, DimState, DimDistrict
 
+import hashlib
+import hmac
 from datetime import date
+from itertools import islice
 from django.conf import settings
 
 # new imports for bib generation
 from django.db import transaction
-from django.db.models import F
+from django.db.models import ExpressionWrapper, F
+from django.db.models.functions import ExtractYear
 from django.utils import timezone
-from django.core.mail import send_mail
 from django.utils.text import slugify
 from django.db import IntegrityError
+from .sequences import registration_allocator
 
 phone_validator = RegexValidator(
     regex=r'^\+?\d{7,15}$',
@@ -27,6 +33,144 @@ aadhar_validator = RegexValidator(
 )
 
 
+def normalize_mobile(value):
+    """
+    Digits-only mobile number with country code, for duplicate lookups:
+    "+91 98765 43210", "09876543210" and "9876543210" all give "919876543210".
+    Bare 10-digit numbers get settings.PHONE_DEFAULT_COUNTRY_CODE. '' if empty.
+    """
+    digits = ''.join(ch for ch in str(value or '') if ch.isdigit())
+    if len(digits) == 11 and digits.startswith('0'):
+        digits = digits[1:]
+    if len(digits) == 10:
+        digits = getattr(settings, 'PHONE_DEFAULT_COUNTRY_CODE', '91') + digits
+    return digits
+
+
+def aadhar_digest(value):
+    """
+    Keyed SHA-256 of an Aadhaar number (digits only), for duplicate lookups
+    without comparing or indexing the raw number. '' if empty.
+    """
+    digits = ''.join(ch for ch in str(value or '') if ch.isdigit())
+    if not digits:
+        return ''
+    key = getattr(settings, 'AADHAAR_HASH_KEY', None) or settings.SECRET_KEY
+    return hmac.new(key.encode('utf-8'), digits.encode('ascii'), hashlib.sha256).hexdigest()
+
+
+# column sizes of the text bib parts stored on Registration
+BIB_PART_MAX_LENGTHS = {'district_code': 10, 'age_token': 10, 'gender': 1}
+
+
+def split_bib(bib):
+    """
+    Split a full bib "[DIST]-[AgeCategory]-[GENDER]-[Year]-[0001]" into its parts.
+    Returns a dict with district_code, age_token, gender, year, seq and public
+    (the printable bib without the year). Unparseable values, and hand-edited
+    bibs whose parts don't fit their columns (BIB_PART_MAX_LENGTHS), keep only
+    `public`.
+    """
+    parts = {
+        'district_code': None, 'age_token': None, 'gender': None,
+        'year': None, 'seq': None, 'public': None,
+    }
+    if not bib:
+        return parts
+    tokens = str(bib).split('-')
+    # parse from the right: DIST itself may contain '-' (slugified names)
+    if len(tokens) >= 5 and tokens[-1].isdigit() and tokens[-2].isdigit() and len(tokens[-2]) == 4:
+        text = {'district_code': '-'.join(tokens[:-4]), 'age_token': tokens[-4], 'gender': tokens[-3]}
+        if all(len(value) <= BIB_PART_MAX_LENGTHS[name] for name, value in text.items()):
+            parts.update(text, year=int(tokens[-2]), seq=int(tokens[-1]))
+            parts['public'] = '-'.join(tokens[:-2] + tokens[-1:])
+            return parts
+    parts['public'] = str(bib)
+    return parts
+
+
+# Age bands stored on Registration.age_band: (key, label, min age, max age)
+AGE_BANDS = [
+    ('under18', 'Under 18', None, 17),
+    ('18to29', '18–29', 18, 29),
+    ('30to45', '30–45', 30, 45),
+    ('46to55', '46–55', 46, 55),
+    ('56plus', '56+', 56, None),
+]
+AGE_BAND_CHOICES = [(key, label) for key, label, _, _ in AGE_BANDS]
+
+
+def age_reference_date():
+    """The date ages/bands/categories are computed on: settings.EVENT_DATE, else today."""
+    return getattr(settings, 'EVENT_DATE', None) or date.today()
+
+
+def age_band(age):
+    """Age band key for an integer age, None when unknown."""
+    if age is None:
+        return None
+    for key, _, low, high in AGE_BANDS:
+        if (low is None or age >= low) and (high is None or age <= high):
+            return key
+    return None
+
+
+def _years_before(on_date, years):
+    try:
+        return on_date.replace(year=on_date.year - years)
+    except ValueError:
+        # 29 Feb on a non-leap year
+        return on_date.replace(year=on_date.year - years, day=28)
+
+
+def dob_bounds(min_age=None, max_age=None, on_date=None):
+    """
+    date_of_birth lookups selecting people aged min_age..max_age (inclusive) on
+    `on_date`, as plain (index-friendly) date comparisons.
+    """
+    on_date = on_date or date.today()
+    lookups = {}
+    if min_age is not None:
+        # at least min_age: born on or before on_date - min_age years
+        lookups['date_of_birth__lte'] = _years_before(on_date, min_age)
+    if max_age is not None:
+        # at most max_age: born after on_date - (max_age + 1) years
+        lookups['date_of_birth__gt'] = _years_before(on_date, max_age + 1)
+    return lookups
+
+
+def age_expression(on_date=None, field='date_of_birth'):
+    """
+    Exact age in whole years on `on_date` as a SQL expression (NULL without a DOB):
+    year difference, minus one if the birthday hasn't come round yet.
+    """
+    on_date = on_date or date.today()
+    before_birthday = (
+        models.Q(**{f'{field}__month__gt': on_date.month})
+        | models.Q(**{f'{field}__month': on_date.month, f'{field}__day__gt': on_date.day})
+    )
+    return ExpressionWrapper(
+        models.Value(on_date.year) - ExtractYear(field)
+        - models.Case(models.When(before_birthday, then=models.Value(1)), default=models.Value(0)),
+        output_field=models.IntegerField(),
+    )
+
+
+def age_band_expression(on_date=None):
+    """CASE over date_of_birth ranges giving the age band key on `on_date` (for bulk updates)."""
+    on_date = on_date or age_reference_date()
+    whens = [
+        models.When(models.Q(**dob_bounds(low, high, on_date)), then=models.Value(key))
+        for key, _, low, high in AGE_BANDS
+    ]
+    return models.Case(
+        models.When(date_of_birth__isnull=True, then=models.Value(None)),
+        *whens,
+        default=models.Value(None),
+        output_field=models.CharField(),
+    )
+
+
 class RegistrationSequence(models.Model):
     """
     Keeps per-(district,year,age_category,gender) sequence to safely generate bib numbers.
@@ -58,8 +202,97 @@ class GlobalSequence(models.Model):
     def __str__(self):
         return f"{self.name}:{self.seq}"
 
+    @classmethod
+    def reserve_block(cls, name, count):
+        """
+        Atomically reserve `count` consecutive numbers on the named counter.
+        The row is locked and bumped once, regardless of `count`.
+        Returns the first number of the block (block = first .. first+count-1).
+        """
+        if count < 1:
+            raise ValueError("count must be at least 1.")
+        with transaction.atomic():
+            row, created = cls.objects.select_for_update().get_or_create(
+                name=name, defaults={'seq': 0}
+            )
+            cls.objects.filter(pk=row.pk).update(seq=F('seq') + count)
+            row.refresh_from_db(fields=['seq'])
+        return row.seq - count + 1
+
+
+class RegistrationQuerySet(models.QuerySet):
+    def pending_bibs(self):
+        """
+        Registrations still waiting for a bib. Empty bib_ids are normalized to
+        NULL (see Registration.save and the reg_bib_id_not_empty constraint), so
+        this is a single IS NULL test served by the reg_pending_bib_idx partial index.
+        """
+        return self.filter(bib_id__isnull=True)
+
+    def with_bibs(self):
+        return self.filter(bib_id__isnull=False)
+
+    def with_age(self, on_date=None):
+        """Annotate `age`: exact age in years on `on_date` (default today), computed in SQL."""
+        return self.annotate(age=age_expression(on_date))
+
+    def aged(self, min_age=None, max_age=None, on_date=None):
+        """Registrations aged min_age..max_age (inclusive) on `on_date`, via date_of_birth ranges."""
+        return self.filter(**dob_bounds(min_age, max_age, on_date))
+
+    def refresh_age_bands(self, on_date=None):
+        """
+        Recompute birth_year and age_band for every row with two UPDATE
+        statements (no rows loaded). Returns the number of rows updated.
+        """
+        self.update(birth_year=ExtractYear('date_of_birth'))
+        return self.update(age_band=age_band_expression(on_date), updated_at=timezone.now())
+
+
+class OutboundEmail(models.Model):
+    """
+    Transactional email outbox. Rows are written in the same transaction as the
+    event that triggers them (e.g. bib release) and delivered in batches over a
+    single mail connection by the send_outbox management command, or on Vercel
+    by the cron-called accounts:send_outbox view.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
 
-class Registration(models.Model):
+    registration = models.ForeignKey(
+        'Registration', on_delete=models.SET_NULL, null=True, blank=True, related_name='outbound_emails'
+    )
+    to_email = models.EmailField(max_length=254)
+    from_email = models.CharField(max_length=254, blank=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = _("Outbound email")
+        verbose_name_plural = _("Outbound emails")
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
+
+
+class Registration(ChangeLoggedModel):
     PROFESSION_CHOICES = [
         ('student', 'Student'),
         ('employee', 'Employee'),
@@ -128,6 +361,9 @@ class Registration(models.Model):
         validators=[aadhar_validator],
         help_text=_("12 digit Aadhaar number without spaces.")
     )
+    # duplicate-detection keys, set on save (see normalize_mobile / aadhar_digest)
+    mobile_normalized = models.CharField(max_length=20, blank=True, editable=False)
+    aadhar_hash = models.CharField(max_length=64, blank=True, editable=False)
 
     # Email (added because code references it)
     email = models.EmailField(_("Email"), max_length=254, blank=True, null=True)
@@ -142,22 +378,63 @@ class Registration(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # local creation day as YYYYMMDD, joins app_admin.dimDate.date_key
+    created_date_key = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    # bumped by every write, including the bulk paths (conditional GET validators)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # store computed category (nullable so migration is easy)
     category = models.CharField(_("Assigned category"), max_length=255, null=True, blank=True,
                                 help_text=_("Computed competition category for registrant (auto-calculated)."))
 
     # --- NEW fields for Bibs ---
+    # Stored from date_of_birth on save (see refresh_age_bands for bulk recomputes)
+    birth_year = models.PositiveSmallIntegerField(_("Birth year"), null=True, blank=True, db_index=True)
+    age_band = models.CharField(_("Age band"), max_length=10, choices=AGE_BAND_CHOICES, null=True, blank=True,
+                                db_index=True, help_text=_("Age band on the event date (settings.EVENT_DATE)."))
+
     bib_id = models.CharField(_("Bib ID"), max_length=50, unique=True, null=True, blank=True)
     bib_released_at = models.DateTimeField(null=True, blank=True)
 
+    # Parts of bib_id, stored so lists/exports never re-parse it and help-desk
+    # lookups by public bib or trailing number are index seeks.
+    bib_district_code = models.CharField(_("Bib district code"), max_length=10, null=True, blank=True, db_index=True)
+    bib_age_token = models.CharField(_("Bib age category"), max_length=10, null=True, blank=True)
+    bib_gender = models.CharField(_("Bib gender"), max_length=1, null=True, blank=True)
+    bib_year = models.PositiveSmallIntegerField(_("Bib year"), null=True, blank=True)
+    bib_seq = models.PositiveIntegerField(_("Bib number"), null=True, blank=True, db_index=True)
+    bib_public = models.CharField(_("Public bib"), max_length=50, null=True, blank=True, db_index=True,
+                                  help_text=_("Printable bib without the year, e.g. LKO-U23-M-0001."))
+
+    # every column written when a bib is released
+    BIB_FIELDS = [
+        'bib_id', 'bib_released_at', 'bib_district_code', 'bib_age_token',
+        'bib_gender', 'bib_year', 'bib_seq', 'bib_public',
+    ]
+
+    objects = RegistrationQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = _("Registration")
         verbose_name_plural = _("Registrations")
         indexes = [
-            models.Index(fields=['mobile_number'], name='reg_mobile_idx'),
-            models.Index(fields=['aadhar_number'], name='reg_aadhar_idx'),
+            # duplicate checks / dedupe report look up and group by these
+            models.Index(fields=['mobile_normalized'], name='reg_mobile_norm_idx'),
+            models.Index(fields=['aadhar_hash'], name='reg_aadhar_hash_idx'),
+            # newest write, for the list pages' Last-Modified / ETag
+            models.Index(fields=['updated_at'], name='reg_updated_idx'),
+            # daily series and date range filters of the analysis dashboard
+            models.Index(fields=['created_date_key'], name='reg_created_key_idx'),
+            # queue of registrations waiting for a bib; stays small however big the table gets
+            models.Index(fields=['id'], condition=models.Q(bib_id__isnull=True), name='reg_pending_bib_idx'),
+            # keyset pagination on the bib list: (sort key, id)
+            models.Index(fields=['date_of_birth', 'id'], name='reg_dob_seek_idx'),
+            models.Index(fields=['gender', 'id'], name='reg_gender_seek_idx'),
+        ]
+        constraints = [
+            # "no bib" is always NULL, never ''
+            models.CheckConstraint(condition=~models.Q(bib_id=''), name='reg_bib_id_not_empty'),
         ]
 
     def __str__(self):
@@ -195,49 +472,81 @@ class Registration(models.Model):
             years -= 1
         return years
 
-    def birth_year(self):
-        return self.date_of_birth.year if self.date_of_birth else None
-
     def assign_category(self, event_date=None):
         """
-        Decide a category string based on age (on event date).
-        Adjust the ranges to match your official rulebook.
+        Category for the age on the event date, looked up in the compiled
+        rulebook of this registration's event (see accounts.categories).
         """
-        if event_date is None:
-            event_date = getattr(settings, "EVENT_DATE", date.today())
+        from .categories import category_for_age, rulebook_event_id
 
-        age = self.age_on(event_date)
-        if age is None:
-            return "Unspecified"
+        if event_date is None:
+            event_date = age_reference_date()
+        return category_for_age(self.age_on(event_date), rulebook_event_id(self))
 
-        # ----- DEFAULT MAPPING (edit to fit exact rules) -----
-        if age >= 56:
-            return "Masters Men 56+"
-        if 46 <= age <= 55:
-            return "Masters Men 46 to 55 years"
-        if 36 <= age <= 45:
-            return "Masters Men 36 to 45 years"
-        if 12 <= age <= 14:
-            return "Youth Boys & Youth Girls (12-14)"
-        if 15 <= age <= 16:
-            return "Sub-Junior Boys & Sub-Junior Girls (15 & 16)"
-        if 17 <= age <= 18:
-            return "Junior Boys & Junior Girls (17 & 18)"
-        # Under-23 placeholder range; adjust if using birth-year bands
-        if 19 <= age <= 22:
-            return "Men under-23 (19-22)"
-        if age >= 19:
-            return "Men Elite & Women Elite (19 & above)"
-        return "Other / Not categorized"
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so save() can tell whether the age-derived fields need recomputing
+        instance._loaded_dob = instance.__dict__.get('date_of_birth')
+        return instance
 
     def save(self, *args, **kwargs):
-        # compute category before saving (uses EVENT_DATE from settings by default)
-        try:
-            self.category = self.assign_category()
-        except Exception:
-            # do not block save for category computation failures
-            self.category = self.category or None
+        # "no bib" is stored as NULL only (admin/forms may hand us '')
+        if not self.bib_id:
+            self.bib_id = None
+
+        # keep the stored bib parts in step with a hand-edited / cleared bib_id
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'bib_id' in update_fields:
+            parts = split_bib(self.bib_id)
+            if (self.bib_public, self.bib_seq) != (parts['public'], parts['seq']):
+                self._set_bib_parts(parts)
+                if update_fields is not None:
+                    kwargs['update_fields'] = set(update_fields) | (set(self.BIB_FIELDS) - {'bib_released_at'})
+
+        # duplicate-detection keys follow the raw columns
+        if update_fields is None or 'mobile_number' in update_fields:
+            self.mobile_normalized = normalize_mobile(self.mobile_number)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'mobile_normalized'}
+        if update_fields is None or 'aadhar_number' in update_fields:
+            self.aadhar_hash = aadhar_digest(self.aadhar_number)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'aadhar_hash'}
+
+        # age-derived fields: only when date_of_birth is (possibly) being written and
+        # differs from what was loaded; bulk changes go through accounts.categories.recategorize
+        update_fields = kwargs.get('update_fields')
+        dob_written = update_fields is None or 'date_of_birth' in update_fields
+        dob_changed = self._state.adding or getattr(self, '_loaded_dob', None) != self.date_of_birth
+        if dob_written and (dob_changed or not self.category):
+            try:
+                self.category = self.assign_category()
+            except Exception:
+                # do not block save for category computation failures
+                self.category = self.category or None
+
+            self.birth_year = self.date_of_birth.year if self.date_of_birth else None
+            self.age_band = age_band(self.age_on(age_reference_date()))
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'category', 'birth_year', 'age_band'}
+
+        # auto_now only reaches the database if listed
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'updated_at'}
+
+        # created_at is only stamped during the insert, so the key is guessed
+        # from "now" and corrected below should the insert land past midnight
+        full_save = kwargs.get('update_fields') is None
+        if full_save:
+            self.created_date_key = date_key(self.created_at or timezone.now())
+
         super().save(*args, **kwargs)
+        self._loaded_dob = self.date_of_birth
+
+        if full_save and self.created_date_key != date_key(self.created_at):
+            self.created_date_key = date_key(self.created_at)
+            type(self).objects.filter(pk=self.pk).update(created_date_key=self.created_date_key)
 
     # -------------------
     # Bib helpers & generator
@@ -247,7 +556,7 @@ class Registration(models.Model):
         Return a short age category token used in the bib (adjust mapping as needed).
         Defaults: U18, U23, SEN (for 23-55), M56 (56+).
         """
-        age = self.age_on(getattr(settings, "EVENT_DATE", None) or date.today())
+        age = self.age_on(age_reference_date())
         if age is None:
             # fallback: try to parse numeric from self.category
             if self.category:
@@ -270,9 +579,9 @@ class Registration(models.Model):
         # 23-55
         return "SEN"
 
-    def _format_bib(self, seq_num: int):
+    def _bib_parts(self, seq_num: int):
         """
-        Build: [DIST]-[AgeCategory]-[GENDER]-[Year]-[0001]
+        Components of the bib for `seq_num`, as stored in the bib_* columns.
         """
         # DIST: prefer code, else slugified short name
         if self.district_fk and self.district_fk.code:
@@ -286,7 +595,41 @@ class Registration(models.Model):
         gender = (self.gender or "other")[0].upper()  # male->M, female->F, other->O
         year = (self.created_at.year if self.created_at else timezone.now().year)
         regno = f"{seq_num:04d}"
-        return f"{dist}-{age_cat}-{gender}-{year}-{regno}"
+        return {
+            'district_code': dist,
+            'age_token': age_cat,
+            'gender': gender,
+            'year': year,
+            'seq': seq_num,
+            'public': f"{dist}-{age_cat}-{gender}-{regno}",
+        }
+
+    def _format_bib(self, seq_num: int):
+        """
+        Build: [DIST]-[AgeCategory]-[GENDER]-[Year]-[0001]
+        """
+        parts = self._bib_parts(seq_num)
+        return f"{parts['district_code']}-{parts['age_token']}-{parts['gender']}-{parts['year']}-{parts['seq']:04d}"
+
+    def _set_bib_parts(self, parts):
+        self.bib_district_code = parts['district_code']
+        self.bib_age_token = parts['age_token']
+        self.bib_gender = parts['gender']
+        self.bib_year = parts['year']
+        self.bib_seq = parts['seq']
+        self.bib_public = parts['public']
+
+    def _assign_bib(self, seq_num: int, released_at=None):
+        """Set bib_id, its stored parts and the release time (does not save)."""
+        parts = self._bib_parts(seq_num)
+        self._set_bib_parts(parts)
+        self.bib_id = self._format_bib(seq_num)
+        self.bib_released_at = released_at or timezone.now()
+
+    def _clear_bib(self):
+        self._set_bib_parts(split_bib(None))
+        self.bib_id = None
+        self.bib_released_at = None
 
     def release_bib(self, notify=False, max_retries: int = 3):
         """
@@ -317,28 +660,16 @@ class Registration(models.Model):
                         raise ValueError("Sequence overflow for bucket: consider expanding regno digits or changing scope.")
 
                     # assign and save bib fields (defensive save)
-                    self.bib_id = self._format_bib(seq)
-                    self.bib_released_at = timezone.now()
+                    self._assign_bib(seq)
                     try:
-                        self.save(update_fields=['bib_id', 'bib_released_at'])
+                        self.save(update_fields=self.BIB_FIELDS)
                     except IntegrityError:
                         # If bib_id unique constraint failed (very rare), raise to outer retry
                         raise
 
-                # schedule notifications after commit (non-blocking wrt transaction)
-                if notify and getattr(self, 'email', None):
-                    def _send():
-                        try:
-                            send_mail(
-                                subject="Your Bib ID",
-                                message=f"Hello {self.name},\n\nYour Bib ID is: {self.bib_id}\n\nPlease save it.",
-                                from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com'),
-                                recipient_list=[self.email],
-                                fail_silently=True
-                            )
-                        except Exception:
-                            pass
-                    transaction.on_commit(_send)
+                    # queue the email in the same transaction so it commits (or rolls back) with the bib
+                    if notify:
+                        self._schedule_bib_notification()
 
                 return self.bib_id
 
@@ -353,3 +684,230 @@ class Registration(models.Model):
 
         # if loop falls through (shouldn't), raise
         raise RuntimeError("Failed to generate bib after retries.")
+
+    def release_bib_instant(self, notify=False, max_retries: int = 3):
+        """
+        Assign a bib_id without serializing on the GlobalSequence row.
+        Numbers come from the per-process hi-lo allocator, so the shared row is
+        only locked once per leased block. Inside an open transaction this
+        falls back to release_bib(), because a leased block must be committed
+        independently of the caller.
+        Returns the bib_id.
+        """
+        if self.bib_id:
+            return self.bib_id
+
+        if self.district_fk is None:
+            raise ValueError("Cannot release bib: registration has no district_fk set.")
+
+        if transaction.get_connection().in_atomic_block:
+            return self.release_bib(notify=notify, max_retries=max_retries)
+
+        for attempt in range(1, max_retries + 1):
+            seq = registration_allocator.next()
+            if seq > 9999:
+                raise ValueError("Sequence overflow for bucket: consider expanding regno digits or changing scope.")
+
+            self._assign_bib(seq)
+            try:
+                with transaction.atomic():
+                    self.save(update_fields=self.BIB_FIELDS)
+                    if notify:
+                        self._schedule_bib_notification()
+                return self.bib_id
+            except IntegrityError:
+                # bib_id already taken (e.g. a legacy value); move on to the next number
+                self._clear_bib()
+                if attempt >= max_retries:
+                    raise
+
+        raise RuntimeError("Failed to generate bib after retries.")
+
+    def _bib_notification(self):
+        """
+        Unsaved OutboundEmail carrying the "Your Bib ID" message,
+        or None when the registrant has no email.
+        """
+        if not getattr(self, 'email', None):
+            return None
+        return OutboundEmail(
+            registration=self,
+            to_email=self.email,
+            from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com'),
+            subject="Your Bib ID",
+            body=f"Hello {self.name},\n\nYour Bib ID is: {self.bib_id}\n\nPlease save it.",
+        )
+
+    def _schedule_bib_notification(self):
+        """
+        Queue the bib email in the outbox, in the caller's transaction, so it is
+        only sent (by send_outbox, command or cron view) if the bib release commits.
+        """
+        mail = self._bib_notification()
+        if mail is not None:
+            mail.save()
+
+    @classmethod
+    def release_bibs(cls, queryset, notify=False, max_retries: int = 3, batch_size: int = 500):
+        """
+        Bulk variant of release_bib() for a whole queryset of registrations.
+
+        Reserves one contiguous block of N numbers on GlobalSequence with a single
+        locked update, formats every bib in memory via _format_bib() and writes
+        them back with one bulk_update. Rows that already have a bib or have no
+        district_fk are skipped. The bib_id unique constraint still applies: on
+        a collision the whole batch is rolled back and retried with a new block.
+        Returns the list of registrations that received a bib.
+        """
+        for attempt in range(1, max_retries + 1):
+            try:
+                with transaction.atomic():
+                    regs = list(
+                        queryset
+                        .pending_bibs()
+                        .filter(district_fk__isnull=False)
+                        .select_related('district_fk')
+                        .select_for_update(of=('self',))
+                        .order_by('pk')
+                    )
+                    if not regs:
+                        return []
+
+                    first = GlobalSequence.reserve_block('registration', len(regs))
+                    if first + len(regs) - 1 > 9999:
+                        raise ValueError("Sequence overflow for bucket: consider expanding regno digits or changing scope.")
+
+                    now = timezone.now()
+                    for offset, reg in enumerate(regs):
+                        reg._assign_bib(first + offset, released_at=now)
+                        reg.updated_at = now
+                    cls.objects.bulk_update(regs, cls.BIB_FIELDS + ['updated_at'], batch_size=batch_size)
+                    # bulk_update sends no post_save and skips save(): refresh the
+                    # read model rows and log the change feed here
+                    pks = [reg.pk for reg in regs]
+                    RegistrationReadModel.refresh(cls.objects.filter(pk__in=pks))
+                    ChangeLogEntry.record_many(cls, pks, ChangeLogEntry.ACTION_UPDATE)
+                    summary_cache.bump_data_version()
+
+                    if notify:
+                        mails = [m for m in (reg._bib_notification() for reg in regs) if m is not None]
+                        OutboundEmail.objects.bulk_create(mails, batch_size=batch_size)
+
+                return regs
+
+            except IntegrityError:
+                # bib_id collision with a pre-existing value. The block was
+                # rolled back with the batch, so a plain retry would reserve the
+                # same numbers: skip past them in a transaction of their own first.
+                if attempt >= max_retries:
+                    raise
+                GlobalSequence.reserve_block('registration', len(regs))
+
+        raise RuntimeError("Failed to generate bibs after retries.")
+
+
+class RegistrationReadModel(models.Model):
+    """
+    Flat, denormalized copy of a registration for list pages and exports:
+    district/state names, joined event names, age band, public bib and category
+    in one row, so readers need no joins or prefetches.
+
+    Kept in sync on write (accounts.signals and the bulk paths call refresh()).
+    On SQLite, triggers on this table also maintain the registration_search
+    full-text index (see accounts.search).
+    """
+    registration = models.OneToOneField(
+        Registration, on_delete=models.CASCADE, primary_key=True, related_name='read_row'
+    )
+    name = models.CharField(max_length=200)
+    fathers_name = models.CharField(max_length=200, blank=True)
+    gender = models.CharField(max_length=10, null=True, blank=True)
+    gender_display = models.CharField(max_length=20, blank=True)
+    date_of_birth = models.DateField(null=True, blank=True)
+    age_band = models.CharField(max_length=10, null=True, blank=True)
+    mobile_number = models.CharField(max_length=20, blank=True)
+    district_name = models.CharField(max_length=200, blank=True)
+    state_name = models.CharField(max_length=200, blank=True)
+    events_display = models.TextField(blank=True)
+    category = models.CharField(max_length=255, null=True, blank=True)
+    bib_id = models.CharField(max_length=50, null=True, blank=True)
+    bib_public = models.CharField(max_length=50, null=True, blank=True)
+    bib_released_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(null=True, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    # copied as-is from Registration (read model field <- registration lookup)
+    SOURCE_FIELDS = {
+        'name': 'name',
+        'fathers_name': 'fathers_name',
+        'gender': 'gender',
+        'date_of_birth': 'date_of_birth',
+        'age_band': 'age_band',
+        'mobile_number': 'mobile_number',
+        'district_name': 'district_fk__name',
+        'legacy_district': 'district',
+        'state_name': 'state__name',
+        'category': 'category',
+        'bib_id': 'bib_id',
+        'bib_public': 'bib_public',
+        'bib_released_at': 'bib_released_at',
+        'created_at': 'created_at',
+    }
+
+    class Meta:
+        verbose_name = _("Registration read row")
+        verbose_name_plural = _("Registration read rows")
+        indexes = [
+            # start list: registrations with a bib, newest first
+            models.Index(fields=['-created_at'], condition=models.Q(bib_id__isnull=False),
+                         name='readrow_start_list_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.registration_id})"
+
+    @classmethod
+    def refresh(cls, queryset=None, batch_size=1000):
+        """
+        Rebuild the read rows for `queryset` (a Registration queryset, default
+        all) with one upsert per batch. Returns the number of rows written.
+        """
+        from .projections import event_names
+
+        if queryset is None:
+            queryset = Registration.objects.all()
+        gender_labels = dict(Registration.GENDER_CHOICES)
+        lookups = list(cls.SOURCE_FIELDS.values())
+        update_fields = [f for f in cls.SOURCE_FIELDS if f != 'legacy_district'] + [
+            'gender_display', 'events_display', 'synced_at',
+        ]
+
+        written = 0
+        values = queryset.order_by().values_list('pk', *lookups).iterator(chunk_size=batch_size)
+        while True:
+            batch = list(islice(values, batch_size))
+            if not batch:
+                break
+            names = event_names([row[0] for row in batch])
+            now = timezone.now()
+            rows = []
+            for pk, *vals in batch:
+                data = dict(zip(cls.SOURCE_FIELDS, vals))
+                legacy_district = data.pop('legacy_district')
+                data['name'] = data['name'] or ''
+                data['fathers_name'] = data['fathers_name'] or ''
+                data['mobile_number'] = data['mobile_number'] or ''
+                data['district_name'] = data['district_name'] or legacy_district or ''
+                data['state_name'] = data['state_name'] or ''
+                rows.append(cls(
+                    registration_id=pk,
+                    gender_display=gender_labels.get(data['gender'], data['gender']) or '',
+                    events_display=names.get(pk, ''),
+                    synced_at=now,
+                    **data,
+                ))
+            cls.objects.bulk_create(
+                rows, update_conflicts=True, unique_fields=['registration'], update_fields=update_fields,
+            )
+            written += len(rows)
+        return written
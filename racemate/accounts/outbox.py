@@ -0,0 +1,95 @@
+# accounts/outbox.py
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+# how long a claimed batch is hidden from other senders before it can be retried
+CLAIM_LEASE = timedelta(minutes=10)
+
+
+def _claim_batch(batch_size):
+    """Lock the next due rows and push their next_attempt_at out so parallel senders skip them."""
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if rows:
+            OutboundEmail.objects.filter(pk__in=[r.pk for r in rows]).update(next_attempt_at=now + CLAIM_LEASE)
+    return rows
+
+
+def _retry_delay(attempts):
+    # 1, 2, 4, 8 ... minutes, capped at one hour
+    return timedelta(minutes=min(60, 2 ** max(0, attempts - 1)))
+
+
+def drain_outbox(batch_size=100, rate=None, max_attempts=None, max_batches=None):
+    """
+    Deliver due outbox rows in batches over one reused mail connection.
+
+    `rate` limits messages per second (0/None = unlimited); failed sends are
+    retried with exponential backoff until `max_attempts`, then marked failed.
+    Returns (sent, failed) counts.
+    """
+    if rate is None:
+        rate = getattr(settings, 'EMAIL_OUTBOX_RATE_PER_SECOND', 0)
+    if max_attempts is None:
+        max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    interval = 1.0 / rate if rate else 0
+
+    sent = failed = batches = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        while max_batches is None or batches < max_batches:
+            rows = _claim_batch(batch_size)
+            if not rows:
+                break
+            batches += 1
+
+            last_send = 0.0
+            for row in rows:
+                if interval:
+                    wait = last_send + interval - time.monotonic()
+                    if wait > 0:
+                        time.sleep(wait)
+                    last_send = time.monotonic()
+
+                message = EmailMessage(
+                    subject=row.subject,
+                    body=row.body,
+                    from_email=row.from_email or None,
+                    to=[row.to_email],
+                    connection=connection,
+                )
+                row.attempts += 1
+                try:
+                    connection.send_messages([message])
+                except Exception as exc:
+                    row.last_error = str(exc)[:1000]
+                    if row.attempts >= max_attempts:
+                        row.status = OutboundEmail.STATUS_FAILED
+                        failed += 1
+                    else:
+                        row.next_attempt_at = timezone.now() + _retry_delay(row.attempts)
+                else:
+                    row.status = OutboundEmail.STATUS_SENT
+                    row.sent_at = timezone.now()
+                    row.last_error = ''
+                    sent += 1
+
+            OutboundEmail.objects.bulk_update(
+                rows, ['status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at']
+            )
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,233 @@
+# accounts/projections.py
+"""
+Row projections for the list pages and exports.
+
+Instead of loading full Registration instances (address and all) and then
+probing them with getattr, each list asks for exactly the columns it shows
+via values_list() and gets back small __slots__ row objects. Which field
+holds a registration's events is worked out once per process (see
+event_layout()), not on every request. The start list reads the flat
+RegistrationReadModel table directly.
+"""
+from functools import lru_cache
+
+from django.apps import apps
+from django.db.models import ForeignKey, ManyToManyField, OneToOneField, Sum
+
+from .models import Registration, RegistrationReadModel, age_expression
+
+# rows fetched per round trip
+CHUNK_SIZE = 2000
+
+# Candidate relation/field names that may hold a registration's event
+CANDIDATE_EVENT_FIELDS = (
+    'event_fk', 'event', 'race', 'race_event', 'event_registration', 'event_name', 'race_name', 'events'
+)
+
+
+class EventLayout:
+    """
+    Where the event lives on Registration: a M2M, a FK, a plain column, or nowhere.
+    """
+    __slots__ = ('kind', 'field', 'label')
+
+    def __init__(self, kind=None, field=None, label=None):
+        self.kind = kind      # 'm2m' | 'fk' | 'plain' | None
+        self.field = field    # field name on Registration
+        self.label = label    # name column on the related model ('name' / 'title')
+
+
+def _label_field(model):
+    for name in ('name', 'title'):
+        try:
+            model._meta.get_field(name)
+            return name
+        except Exception:
+            continue
+    return None
+
+
+@lru_cache(maxsize=None)
+def event_layout():
+    """
+    Resolve the event field layout once. A FK wins over a M2M (as the old
+    per-request probing did), a plain column is the last resort.
+    """
+    found = {}
+    for name in CANDIDATE_EVENT_FIELDS:
+        try:
+            fld = Registration._meta.get_field(name)
+        except Exception:
+            continue
+        if isinstance(fld, (ForeignKey, OneToOneField)):
+            found.setdefault('fk', EventLayout('fk', name, _label_field(fld.related_model)))
+        elif isinstance(fld, ManyToManyField):
+            found.setdefault('m2m', EventLayout('m2m', name, _label_field(fld.related_model)))
+        else:
+            found['plain'] = EventLayout('plain', name)
+    return found.get('fk') or found.get('m2m') or found.get('plain') or EventLayout()
+
+
+@lru_cache(maxsize=None)
+def lap_model():
+    """The Lap model (any app) and its FK to Registration, or (None, None)."""
+    for appcfg in apps.get_app_configs():
+        for m in appcfg.get_models():
+            if m.__name__.lower() == 'lap':
+                for fk in ('registration', 'start_entry'):
+                    if hasattr(m, fk):
+                        return m, fk
+    return None, None
+
+
+def _chunks(qs, fields):
+    """Yield lists of value tuples (pk first) of about CHUNK_SIZE rows."""
+    buf = []
+    for values in qs.values_list('pk', *fields).iterator(chunk_size=CHUNK_SIZE):
+        buf.append(values)
+        if len(buf) >= CHUNK_SIZE:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
+
+
+def event_names(pks):
+    """
+    {registration pk: "Event A, Event B"} for the given registrations, via one
+    query on the M2M through table (or the FK) instead of a prefetch of full objects.
+    """
+    layout = event_layout()
+    if layout.kind in ('m2m', 'fk') and layout.label and pks:
+        out = {}
+        lookup = f'{layout.field}__{layout.label}'
+        pairs = (Registration.objects.filter(pk__in=pks, **{f'{layout.field}__isnull': False})
+                 .order_by('pk', lookup).values_list('pk', lookup))
+        for pk, name in pairs:
+            if name:
+                out[pk] = f'{out[pk]}, {name}' if pk in out else str(name)
+        return out
+    return {}
+
+
+# ------------------------------
+# Start list
+# ------------------------------
+
+class StartListRow:
+    __slots__ = ('pk', 'name', 'bib_public', 'event_display', 'gender', 'gender_display',
+                 'age', 'age_display', 'start_time', 'end_time')
+
+    def __init__(self, pk, name, bib_public, event_display, gender, gender_display, age, start_time, end_time):
+        self.pk = pk
+        self.name = name
+        self.bib_public = bib_public
+        self.event_display = event_display
+        self.gender = gender
+        self.gender_display = gender_display
+        self.age = age
+        self.age_display = str(age) if age is not None else '—'
+        self.start_time = start_time
+        self.end_time = end_time
+
+
+def start_list_rows(qs=None, today=None):
+    """
+    Yield StartListRow objects for registrations that have a bib. Reads the
+    flat RegistrationReadModel table (or `qs` over it): no joins, no prefetch.
+    """
+    if qs is None:
+        qs = RegistrationReadModel.objects.filter(bib_id__isnull=False).order_by('-created_at')
+    qs = qs.annotate(age=age_expression(today))
+
+    fields = ['name', 'bib_public', 'events_display', 'gender', 'gender_display', 'age']
+    for chunk in _chunks(qs, fields):
+        for pk, name, bib_public, events, gender, gender_display, age in chunk:
+            yield StartListRow(
+                pk, name or '', bib_public or '', events or '', gender or '',
+                gender_display or '', age, '', '',
+            )
+
+
+# ------------------------------
+# Results / participation
+# ------------------------------
+
+class ResultRow:
+    __slots__ = ('pk', 'name', 'bib_id', 'gender', 'gender_display', 'has_participation', 'is_participated',
+                 'age_group', 'participation_gender', 'end_time', 'end_time_mmss', 'total_lap_time',
+                 'category_display')
+
+    @property
+    def total_lap_time_display(self):
+        td = self.total_lap_time
+        if td is None:
+            return None
+        total = int(td.total_seconds())
+        hours, rem = divmod(total, 3600)
+        minutes, seconds = divmod(rem, 60)
+        if hours:
+            return f"{hours}:{minutes:02d}:{seconds:02d}"
+        return f"{minutes}:{seconds:02d}"
+
+
+def result_rows(qs=None):
+    """
+    Yield ResultRow objects: registration columns plus its participation, with
+    lap time totals summed in one grouped query per chunk (not one per row).
+    """
+    if qs is None:
+        qs = Registration.objects.all()
+    gender_labels = dict(Registration.GENDER_CHOICES)
+    LapModel, lap_fk = lap_model()
+
+    fields = [
+        'name', 'bib_id', 'gender', 'category', 'participation__id', 'participation__is_participated',
+        'participation__age_group', 'participation__gender', 'participation__end_time',
+        'participation__end_time_mmss', 'participation__total_lap_time',
+    ]
+    for chunk in _chunks(qs, fields):
+        lap_totals = {}
+        if LapModel is not None:
+            lap_totals = dict(
+                LapModel.objects.filter(**{f'{lap_fk}__in': [values[0] for values in chunk]})
+                .values_list(lap_fk).annotate(total=Sum('duration')).values_list(lap_fk, 'total')
+            )
+        for (pk, name, bib_id, gender, category, part_id, is_participated, age_group,
+             part_gender, end_time, end_time_mmss, part_lap_time) in chunk:
+            row = ResultRow()
+            row.pk = pk
+            row.name = name
+            row.bib_id = bib_id
+            row.gender = gender or ''
+            row.gender_display = gender_labels.get(gender, gender) or ''
+            row.has_participation = part_id is not None
+            row.is_participated = bool(is_participated)
+            row.age_group = age_group or ''
+            row.participation_gender = part_gender or ''
+            row.end_time = end_time
+            row.end_time_mmss = end_time_mmss
+            row.total_lap_time = lap_totals.get(pk) or part_lap_time
+            row.category_display = age_group or category or '—'
+            yield row
+
+
+# ------------------------------
+# Admin registration list
+# ------------------------------
+
+class RegistrationListRow:
+    __slots__ = ('pk', 'id', 'name', 'email')
+
+    def __init__(self, pk, name, email):
+        self.pk = self.id = pk
+        self.name = name
+        self.email = email
+
+
+def registration_list_rows(qs=None):
+    if qs is None:
+        qs = Registration.objects.all()
+    for chunk in _chunks(qs, ['name', 'email']):
+        for pk, name, email in chunk:
+            yield RegistrationListRow(pk, name, email)
@@ -0,0 +1,118 @@
+# accounts/search.py
+"""
+Registrant lookup backed by the SQLite FTS5 table `registration_search`.
+
+The index covers name, father's name, mobile, bib and district name of each
+RegistrationReadModel row (rowid = registration id). Triggers on the read
+model table keep it in sync, so every write path that refreshes read rows
+(signals, release_bibs, the refresh commands) updates the index too. Each
+typed word becomes a prefix query ("ram ku" -> "ram"* "ku"*), which suits
+search-as-you-type. A term that looks like (part of) a phone number, such as
+"34936" or "+91 98765", also matches anywhere inside the digits-only
+Registration.mobile_normalized, as help-desk lookups expect.
+
+On other databases, or before the migration has run, search falls back to
+icontains over name and mobile number.
+"""
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'registration_search'
+READ_TABLE = 'accounts_registrationreadmodel'
+
+# words typed into the search box; anything else (+, -, quotes) only separates them
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+# digits with the usual phone punctuation
+_PHONE_RE = re.compile(r'^\+?[\d\s()-]*\d[\d\s()-]*$')
+MAX_TERMS = 8
+
+_FTS_COLUMNS = "(rowid, name, fathers_name, mobile, bib, district)"
+_FTS_VALUES = (
+    "(new.registration_id, new.name, new.fathers_name, "
+    "new.mobile_number || ' ' || substr(new.mobile_number, -10), "
+    "coalesce(new.bib_id, ''), new.district_name)"
+)
+TRIGGER_SQL = [
+    f"CREATE TRIGGER IF NOT EXISTS registration_search_ai AFTER INSERT ON {READ_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE} {_FTS_COLUMNS} VALUES {_FTS_VALUES}; END",
+
+    f"CREATE TRIGGER IF NOT EXISTS registration_search_au AFTER UPDATE ON {READ_TABLE} BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.registration_id; "
+    f"INSERT INTO {FTS_TABLE} {_FTS_COLUMNS} VALUES {_FTS_VALUES}; END",
+
+    f"CREATE TRIGGER IF NOT EXISTS registration_search_ad AFTER DELETE ON {READ_TABLE} BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.registration_id; END",
+]
+
+
+def fts_available(using='default'):
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+def fts_query(term):
+    """FTS5 MATCH expression for a typed search term, or '' if it has no words."""
+    words = _WORD_RE.findall(term or '')[:MAX_TERMS]
+    return ' '.join('"%s"*' % word for word in words)
+
+
+def phone_digits(term):
+    """The mobile_normalized fragment to look for if `term` looks like a phone number, else ''."""
+    from .models import normalize_mobile
+
+    term = (term or '').strip()
+    return normalize_mobile(term) if _PHONE_RE.match(term) else ''
+
+
+def search_registrations(queryset, term, using='default'):
+    """
+    Filter a Registration queryset to rows matching `term`: every typed word
+    must prefix-match a word in one of the indexed columns, or, for phone-like
+    terms, the digits occur anywhere in the normalized mobile number.
+    """
+    term = (term or '').strip()
+    if not term:
+        return queryset
+    if fts_available(using):
+        match = fts_query(term)
+        if not match:
+            return queryset.none()
+        found = Q(pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match,)))
+    else:
+        found = Q(name__icontains=term) | Q(mobile_number__icontains=term)
+    digits = phone_digits(term)
+    if digits:
+        found |= Q(mobile_normalized__contains=digits)
+    return queryset.filter(found)
+
+
+def ensure_triggers(using='default'):
+    """
+    Re-create the sync triggers if they are missing. SQLite drops a table's
+    triggers when a migration rebuilds it (e.g. an AlterField on the read model).
+    """
+    if not fts_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        for sql in TRIGGER_SQL:
+            cursor.execute(sql)
+
+
+def rebuild(using='default'):
+    """Repopulate the index from the read rows. Returns the number of rows indexed."""
+    if not fts_available(using):
+        return 0
+    values = _FTS_VALUES.replace('new.', f'{READ_TABLE}.')[1:-1]
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(f"INSERT INTO {FTS_TABLE} {_FTS_COLUMNS} SELECT {values} FROM {READ_TABLE}")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT count(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
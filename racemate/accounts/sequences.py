@@ -0,0 +1,59 @@
+# accounts/sequences.py
+import os
+import threading
+
+from django.conf import settings
+
+
+class HiLoAllocator:
+    """
+    Hands out numbers from a GlobalSequence counter without touching the shared
+    row for every call.
+
+    Each process leases a block of `block_size` numbers (one locked UPDATE on the
+    GlobalSequence row) and serves them from memory until the block is used up.
+    Numbers left in a block when a worker exits are simply never issued, so the
+    sequence may have gaps but never duplicates.
+    """
+
+    def __init__(self, name, block_size=None):
+        self.name = name
+        self._block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 1
+        self._hi = 0
+        self._pid = None
+
+    @property
+    def block_size(self):
+        if self._block_size:
+            return self._block_size
+        return max(1, int(getattr(settings, 'BIB_HILO_BLOCK_SIZE', 20)))
+
+    def _lease(self):
+        # imported here: accounts.models imports this module
+        from .models import GlobalSequence
+
+        size = self.block_size
+        first = GlobalSequence.reserve_block(self.name, size)
+        self._next = first
+        self._hi = first + size - 1
+        self._pid = os.getpid()
+
+    def next(self):
+        """
+        Return the next number. Must be called outside transaction.atomic():
+        a lease rolled back with the caller's transaction would hand out
+        numbers the database no longer considers taken.
+        """
+        with self._lock:
+            # a forked worker must not reuse its parent's in-memory block
+            if self._pid != os.getpid() or self._next > self._hi:
+                self._lease()
+            value = self._next
+            self._next += 1
+            return value
+
+
+# shared allocator for the trailing bib counter (same row release_bib() uses)
+registration_allocator = HiLoAllocator('registration')
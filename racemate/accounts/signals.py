@@ -0,0 +1,168 @@
+# accounts/signals.py
+"""
+Keep RegistrationReadModel in step with its sources: registration saves,
+changes to the events M2M, and renames of districts, states and events.
+Bulk writes that bypass signals (bulk_update in Registration.release_bibs)
+call RegistrationReadModel.refresh() themselves.
+
+Also: changing a registration's events can switch its category rulebook,
+editing a CategoryRule drops the compiled rulebooks (accounts.categories),
+the analytics rollup (app_admin.rollups) follows registration writes, and any
+such write invalidates cached analysis summaries (app_admin.summary_cache).
+"""
+from collections import Counter
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from app_admin import rollups, summary_cache
+from app_admin.models import CategoryRule, ChangeLogEntry, DimDistrict, DimEventCategory, DimState
+from .categories import clear_rulebooks, recategorize, rulebooks
+from .models import Registration, RegistrationReadModel
+
+
+@receiver(post_save, sender=Registration, dispatch_uid='readmodel_registration_saved')
+def registration_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        # loaddata: related rows may not exist yet
+        return
+    RegistrationReadModel.refresh(Registration.objects.filter(pk=instance.pk))
+
+
+def _events_changed(rows):
+    # event membership is part of the registration for updated_at readers
+    # (conditional GETs, the analysis snapshot)
+    rows.update(updated_at=timezone.now())
+    if any(event_id is not None for event_id in rulebooks()):
+        # some events have their own category rules; recategorize() writes with
+        # update(), so log the category changes to the change feed here
+        changed = recategorize(rows)
+        if changed:
+            ChangeLogEntry.record_many(Registration, changed, ChangeLogEntry.ACTION_UPDATE)
+    RegistrationReadModel.refresh(rows)
+
+
+@receiver(m2m_changed, sender=Registration.events.through, dispatch_uid='readmodel_events_changed')
+def registration_events_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # registration.events.add/remove/clear/set
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            _events_changed(Registration.objects.filter(pk=instance.pk))
+        return
+
+    # event.registrations.add/remove/clear
+    if action == 'pre_clear':
+        instance._readmodel_cleared = list(instance.registrations.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        _events_changed(Registration.objects.filter(pk__in=pk_set or []))
+    elif action == 'post_clear':
+        pks = getattr(instance, '_readmodel_cleared', [])
+        _events_changed(Registration.objects.filter(pk__in=pks))
+
+
+@receiver(post_save, sender=DimDistrict, dispatch_uid='readmodel_district_saved')
+def district_saved(sender, instance, created=False, raw=False, **kwargs):
+    if not created and not raw:
+        RegistrationReadModel.refresh(Registration.objects.filter(district_fk=instance))
+
+
+@receiver(post_save, sender=DimState, dispatch_uid='readmodel_state_saved')
+def state_saved(sender, instance, created=False, raw=False, **kwargs):
+    if not created and not raw:
+        RegistrationReadModel.refresh(Registration.objects.filter(state=instance))
+
+
+@receiver(post_save, sender=DimEventCategory, dispatch_uid='readmodel_event_saved')
+def event_saved(sender, instance, created=False, raw=False, **kwargs):
+    if not created and not raw:
+        RegistrationReadModel.refresh(Registration.objects.filter(events=instance))
+
+
+@receiver(post_save, sender=CategoryRule, dispatch_uid='category_rule_saved')
+@receiver(post_delete, sender=CategoryRule, dispatch_uid='category_rule_deleted')
+def category_rule_changed(sender, **kwargs):
+    # stored categories are updated by the recategorize command / admin action
+    clear_rulebooks()
+
+
+# ------------------------------
+# Analytics rollup: snapshot cell keys before a write, apply the difference after.
+# Connected last so the events handler above has recategorized by then.
+# ------------------------------
+
+@receiver(pre_save, sender=Registration, dispatch_uid='rollup_registration_pre_save')
+def rollup_before_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(rollups.DIMENSION_FIELDS):
+        return
+    instance._rollup_before = rollups.snapshot([instance.pk])
+
+
+@receiver(post_save, sender=Registration, dispatch_uid='rollup_registration_saved')
+def rollup_after_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        rollups.apply_change(Counter(), [instance.pk])
+    elif hasattr(instance, '_rollup_before'):
+        rollups.apply_change(instance.__dict__.pop('_rollup_before'), [instance.pk])
+
+
+@receiver(pre_delete, sender=Registration, dispatch_uid='rollup_registration_pre_delete')
+def rollup_before_delete(sender, instance, **kwargs):
+    instance._rollup_before = rollups.snapshot([instance.pk])
+
+
+@receiver(post_delete, sender=Registration, dispatch_uid='rollup_registration_deleted')
+def rollup_after_delete(sender, instance, **kwargs):
+    before = instance.__dict__.pop('_rollup_before', None)
+    if before:
+        rollups.apply_delta(Counter({key: -n for key, n in before.items()}))
+
+
+@receiver(m2m_changed, sender=Registration.events.through, dispatch_uid='rollup_events_changed')
+def rollup_events_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action.startswith('pre_'):
+        if not reverse:
+            pks = [instance.pk]
+        elif action == 'pre_clear':
+            pks = list(instance.registrations.values_list('pk', flat=True))
+        else:
+            pks = list(pk_set or [])
+        instance._rollup_pending = (pks, rollups.snapshot(pks))
+    elif action.startswith('post_') and hasattr(instance, '_rollup_pending'):
+        pks, before = instance.__dict__.pop('_rollup_pending')
+        rollups.apply_change(before, pks)
+
+
+@receiver(pre_delete, sender=DimEventCategory, dispatch_uid='rollup_event_pre_delete')
+def rollup_before_event_delete(sender, instance, **kwargs):
+    # the cascade removes M2M rows without m2m_changed
+    pks = list(instance.registrations.values_list('pk', flat=True))
+    instance._rollup_pending = (pks, rollups.snapshot(pks))
+
+
+@receiver(post_delete, sender=DimEventCategory, dispatch_uid='rollup_event_deleted')
+def rollup_after_event_delete(sender, instance, **kwargs):
+    if hasattr(instance, '_rollup_pending'):
+        pks, before = instance.__dict__.pop('_rollup_pending')
+        rollups.apply_change(before, pks)
+        Registration.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+
+# ------------------------------
+# Cached analysis summaries: any registration or dimension write bumps the data version
+# ------------------------------
+
+@receiver(post_save, sender=Registration, dispatch_uid='summary_cache_registration_saved')
+@receiver(post_delete, sender=Registration, dispatch_uid='summary_cache_registration_deleted')
+@receiver(m2m_changed, sender=Registration.events.through, dispatch_uid='summary_cache_events_changed')
+@receiver(post_save, sender=DimState, dispatch_uid='summary_cache_state_saved')
+@receiver(post_save, sender=DimEventCategory, dispatch_uid='summary_cache_event_saved')
+@receiver(post_delete, sender=DimEventCategory, dispatch_uid='summary_cache_event_deleted')
+def invalidate_summaries(sender, action=None, raw=False, **kwargs):
+    if raw or (action is not None and not action.startswith('post_')):
+        return
+    summary_cache.bump_data_version()
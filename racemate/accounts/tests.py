@@ -1,3 +1,227 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.admin import RegistrationAdmin
+from accounts.dedupe import dedupe_rows, duplicate_check, rebuild_keys
+from accounts.models import (
+    AGE_BAND_CHOICES, GlobalSequence, OutboundEmail, Registration, _years_before, age_band, normalize_mobile,
+    split_bib,
+)
+from accounts.search import search_registrations
+from app_bib.filters import RegistrationFilter
+from app_admin.models import CategoryRule, ChangeLogEntry, DimDistrict, DimEventCategory, DimEventType, DimState
+
+
+class BibTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        state = DimState.objects.create(name='Uttar Pradesh')
+        cls.district = DimDistrict.objects.create(state=state, name='Lucknow', code='LKO')
+
+    def registration(self, name, **fields):
+        return Registration.objects.create(
+            name=name, gender='male', date_of_birth=date(1990, 1, 1),
+            state=self.district.state, district_fk=self.district, **fields
+        )
+
+    def test_collision_retries_with_a_fresh_block(self):
+        reg = self.registration('Runner')
+        # a legacy bib already holds the number the first block would hand out
+        Registration.objects.filter(pk=self.registration('Legacy').pk).update(bib_id=reg._format_bib(1))
+
+        released = Registration.release_bibs(Registration.objects.filter(pk=reg.pk))
+
+        self.assertEqual([r.pk for r in released], [reg.pk])
+        reg.refresh_from_db()
+        self.assertEqual(reg.bib_id, reg._format_bib(2))
+        self.assertEqual(GlobalSequence.objects.get(name='registration').seq, 2)
+
+    def test_parts_that_do_not_fit_keep_only_the_public_bib(self):
+        self.assertEqual(split_bib('LKO-U23-M-2026-0001')['gender'], 'M')
+        for bib in ('LUCKNOW-CITY-U23-M-2026-0001', 'LKO-U23-MALE-2026-0001', 'LKO-UNDERTWENTYTHREE-M-2026-0001'):
+            with self.subTest(bib=bib):
+                parts = split_bib(bib)
+                self.assertEqual(parts['public'], bib)
+                self.assertIsNone(parts['district_code'])
+                self.assertIsNone(parts['gender'])
+        reg = self.registration('Legacy')
+        reg.bib_id = 'LKO-U23-MALE-2026-0001'
+        reg.save()
+        reg.refresh_from_db()
+        self.assertEqual((reg.bib_public, reg.bib_gender), ('LKO-U23-MALE-2026-0001', None))
+
+    def test_bib_email_is_queued_in_the_release_transaction(self):
+        reg = self.registration('Runner', email='runner@example.com')
+        with mock.patch.object(OutboundEmail, 'save', side_effect=RuntimeError('outbox down')):
+            with self.assertRaises(RuntimeError):
+                reg.release_bib(notify=True)
+        # no email, no bib: the release rolled back with the failed queue write
+        self.assertIsNone(Registration.objects.get(pk=reg.pk).bib_id)
+
+        reg = Registration.objects.get(pk=reg.pk)
+        reg.release_bib(notify=True)
+        self.assertEqual(OutboundEmail.objects.filter(to_email='runner@example.com').count(), 1)
+
+    def test_admin_search_matches_short_numbers_in_bibs_and_names(self):
+        with_bib = self.registration('Runner')
+        Registration.release_bibs(Registration.objects.filter(pk=with_bib.pk))
+        named = self.registration('Gate 1 Volunteer')
+        self.registration('Someone Else')
+
+        model_admin = RegistrationAdmin(Registration, admin.site)
+        results, _ = model_admin.get_search_results(None, Registration.objects.all(), '1')
+
+        self.assertEqual(set(results.values_list('pk', flat=True)), {with_bib.pk, named.pk})
+
+
+class SearchTests(TestCase):
+
+    def test_phone_fragments_match_anywhere_in_the_number(self):
+        reg = Registration.objects.create(name='Ram Kumar', mobile_number='9876543210')
+        Registration.objects.create(name='Shyam', mobile_number='9123456789')
+        for term in ('ram ku', '98765', '65432', '+91 98765', '09876543210', '+91-98765-43210'):
+            with self.subTest(term=term):
+                found = search_registrations(Registration.objects.all(), term)
+                self.assertEqual(list(found.values_list('pk', flat=True)), [reg.pk])
+
+
+class DedupeTests(TestCase):
+
+    def test_normalize_mobile_variants(self):
+        for value in ('9876543210', '09876543210', '+91 98765 43210', '+91-98765-43210', '919876543210'):
+            with self.subTest(value=value):
+                self.assertEqual(normalize_mobile(value), '919876543210')
+        self.assertEqual(normalize_mobile(''), '')
+        self.assertEqual(normalize_mobile('+1 415 555 0100'), '14155550100')
+
+    def test_duplicate_check_matches_any_format(self):
+        reg = Registration.objects.create(name='Ram', mobile_number='+91 98765 43210', aadhar_number='123456789012')
+        for mobile in ('9876543210', '09876543210', '+919876543210'):
+            with self.subTest(mobile=mobile):
+                self.assertEqual(duplicate_check(mobile=mobile, aadhar='1234 5678 9012'), {'mobile': True, 'aadhar': True})
+        self.assertEqual(duplicate_check(mobile='98765'), {'mobile': False})  # still typing
+        self.assertEqual(duplicate_check(mobile='9876543210', exclude_pk=reg.pk), {'mobile': False})
+
+    def test_report_groups_duplicates_by_key(self):
+        first = Registration.objects.create(name='Ram', mobile_number='9876543210', aadhar_number='123456789012')
+        second = Registration.objects.create(name='Ram K', mobile_number='+91 98765 43210')
+        third = Registration.objects.create(name='Shyam', mobile_number='9123456789', aadhar_number='123456789012')
+        Registration.objects.create(name='Unique', mobile_number='9000000000')
+
+        rows = list(dedupe_rows())
+
+        self.assertEqual([(kind, size, pk) for kind, _, size, pk, *_ in rows],
+                         [('mobile', 2, first.pk), ('mobile', 2, second.pk), ('aadhar', 2, first.pk), ('aadhar', 2, third.pk)])
+        self.assertEqual({row[1] for row in rows[:2]}, {'919876543210'})
+        self.assertEqual([row[6] for row in rows[2:]], ['9012', '9012'])  # only the last four digits
+
+    def test_rebuild_keys_repairs_stale_keys(self):
+        reg = Registration.objects.create(name='Ram', mobile_number='09876543210', aadhar_number='123456789012')
+        Registration.objects.filter(pk=reg.pk).update(mobile_normalized='', aadhar_hash='')
+
+        self.assertEqual(rebuild_keys(), 1)
+        self.assertEqual(rebuild_keys(), 0)
+        self.assertTrue(duplicate_check(mobile='9876543210', aadhar='123456789012')['aadhar'])
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], DUPLICATE_CHECK_RATE_PER_MINUTE=2)
+class DuplicateCheckThrottleTests(TestCase):
+
+    def check(self, **meta):
+        return self.client.get(reverse('accounts:ajax_check_duplicate'), {'mobile': '9876543210'}, **meta).status_code
+
+    def test_forged_forwarded_for_does_not_reset_the_limit(self):
+        codes = [self.check(HTTP_X_FORWARDED_FOR=f'10.0.0.{i}') for i in range(3)]
+        self.assertEqual(codes, [200, 200, 429])
+
+    @override_settings(TRUSTED_PROXY_COUNT=1)
+    def test_behind_a_proxy_the_appended_entry_is_the_client(self):
+        codes = [self.check(HTTP_X_FORWARDED_FOR=f'10.0.0.{i}, 203.0.113.7') for i in range(3)]
+        self.assertEqual(codes, [200, 200, 429])
+        self.assertEqual(self.check(HTTP_X_FORWARDED_FOR='203.0.113.8'), 200)
+
+
+class CategoryTests(TestCase):
+
+    def test_event_rulebook_change_is_logged(self):
+        state = DimState.objects.create(name='Uttar Pradesh')
+        event = DimEventCategory.objects.create(event_type=DimEventType.objects.create(name='Road'), name='10K')
+        CategoryRule.objects.create(event=event, category='Open')  # no age bounds
+        reg = Registration.objects.create(name='Runner', gender='male', date_of_birth=date(1990, 1, 1), state=state)
+        logged = ChangeLogEntry.objects.filter(model='accounts.registration', object_id=reg.pk)
+        before = logged.count()
+
+        reg.events.add(event)
+
+        reg.refresh_from_db()
+        self.assertEqual(reg.category, 'Open')
+        self.assertEqual(logged.count(), before + 1)
+
+
+class AgeTests(TestCase):
+    # a leap day, the day before and after it in a common year, and an ordinary day
+    ON_DATES = [date(2024, 2, 29), date(2025, 2, 28), date(2025, 3, 1), date(2026, 6, 15)]
+    BAND_EDGES = (17, 18, 29, 30, 45, 46, 55, 56)
+
+    @classmethod
+    def setUpTestData(cls):
+        dobs = {date(2000, 2, 29), date(2004, 2, 29), date(2008, 2, 29)}
+        for on_date in cls.ON_DATES:
+            for age in cls.BAND_EDGES:
+                birthday = _years_before(on_date, age)
+                dobs.update({birthday - timedelta(days=1), birthday, birthday + timedelta(days=1)})
+        Registration.objects.bulk_create(
+            [Registration(name=f'Runner {dob}', date_of_birth=dob) for dob in sorted(dobs)]
+        )
+        Registration.objects.create(name='No DOB')
+
+    def test_sql_age_matches_age_on(self):
+        for on_date in self.ON_DATES:
+            with self.subTest(on_date=on_date):
+                for reg in Registration.objects.with_age(on_date):
+                    self.assertEqual(reg.age, reg.age_on(on_date) if reg.date_of_birth else None, reg.date_of_birth)
+
+    def test_stored_bands_match_age_on_at_the_edges(self):
+        for on_date in self.ON_DATES:
+            with self.subTest(on_date=on_date):
+                Registration.objects.all().refresh_age_bands(on_date)
+                expected = {
+                    reg.pk: age_band(reg.age_on(on_date))
+                    for reg in Registration.objects.all()
+                }
+                self.assertEqual(dict(Registration.objects.values_list('pk', 'age_band')), expected)
+                for key, _ in AGE_BAND_CHOICES:
+                    filtered = RegistrationFilter(data={'age_group': key}, queryset=Registration.objects.all()).qs
+                    self.assertEqual(set(filtered.values_list('pk', flat=True)),
+                                     {pk for pk, band in expected.items() if band == key}, key)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], CRON_SECRET='s3cret', EMAIL_OUTBOX_RATE_PER_SECOND=0)
+class SendOutboxViewTests(TestCase):
+
+    def setUp(self):
+        OutboundEmail.objects.create(to_email='runner@example.com', subject='Your Bib ID', body='...')
+
+    def test_cron_get_needs_the_secret(self):
+        url = reverse('accounts:send_outbox')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer s3cret')
+
+        self.assertEqual(response.json(), {'sent': 1, 'failed': 0, 'pending': 0})
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_staff_can_post(self):
+        url = reverse('accounts:send_outbox')
+        self.assertEqual(self.client.post(url).status_code, 403)
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+
+        self.assertEqual(self.client.post(url).json()['sent'], 1)
@@ -32,6 +32,8 @@ urlpatterns = [
     path('', views.home, name='home'),                     # home page
     path('register/', views.register, name='register'),    # registration form
     path('ajax/districts/', views.ajax_load_districts, name='ajax_load_districts'),
+    path('ajax/check-duplicate/', views.ajax_check_duplicate, name='ajax_check_duplicate'),
+    path('cron/send-outbox/', views.send_outbox, name='send_outbox'),
 
     path('analysis/', admin_views.analysis_dashboard, name='analysis_dashboard'),
     path('api/analysis/summary/', admin_views.api_analysis_summary, name='api_analysis_summary'),
@@ -1,16 +1,26 @@
 # accounts/views.py
+import hmac
+import logging
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.urls import reverse
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.http import JsonResponse, HttpResponseBadRequest
-from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.http import require_GET, require_POST, require_http_methods
+from django.conf import settings
+
+from django.core.cache import cache
 
-from .models import Registration
+from .dedupe import duplicate_check
+from .models import OutboundEmail, Registration
+from .outbox import drain_outbox
 from .forms import RegistrationForm
 from django.utils.safestring import mark_safe
 
-from app_admin.models import DimDistrict, DimState  # used for ajax districts
+from app_admin import refdata  # states and districts for the form and ajax districts
+
+logger = logging.getLogger(__name__)
 
 def home(request):
     """
@@ -96,7 +106,20 @@ def register(request):
             # perform any pre-save tweaks here (e.g., default category)
             reg.save()
             form.save_m2m()
-            messages.success(request, "Registration submitted. Thank you!")
+
+            # issue the bib straight away (hi-lo allocator, no per-runner lock)
+            if getattr(settings, 'BIB_ISSUE_ON_REGISTER', False) and reg.district_fk_id:
+                try:
+                    reg.release_bib_instant(notify=True)
+                except Exception:
+                    # never fail a registration because of bib issuance; staff can generate later
+                    logger.exception("Bib issuance failed for registration %s", reg.pk)
+                    reg.bib_id = None
+
+            if reg.bib_id:
+                messages.success(request, f"Registration submitted. Your Bib ID is {reg.bib_id}. Thank you!")
+            else:
+                messages.success(request, "Registration submitted. Thank you!")
             return redirect(reverse('accounts:home'))
         else:
             messages.error(request, "Please correct the errors below.")
@@ -104,7 +127,7 @@ def register(request):
         form = RegistrationForm()
 
     # supply states for the state select if your form template expects it
-    states = DimState.objects.all().order_by('name')
+    states = refdata.get().states
     return render(request, 'accounts/register.html', {
         'form': form,
         'states': states,
@@ -122,14 +145,79 @@ def ajax_load_districts(request):
         return JsonResponse({'error': 'state_id required'}, status=400)
 
     try:
-        districts = DimDistrict.objects.filter(state_id=state_id).order_by('name')
-    except Exception:
+        districts = refdata.get().districts_of(int(state_id))
+    except (ValueError, TypeError):
         # defensive fallback: return empty list rather than 500
         return JsonResponse({'districts': []})
 
     result = [{'id': d.id, 'name': d.name} for d in districts]
     return JsonResponse({'districts': result})
 
+
+def _client_ip(request):
+    """
+    Client address for throttling. Behind TRUSTED_PROXY_COUNT proxies that each
+    append to X-Forwarded-For, the entry the outermost one added; anything to
+    its left came from the client and can be forged. Otherwise REMOTE_ADDR.
+    """
+    proxies = getattr(settings, 'TRUSTED_PROXY_COUNT', 0)
+    if proxies > 0:
+        forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+@require_GET
+def ajax_check_duplicate(request):
+    """
+    AJAX endpoint for the register form: ?mobile=...&aadhar=... returns
+    {'mobile': bool, 'aadhar': bool} (already registered or not). Only yes/no,
+    never who; throttled per client so it can't be used to sweep numbers.
+    """
+    mobile = request.GET.get('mobile')
+    aadhar = request.GET.get('aadhar')
+    if mobile is None and aadhar is None:
+        return JsonResponse({'error': 'mobile or aadhar required'}, status=400)
+
+    rate = getattr(settings, 'DUPLICATE_CHECK_RATE_PER_MINUTE', 30)
+    if rate > 0:
+        key = f'dupcheck:{_client_ip(request)}'
+        # add + incr is a read and a write on DatabaseCache, not atomic: concurrent
+        # requests can undercount, so this is a soft limit
+        cache.add(key, 0, 60)
+        try:
+            hits = cache.incr(key)
+        except ValueError:
+            hits = 1
+        if hits > rate:
+            return JsonResponse({'error': 'too many requests'}, status=429)
+
+    return JsonResponse(duplicate_check(mobile=mobile, aadhar=aadhar))
+
+
+@require_http_methods(['GET', 'POST'])
+def send_outbox(request):
+    """
+    Send one batch of queued outbox emails: the HTTP counterpart of the
+    send_outbox command for deployments without a worker. Vercel Cron calls it
+    with GET and "Authorization: Bearer $CRON_SECRET"; staff can POST to it.
+    """
+    if request.method == 'GET':
+        secret = getattr(settings, 'CRON_SECRET', '')
+        given = request.META.get('HTTP_AUTHORIZATION', '')
+        allowed = bool(secret) and hmac.compare_digest(given.encode(), f'Bearer {secret}'.encode())
+    else:
+        allowed = request.user.is_active and request.user.is_staff
+    if not allowed:
+        return JsonResponse({'error': 'forbidden'}, status=403)
+
+    sent, failed = drain_outbox(
+        batch_size=getattr(settings, 'EMAIL_OUTBOX_REQUEST_BATCH_SIZE', 50), max_batches=1,
+    )
+    pending = OutboundEmail.objects.filter(status=OutboundEmail.STATUS_PENDING).count()
+    return JsonResponse({'sent': sent, 'failed': failed, 'pending': pending})
+
 from django.contrib.auth.decorators import login_required
 
 @login_required
@@ -7,9 +7,10 @@
 
 
 from django.contrib import admin
+from . import refdata
 from .models import (
     DimState, DimDistrict, DimGender, DimEventType,
-    DimEventCategory, dimDate
+    DimEventCategory, dimDate, ExportJob, ExportPart, ChangeLogEntry, CategoryRule
 )
 
 @admin.register(DimState)
@@ -23,13 +24,25 @@ class DimStateAdmin(admin.ModelAdmin):
 
 @admin.register(DimDistrict)
 class DimDistrictAdmin(admin.ModelAdmin):
-    list_display = ("id", "code", "name", "state")   # show code in list
+    list_display = ("id", "code", "name", "state_name")  # show code in list
     list_editable = ("code",)                        # allow inline editing of code
     search_fields = ("name", "code", "state__name")  # enable searching by code too
     list_filter = ("state",)
     ordering = ("state__name", "name")
     list_per_page = 200
 
+    # state names and the state <select> come from the cached reference data
+    @admin.display(description="State", ordering="state__name")
+    def state_name(self, obj):
+        state = refdata.get().state_by_id.get(obj.state_id)
+        return state.label if state else ""
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        field = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == "state":
+            field.choices = [("", field.empty_label or "---------")] + refdata.get().state_choices()
+        return field
+
 @admin.register(DimGender)
 class DimGenderAdmin(admin.ModelAdmin):
     pass
@@ -38,13 +51,60 @@ class DimGenderAdmin(admin.ModelAdmin):
 class DimEventTypeAdmin(admin.ModelAdmin):
     search_fields = ("name",)
 
+class CategoryRuleInline(admin.TabularInline):
+    model = CategoryRule
+    extra = 0
+    fields = ("min_age", "max_age", "category")
+
+
 @admin.register(DimEventCategory)
 class DimEventCategoryAdmin(admin.ModelAdmin):
     list_display = ("name", "event_type")
     list_filter = ("event_type",)
+    inlines = [CategoryRuleInline]
+
+
+@admin.register(CategoryRule)
+class CategoryRuleAdmin(admin.ModelAdmin):
+    list_display = ("event", "min_age", "max_age", "category")
+    list_filter = ("event",)
+    ordering = ("event", "min_age")
+    actions = ["recategorize_registrations"]
+
+    @admin.action(description="Recompute all registration categories")
+    def recategorize_registrations(self, request, queryset):
+        from django.core.management import call_command
+
+        call_command("recategorize")
+        self.message_user(request, "Registration categories recomputed.")
 
 @admin.register(dimDate)
 class dimDateAdmin(admin.ModelAdmin):
     list_display = ("date", "year", "quarter")
     search_fields = ("date",)
 
+class ExportPartInline(admin.TabularInline):
+    model = ExportPart
+    extra = 0
+    readonly_fields = ("index", "pk_lo", "pk_hi", "status", "rows", "claimed_at")
+    can_delete = False
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "parts_done", "parts_total", "rows_total", "size", "created_by", "created_at")
+    list_filter = ("kind", "status")
+    readonly_fields = ("file", "size", "created_at", "finished_at")
+    inlines = [ExportPartInline]
+
+@admin.register(ChangeLogEntry)
+class ChangeLogEntryAdmin(admin.ModelAdmin):
+    list_display = ("seq", "model", "object_id", "action", "changed_at")
+    list_filter = ("model", "action")
+    search_fields = ("object_id",)
+
+    # append-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
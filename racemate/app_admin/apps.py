@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AppAdminConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_admin'
+
+    def ready(self):
+        # change feed: log deletes of change-logged models; reference data cache invalidation
+        from . import signals  # noqa: F401
@@ -0,0 +1,135 @@
+# app_admin/dates.py
+"""
+Integer date keys (YYYYMMDD) and the dimDate calendar rows behind them.
+
+Registration.created_date_key holds the local creation day as such a key, so
+daily counts group on an indexed integer and join dimDate.date_key instead of
+truncating timestamps. calendar_summary() turns {key: count} into gap-free
+day/month/quarter series and weekday/weekend breakdowns from one range read
+of dimDate.
+
+populate() fills dimDate with the days it is missing, a window at a time.
+"""
+from datetime import date, datetime, timedelta
+
+from django.utils import timezone
+
+from .models import dimDate
+
+# the range dimDate is populated for by default
+DEFAULT_FIRST_DATE = date(1950, 1, 1)
+DEFAULT_LAST_DATE = date(2099, 12, 31)
+
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def date_key(value):
+    """YYYYMMDD integer for a date or datetime (aware datetimes in the current time zone); None for None."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value.year * 10000 + value.month * 100 + value.day
+
+
+def key_date(key):
+    return date(key // 10000, key // 100 % 100, key % 100)
+
+
+def calendar_row(day):
+    """The dimDate column values for `day`."""
+    return {
+        'date_key': date_key(day),
+        'date': day,
+        'year': day.year,
+        'month': day.month,
+        'day': day.day,
+        'month_name': day.strftime('%B'),
+        'day_name': WEEKDAY_NAMES[day.weekday()],
+        'quarter': (day.month - 1) // 3 + 1,
+        'is_weekend': day.weekday() >= 5,
+    }
+
+
+def _days(first, last):
+    day = first
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+def populate(first=DEFAULT_FIRST_DATE, last=DEFAULT_LAST_DATE, batch_size=5000):
+    """
+    Insert the dimDate rows missing between `first` and `last` (inclusive).
+    Works through the range in windows of `batch_size` days: one indexed read
+    of the keys already present, then one insert of the rest, so a re-run
+    over a populated range only reads and memory is bounded by the window.
+    Inserts upsert on date_key, so concurrent runs don't collide.
+    Returns the number of rows written.
+    """
+    written = 0
+    window_start = first
+    while window_start <= last:
+        window_end = min(last, window_start + timedelta(days=batch_size - 1))
+        present = set(dimDate.objects.filter(
+            date_key__range=(date_key(window_start), date_key(window_end)),
+        ).values_list('date_key', flat=True))
+        missing = [
+            dimDate(**calendar_row(day)) for day in _days(window_start, window_end) if date_key(day) not in present
+        ]
+        if missing:
+            dimDate.objects.bulk_create(
+                missing, update_conflicts=True, unique_fields=['date_key'],
+                update_fields=['date', 'year', 'month', 'day', 'month_name', 'day_name', 'quarter', 'is_weekend'],
+            )
+            written += len(missing)
+        window_start = window_end + timedelta(days=1)
+    return written
+
+
+def calendar_rows(first_key, last_key):
+    """
+    Calendar rows for every day from first_key to last_key, read from dimDate
+    in one index range scan; days dimDate doesn't cover yet are derived here.
+    """
+    fields = ('date_key', 'date', 'year', 'month', 'month_name', 'day_name', 'quarter', 'is_weekend')
+    stored = {
+        row['date_key']: row
+        for row in dimDate.objects.filter(date_key__range=(first_key, last_key)).order_by().values(*fields)
+    }
+    for day in _days(key_date(first_key), key_date(last_key)):
+        yield stored.get(date_key(day)) or calendar_row(day)
+
+
+def calendar_summary(counts):
+    """
+    Payload entries built from {date key: registrations}: a gap-free daily
+    `series` (zero days included), `by_month`, `by_quarter`, `by_weekday` and
+    `by_day_type` (weekday / weekend).
+    """
+    keys = [key for key, n in counts.items() if key and n]
+    series, by_month, by_quarter = [], {}, {}
+    by_weekday = dict.fromkeys(WEEKDAY_NAMES, 0)
+    by_day_type = {'weekday': 0, 'weekend': 0}
+    if keys:
+        for row in calendar_rows(min(keys), max(keys)):
+            n = counts.get(row['date_key'], 0)
+            series.append({'day': row['date'].isoformat(), 'count': n})
+            month = by_month.setdefault(
+                (row['year'], row['month']),
+                {'month': f"{row['year']}-{row['month']:02d}", 'label': f"{row['month_name']} {row['year']}", 'count': 0},
+            )
+            month['count'] += n
+            quarter = by_quarter.setdefault(
+                (row['year'], row['quarter']), {'quarter': f"{row['year']}-Q{row['quarter']}", 'count': 0},
+            )
+            quarter['count'] += n
+            by_weekday[row['day_name']] = by_weekday.get(row['day_name'], 0) + n
+            by_day_type['weekend' if row['is_weekend'] else 'weekday'] += n
+    return {
+        'series': series,
+        'by_month': list(by_month.values()),
+        'by_quarter': list(by_quarter.values()),
+        'by_weekday': [{'day_name': name, 'count': n} for name, n in by_weekday.items()],
+        'by_day_type': [{'type': name, 'count': n} for name, n in by_day_type.items()],
+    }
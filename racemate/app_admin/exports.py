@@ -0,0 +1,271 @@
+# app_admin/exports.py
+"""
+Background CSV exports.
+
+An ExportJob is split into ExportPart rows by registration id range. Workers
+(run_export_jobs, or the status poll on serverless) claim parts one at a time
+and write each as its own gzip member under MEDIA_ROOT/exports/<job>/. When the
+last part lands, the parts are concatenated into a single .csv.gz file (a
+multi-member gzip stream is still one valid gzip file).
+"""
+import itertools
+import json
+import math
+import os
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Min, Q
+from django.db.models.expressions import RawSQL
+from django.http import QueryDict
+from django.utils import timezone
+
+from accounts.csvstream import csv_chunks, gzip_chunks
+from accounts.models import Registration
+from .models import ExportJob, ExportPart
+
+EXPORT_DIR = 'exports'
+
+# a claimed part that has not finished after this long is handed to another worker
+CLAIM_LEASE = timedelta(minutes=15)
+
+
+def _in_range(qs, pk_lo, pk_hi):
+    if pk_lo is not None:
+        qs = qs.filter(pk__gte=pk_lo, pk__lte=pk_hi)
+    return qs
+
+
+def _analysis_queryset(params, pk_lo=None, pk_hi=None):
+    from .views import filter_registrations
+    return _in_range(filter_registrations(params), pk_lo, pk_hi)
+
+
+def _analysis_rows(qs):
+    from .views import analysis_rows
+    return analysis_rows(qs)
+
+
+def _start_list_queryset(params, pk_lo=None, pk_hi=None):
+    from app_bib.views import start_list_queryset
+    return _in_range(start_list_queryset(), pk_lo, pk_hi)
+
+
+def _start_list_rows(qs):
+    from app_bib.views import start_list_rows
+    return start_list_rows(qs)
+
+
+def _bib_list_queryset(params, pk_lo=None, pk_hi=None):
+    from app_bib.filters import RegistrationFilter
+    qs = RegistrationFilter(data=params, queryset=Registration.objects.all()).qs
+    return _in_range(qs, pk_lo, pk_hi)
+
+
+def _bib_list_rows(qs):
+    from app_bib.views import RegistrationBibListView
+    return RegistrationBibListView().export_rows(qs)
+
+
+def pk_runs(pks):
+    """Compact text for a sorted iterable of ids: runs of consecutive ids as "lo-hi" ("1-500,502,510-900")."""
+    runs = []
+    for pk in pks:
+        if runs and runs[-1][1] == pk - 1:
+            runs[-1][1] = pk
+        else:
+            runs.append([pk, pk])
+    return ','.join(str(lo) if lo == hi else f'{lo}-{hi}' for lo, hi in runs)
+
+
+def _parse_pk_runs(text, pk_lo=None, pk_hi=None):
+    """Ids listed in pk_runs() text, limited to pk_lo..pk_hi when given."""
+    for item in text.split(','):
+        lo, _, hi = item.strip().partition('-')
+        if not lo.isdigit() or (hi and not hi.isdigit()):
+            continue
+        lo, hi = int(lo), int(hi or lo)
+        if pk_lo is not None:
+            lo, hi = max(lo, pk_lo), min(hi, pk_hi)
+        yield from range(lo, hi + 1)
+
+
+def _registrations_queryset(params, pk_lo=None, pk_hi=None):
+    # explicit selection from the admin action: "ids=1-500,502,510-900"
+    ids = list(_parse_pk_runs(params.get('ids', ''), pk_lo, pk_hi))
+    qs = _in_range(Registration.objects.all(), pk_lo, pk_hi)
+    if connection.vendor == 'sqlite':
+        # one JSON parameter instead of one bound variable per id
+        # (a large selection exceeds SQLite's variable limit)
+        return qs.filter(pk__in=RawSQL("SELECT value FROM json_each(%s)", (json.dumps(ids),)))
+    return qs.filter(pk__in=ids)
+
+
+def _registrations_rows(qs):
+    from accounts.admin import registration_rows
+    return registration_rows(qs)
+
+
+# kind -> (label, queryset(params, pk_lo, pk_hi), rows(qs) yielding header first)
+EXPORT_KINDS = {
+    'analysis': ("Analysis registrations", _analysis_queryset, _analysis_rows),
+    'start_list': ("Start list", _start_list_queryset, _start_list_rows),
+    'bib_list': ("Bib list", _bib_list_queryset, _bib_list_rows),
+    'registrations': ("Selected registrations", _registrations_queryset, _registrations_rows),
+}
+
+
+def _job_dir(job):
+    return Path(settings.MEDIA_ROOT) / EXPORT_DIR / str(job.pk)
+
+
+def _part_path(part):
+    return _job_dir(part.job) / f"part-{part.index:05d}.csv.gz"
+
+
+def create_export_job(kind, params='', user=None, rows_per_part=None):
+    """
+    Queue an export of `kind` for the filters in `params` (a querystring) and
+    split it into id-range parts of about `rows_per_part` rows.
+    """
+    if kind not in EXPORT_KINDS:
+        raise ValueError(f"Unknown export kind: {kind}")
+    if rows_per_part is None:
+        rows_per_part = getattr(settings, 'EXPORT_ROWS_PER_PART', 20000)
+
+    label, queryset, rows = EXPORT_KINDS[kind]
+    stats = queryset(QueryDict(params)).aggregate(lo=Min('pk'), hi=Max('pk'), n=Count('pk'))
+    lo, hi, n = stats['lo'] or 0, stats['hi'] or 0, stats['n'] or 0
+
+    parts_total = max(1, math.ceil(n / rows_per_part))
+    width = max(1, math.ceil((hi - lo + 1) / parts_total))
+
+    with transaction.atomic():
+        job = ExportJob.objects.create(
+            kind=kind, params=params, rows_total=n, parts_total=parts_total, created_by=user,
+        )
+        ExportPart.objects.bulk_create([
+            ExportPart(
+                job=job, index=i,
+                pk_lo=lo + i * width,
+                pk_hi=hi if i == parts_total - 1 else lo + (i + 1) * width - 1,
+            )
+            for i in range(parts_total)
+        ])
+    return job
+
+
+def claim_part():
+    """
+    Claim the next pending (or abandoned) part. The claim is an optimistic
+    conditional UPDATE, so parallel workers never build the same part.
+    """
+    now = timezone.now()
+    candidates = (
+        ExportPart.objects
+        .filter(Q(status=ExportPart.STATUS_PENDING) |
+                Q(status=ExportPart.STATUS_RUNNING, claimed_at__lt=now - CLAIM_LEASE))
+        .exclude(job__status__in=[ExportJob.STATUS_DONE, ExportJob.STATUS_FAILED])
+        .order_by('job_id', 'index')[:20]
+    )
+    for part in candidates:
+        claimed = ExportPart.objects.filter(
+            pk=part.pk, status=part.status, claimed_at=part.claimed_at
+        ).update(status=ExportPart.STATUS_RUNNING, claimed_at=now)
+        if claimed:
+            ExportJob.objects.filter(pk=part.job_id, status=ExportJob.STATUS_PENDING).update(
+                status=ExportJob.STATUS_RUNNING
+            )
+            part.status, part.claimed_at = ExportPart.STATUS_RUNNING, now
+            return part
+    return None
+
+
+def build_part(part):
+    """Write one part as a gzip member; the first part carries BOM + header."""
+    job = part.job
+    label, queryset, rows = EXPORT_KINDS[job.kind]
+    qs = queryset(QueryDict(job.params), part.pk_lo, part.pk_hi).order_by('pk')
+
+    row_iter = rows(qs)
+    header = next(row_iter)
+    written = 0
+
+    def counted():
+        nonlocal written
+        for row in row_iter:
+            written += 1
+            yield row
+
+    lines = itertools.chain([header], counted()) if part.index == 0 else counted()
+
+    path = _part_path(part)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # a unique temp name: after CLAIM_LEASE two workers may build the same part
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + '.', suffix='.tmp', delete=False) as fh:
+        try:
+            for data in gzip_chunks(csv_chunks(lines, bom=part.index == 0)):
+                fh.write(data)
+        except BaseException:
+            fh.close()
+            os.unlink(fh.name)
+            raise
+    os.replace(fh.name, path)
+
+    with transaction.atomic():
+        job = ExportJob.objects.select_for_update().get(pk=job.pk)
+        finished = ExportPart.objects.filter(pk=part.pk).exclude(status=ExportPart.STATUS_DONE).update(
+            status=ExportPart.STATUS_DONE, rows=written
+        )
+        if not finished:
+            # re-claimed after CLAIM_LEASE and finished by the other worker first;
+            # its count stands, and once assembled our copy is a stray file
+            if job.file:
+                path.unlink(missing_ok=True)
+            return part
+        ExportJob.objects.filter(pk=job.pk).update(parts_done=F('parts_done') + 1)
+        job.refresh_from_db(fields=['parts_done'])
+        if job.parts_done >= job.parts_total and not job.file:
+            _assemble(job)
+    return part
+
+
+def _assemble(job):
+    """Concatenate the part files (in order) into the final download."""
+    job_dir = _job_dir(job)
+    final = job_dir / f"{job.kind}_{job.pk}_{timezone.now():%Y%m%d_%H%M%S}.csv.gz"
+    parts = list(job.parts.order_by('index'))
+    with open(final, 'wb') as out:
+        for part in parts:
+            with open(_part_path(part), 'rb') as fh:
+                for block in iter(lambda: fh.read(1024 * 1024), b''):
+                    out.write(block)
+    for part in parts:
+        _part_path(part).unlink(missing_ok=True)
+
+    job.file = str(final.relative_to(settings.MEDIA_ROOT))
+    job.size = final.stat().st_size
+    job.status = ExportJob.STATUS_DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=['file', 'size', 'status', 'finished_at'])
+
+
+def run_one_part():
+    """Claim and build a single part. Returns the part, or None when idle."""
+    part = claim_part()
+    if part is None:
+        return None
+    try:
+        build_part(part)
+    except Exception as exc:
+        ExportJob.objects.filter(pk=part.job_id).update(
+            status=ExportJob.STATUS_FAILED, error=str(exc), finished_at=timezone.now()
+        )
+    return part
+
+
+def export_file_path(job):
+    return Path(settings.MEDIA_ROOT) / job.file
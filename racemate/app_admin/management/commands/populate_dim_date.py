@@ -0,0 +1,27 @@
+# app_admin/management/commands/populate_dim_date.py
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from app_admin.dates import DEFAULT_FIRST_DATE, DEFAULT_LAST_DATE, populate
+
+
+class Command(BaseCommand):
+    help = ("Add the missing dimDate rows for a date range (default 1950-01-01..2099-12-31). "
+            "Existing rows are kept, so re-running is cheap.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='first', default=DEFAULT_FIRST_DATE.isoformat(),
+                            help="First date, YYYY-MM-DD (default %(default)s).")
+        parser.add_argument('--to', dest='last', default=DEFAULT_LAST_DATE.isoformat(),
+                            help="Last date, YYYY-MM-DD (default %(default)s).")
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="Days checked and inserted per query (default 5000).")
+
+    def handle(self, *args, **options):
+        first, last = parse_date(options['first'] or ''), parse_date(options['last'] or '')
+        if first is None or last is None:
+            raise CommandError("--from and --to must be dates in YYYY-MM-DD form.")
+        if first > last:
+            raise CommandError("--from must not be after --to.")
+        written = populate(first, last, batch_size=max(1, options['batch_size']))
+        self.stdout.write(f"Added {written} dimDate rows for {first}..{last}.")
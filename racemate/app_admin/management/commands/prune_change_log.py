@@ -0,0 +1,30 @@
+# app_admin/management/commands/prune_change_log.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from app_admin.models import ChangeLogEntry, ChangeLogPrune
+
+
+class Command(BaseCommand):
+    help = ("Delete change log entries older than --days. Consumers whose cursor "
+            "is older than that must do a full reload.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30,
+                            help="Keep this many days of changes (default 30).")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        with transaction.atomic():
+            through = ChangeLogEntry.objects.filter(changed_at__lt=cutoff).aggregate(seq=Max('seq'))['seq']
+            if through is None:
+                deleted = 0
+            else:
+                # record the mark first: api_changes resets cursors below it
+                ChangeLogPrune.objects.create(pruned_through=through)
+                deleted, _ = ChangeLogEntry.objects.filter(seq__lte=through).delete()
+        self.stdout.write(f"Deleted {deleted} change log entries older than {options['days']} days.")
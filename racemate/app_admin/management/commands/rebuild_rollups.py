@@ -0,0 +1,17 @@
+# app_admin/management/commands/rebuild_rollups.py
+from django.core.management.base import BaseCommand
+
+from app_admin.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = ("Recompute the RegistrationRollup analytics table from the registrations "
+            "(after restores, raw SQL edits or bulk loads that bypass signals).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help="Registrations read per query (default 2000).")
+
+    def handle(self, *args, **options):
+        cells = rebuild(batch_size=max(1, options['batch_size']))
+        self.stdout.write(f"Rebuilt {cells} rollup cells.")
@@ -0,0 +1,26 @@
+# app_admin/management/commands/run_export_jobs.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from app_admin.exports import run_one_part
+
+
+class Command(BaseCommand):
+    help = "Build queued CSV export parts. Start several processes to build one export in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Exit when no part is left to claim instead of polling forever.")
+        parser.add_argument('--sleep', type=float, default=5.0,
+                            help="Seconds to wait between polls when the queue is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            part = run_one_part()
+            if part is not None:
+                self.stdout.write(f"Built {part}")
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
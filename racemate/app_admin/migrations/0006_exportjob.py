@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_admin', '0005_dimdistrict_code'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=30)),
+                ('params', models.TextField(blank=True, help_text='Querystring of the filters the export was requested with.')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='pending', max_length=10)),
+                ('rows_total', models.PositiveIntegerField(default=0)),
+                ('parts_total', models.PositiveIntegerField(default=0)),
+                ('parts_done', models.PositiveIntegerField(default=0)),
+                ('file', models.CharField(blank=True, help_text='Path of the finished file, relative to MEDIA_ROOT.', max_length=255)),
+                ('size', models.BigIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Export job',
+                'verbose_name_plural': 'Export jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExportPart',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField()),
+                ('pk_lo', models.BigIntegerField()),
+                ('pk_hi', models.BigIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done')], default='pending', max_length=10)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='parts', to='app_admin.exportjob')),
+            ],
+            options={
+                'ordering': ['job', 'index'],
+                'indexes': [models.Index(fields=['status', 'claimed_at'], name='export_part_queue_idx')],
+                'constraints': [models.UniqueConstraint(fields=('job', 'index'), name='export_part_unique_index')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_admin', '0006_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(help_text='app_label.model_name, e.g. accounts.registration', max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=10)),
+                ('changed_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Change log entry',
+                'verbose_name_plural': 'Change log',
+                'ordering': ['seq'],
+                'indexes': [models.Index(fields=['model', 'seq'], name='changelog_model_seq_idx')],
+            },
+        ),
+    ]
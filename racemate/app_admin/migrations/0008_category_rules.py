@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# The default rulebook, as hard-coded in Registration.assign_category before
+# rules moved into the database: (min age, max age, category)
+DEFAULT_RULES = [
+    (12, 14, "Youth Boys & Youth Girls (12-14)"),
+    (15, 16, "Sub-Junior Boys & Sub-Junior Girls (15 & 16)"),
+    (17, 18, "Junior Boys & Junior Girls (17 & 18)"),
+    (19, 22, "Men under-23 (19-22)"),
+    (23, 35, "Men Elite & Women Elite (19 & above)"),
+    (36, 45, "Masters Men 36 to 45 years"),
+    (46, 55, "Masters Men 46 to 55 years"),
+    (56, None, "Masters Men 56+"),
+]
+
+
+def seed_default_rules(apps, schema_editor):
+    CategoryRule = apps.get_model('app_admin', 'CategoryRule')
+    CategoryRule.objects.bulk_create(
+        CategoryRule(event=None, min_age=low, max_age=high, category=category)
+        for low, high, category in DEFAULT_RULES
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_admin', '0007_changelogentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_age', models.PositiveSmallIntegerField(blank=True, help_text='Inclusive; empty = no lower bound.', null=True)),
+                ('max_age', models.PositiveSmallIntegerField(blank=True, help_text='Inclusive; empty = no upper bound.', null=True)),
+                ('category', models.CharField(max_length=255)),
+                ('event', models.ForeignKey(blank=True, help_text='Leave empty for the default rulebook.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='category_rules', to='app_admin.dimeventcategory')),
+            ],
+            options={
+                'ordering': ['event_id', 'min_age'],
+                'indexes': [models.Index(fields=['event', 'min_age'], name='catrule_event_age_idx')],
+            },
+        ),
+        migrations.RunPython(seed_default_rules, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:11
+
+import django.db.models.deletion
+from collections import Counter
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_rollup(apps, schema_editor):
+    """Fill the rollup as app_admin.rollups.rebuild() does."""
+    Registration = apps.get_model('accounts', 'Registration')
+    Rollup = apps.get_model('app_admin', 'RegistrationRollup')
+    Through = Registration.events.through
+
+    events = {}
+    for reg_id, event_id in Through.objects.order_by('registration_id', 'dimeventcategory_id').values_list(
+            'registration_id', 'dimeventcategory_id'):
+        events.setdefault(reg_id, []).append(event_id)
+
+    totals = Counter()
+    rows = Registration.objects.order_by().values_list(
+        'pk', 'created_at', 'state_id', 'district_fk_id', 'gender', 'category', 'age_band', 'profession',
+    )
+    for pk, created_at, state_id, district_id, gender, category, band, profession in rows.iterator(chunk_size=2000):
+        day = None
+        if created_at is not None:
+            day = timezone.localdate(created_at) if timezone.is_aware(created_at) else created_at.date()
+        for i, event_id in enumerate(events.get(pk) or [None]):
+            totals[(day, state_id, district_id, event_id, gender, category, band, profession or '', i == 0)] += 1
+
+    fields = ('day', 'state_id', 'district_id', 'event_id', 'gender', 'category', 'age_band', 'profession', 'is_primary')
+    Rollup.objects.bulk_create(
+        [Rollup(count=n, **dict(zip(fields, key))) for key, n in totals.items()], batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_admin', '0008_category_rules'),
+        ('accounts', '0016_registration_duplicate_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistrationRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(blank=True, null=True)),
+                ('gender', models.CharField(blank=True, max_length=10, null=True)),
+                ('category', models.CharField(blank=True, max_length=255, null=True)),
+                ('age_band', models.CharField(blank=True, max_length=10, null=True)),
+                ('profession', models.CharField(blank=True, max_length=20)),
+                ('is_primary', models.BooleanField(default=True)),
+                ('count', models.IntegerField(default=0)),
+                ('district', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='app_admin.dimdistrict')),
+                ('event', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='app_admin.dimeventcategory')),
+                ('state', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='app_admin.dimstate')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['is_primary', 'day'], name='rollup_primary_day_idx'), models.Index(fields=['event', 'day'], name='rollup_event_day_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:40
+
+from django.db import migrations, models
+from django.db.models import Min
+from django.db.models.functions import ExtractDay, ExtractMonth, ExtractYear
+
+
+def backfill_date_keys(apps, schema_editor):
+    """date_key = YYYYMMDD of `date`; repeated dates (re-runs of the populate view) keep their first row."""
+    dimDate = apps.get_model('app_admin', 'dimDate')
+    dated = dimDate.objects.exclude(date__isnull=True)
+    # subquery, not a list: one bound variable per kept row would exceed SQLite's limit
+    keep = dated.values('date').annotate(first=Min('pk')).values('first')
+    dated.exclude(pk__in=keep).delete()
+    dated.update(date_key=ExtractYear('date') * 10000 + ExtractMonth('date') * 100 + ExtractDay('date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_admin', '0009_registration_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dimdate',
+            name='date_key',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_date_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='dimdate',
+            name='date_key',
+            field=models.PositiveIntegerField(blank=True, null=True, unique=True),
+        ),
+    ]
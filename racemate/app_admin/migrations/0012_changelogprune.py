@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_admin', '0011_cache_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogPrune',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pruned_through', models.BigIntegerField()),
+                ('pruned_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Change log prune',
+            },
+        ),
+    ]
@@ -1,5 +1,7 @@
 
-from django.db import models
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, router, transaction
 
 class DimState(models.Model):
     name = models.CharField(max_length=100, blank=True, null=True)
@@ -19,10 +21,19 @@ class DimDistrict(models.Model):
     name = models.CharField(max_length=150, blank=True, null=True)
 
     def __str__(self):
-        name = self.name or ""
-        code = f"{self.code} " if self.code else ""
-        state_name = self.state.name or ""
-        return f"{code}{name} ({state_name})"
+        if self.pk is not None and not DimDistrict.state.is_cached(self):
+            # use the cached label instead of a query per district (admin lists, selects)
+            from .refdata import get as reference_data
+            cached = reference_data().district_by_id.get(self.pk)
+            if cached is not None and (cached.name, cached.code, cached.state_id) == (self.name, self.code, self.state_id):
+                return cached.label
+        return self.label(self.code, self.name, self.state.name)
+
+    @staticmethod
+    def label(code, name, state_name):
+        """"LKO Lucknow (Uttar Pradesh)"; also used by app_admin.refdata."""
+        code = f"{code} " if code else ""
+        return f"{code}{name or ''} ({state_name or ''})"
 
 
 class DimGender(models.Model):
@@ -44,10 +55,59 @@ class DimEventCategory(models.Model):
     name = models.CharField(max_length=150, blank=True, null=True)
 
     def __str__(self):
-        return f"{self.name or ''} ({self.event_type.name or ''})"
+        if self.pk is not None and not DimEventCategory.event_type.is_cached(self):
+            from .refdata import get as reference_data
+            cached = reference_data().event_by_id.get(self.pk)
+            if cached is not None and (cached.name, cached.event_type_id) == (self.name, self.event_type_id):
+                return cached.label
+        return self.label(self.name, self.event_type.name)
+
+    @staticmethod
+    def label(name, event_type_name):
+        """"10K (Road)"; also used by app_admin.refdata."""
+        return f"{name or ''} ({event_type_name or ''})"
+
+
+class CategoryRule(models.Model):
+    """
+    One row of a category rulebook: people aged min_age..max_age (inclusive,
+    on the event date) get `category`. Rules with no event form the default
+    rulebook; an event with rules of its own uses only those. Intervals of one
+    rulebook must not overlap. See accounts.categories for the lookup.
+    """
+    event = models.ForeignKey(
+        DimEventCategory, on_delete=models.CASCADE, related_name="category_rules",
+        blank=True, null=True, help_text="Leave empty for the default rulebook.",
+    )
+    min_age = models.PositiveSmallIntegerField(blank=True, null=True, help_text="Inclusive; empty = no lower bound.")
+    max_age = models.PositiveSmallIntegerField(blank=True, null=True, help_text="Inclusive; empty = no upper bound.")
+    category = models.CharField(max_length=255)
+
+    class Meta:
+        ordering = ["event_id", "min_age"]
+        indexes = [models.Index(fields=["event", "min_age"], name="catrule_event_age_idx")]
+
+    def __str__(self):
+        low = self.min_age if self.min_age is not None else ""
+        high = self.max_age if self.max_age is not None else ""
+        return f"{low}–{high}: {self.category}"
+
+    def clean(self):
+        low = self.min_age if self.min_age is not None else -1
+        high = self.max_age if self.max_age is not None else 10 ** 6
+        if low > high:
+            raise ValidationError("min_age must not be greater than max_age.")
+        siblings = CategoryRule.objects.filter(event=self.event).exclude(pk=self.pk)
+        for other in siblings:
+            other_low = other.min_age if other.min_age is not None else -1
+            other_high = other.max_age if other.max_age is not None else 10 ** 6
+            if low <= other_high and other_low <= high:
+                raise ValidationError(f"Overlaps the rule {other}.")
 
 
 class dimDate(models.Model):
+    # YYYYMMDD, what Registration.created_date_key joins on (see app_admin.dates)
+    date_key = models.PositiveIntegerField(unique=True, blank=True, null=True)
     date = models.DateField(blank=True, null=True)
     year = models.IntegerField(blank=True, null=True)
     month = models.IntegerField(blank=True, null=True)
@@ -75,3 +135,212 @@ class Event(models.Model):
         return self.name
 
 
+
+class RegistrationRollup(models.Model):
+    """
+    Registration counts per (day, state, district, event, gender, category,
+    age band, profession), for the analysis dashboard. A registration with
+    several events counts once per event; `is_primary` marks its row for its
+    lowest-id event (or its only row, event NULL, when it has none) so totals
+    can count each registration once.
+
+    Maintained incrementally by app_admin.rollups (see accounts.signals);
+    rebuild with `manage.py rebuild_rollups`.
+    """
+    day = models.DateField(null=True, blank=True)
+    state = models.ForeignKey(DimState, on_delete=models.DO_NOTHING, db_constraint=False,
+                              null=True, blank=True, related_name='+')
+    district = models.ForeignKey(DimDistrict, on_delete=models.DO_NOTHING, db_constraint=False,
+                                 null=True, blank=True, related_name='+')
+    event = models.ForeignKey(DimEventCategory, on_delete=models.DO_NOTHING, db_constraint=False,
+                              null=True, blank=True, related_name='+')
+    gender = models.CharField(max_length=10, null=True, blank=True)
+    category = models.CharField(max_length=255, null=True, blank=True)
+    age_band = models.CharField(max_length=10, null=True, blank=True)
+    profession = models.CharField(max_length=20, blank=True)
+    is_primary = models.BooleanField(default=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_primary', 'day'], name='rollup_primary_day_idx'),
+            models.Index(fields=['event', 'day'], name='rollup_event_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} event={self.event_id} state={self.state_id}: {self.count}"
+
+
+class ExportJob(models.Model):
+    """
+    A CSV export built in the background as gzip parts under MEDIA_ROOT/exports/.
+    Work is split into ExportPart rows by registration id range so several
+    run_export_jobs workers can build one export in parallel.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=30)
+    params = models.TextField(blank=True, help_text="Querystring of the filters the export was requested with.")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    rows_total = models.PositiveIntegerField(default=0)
+    parts_total = models.PositiveIntegerField(default=0)
+    parts_done = models.PositiveIntegerField(default=0)
+    file = models.CharField(max_length=255, blank=True, help_text="Path of the finished file, relative to MEDIA_ROOT.")
+    size = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Export job"
+        verbose_name_plural = "Export jobs"
+
+    def __str__(self):
+        return f"Export #{self.pk} {self.kind} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    @property
+    def percent(self):
+        if not self.parts_total:
+            return 100 if self.is_finished else 0
+        return int(self.parts_done * 100 / self.parts_total)
+
+
+class ExportPart(models.Model):
+    """One registration id range [pk_lo, pk_hi] of an ExportJob."""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+    ]
+
+    job = models.ForeignKey(ExportJob, on_delete=models.CASCADE, related_name='parts')
+    index = models.PositiveIntegerField()
+    pk_lo = models.BigIntegerField()
+    pk_hi = models.BigIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    rows = models.PositiveIntegerField(default=0)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['job', 'index']
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'index'], name='export_part_unique_index'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'claimed_at'], name='export_part_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"Export #{self.job_id} part {self.index} ({self.status})"
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Append-only feed of writes to registrations, participations and time
+    entries. `seq` grows monotonically, so a consumer that remembers the last
+    seq it saw can ask for everything after it (see api_changes) instead of
+    re-reading whole tables.
+
+    Entries are written in the same transaction as the change itself
+    (ChangeLoggedModel.save, the post_delete handler in app_admin.signals and
+    the bulk paths), so a rolled-back write never shows up in the feed.
+    """
+    ACTION_CREATE = 'create'
+    ACTION_UPDATE = 'update'
+    ACTION_DELETE = 'delete'
+    ACTION_CHOICES = [
+        (ACTION_CREATE, 'Create'),
+        (ACTION_UPDATE, 'Update'),
+        (ACTION_DELETE, 'Delete'),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=50, help_text="app_label.model_name, e.g. accounts.registration")
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    changed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['seq']
+        verbose_name = "Change log entry"
+        verbose_name_plural = "Change log"
+        indexes = [
+            models.Index(fields=['model', 'seq'], name='changelog_model_seq_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.seq} {self.action} {self.model}:{self.object_id}"
+
+    @classmethod
+    def record(cls, instance, action, using=None):
+        return cls.objects.using(using or 'default').create(
+            model=instance._meta.label_lower, object_id=instance.pk, action=action,
+        )
+
+    @classmethod
+    def record_many(cls, model, pks, action, using=None):
+        """One entry per pk, for bulk writes that bypass save()."""
+        label = model._meta.label_lower
+        return cls.objects.using(using or 'default').bulk_create(
+            [cls(model=label, object_id=pk, action=action) for pk in pks], batch_size=1000,
+        )
+
+
+class ChangeLogPrune(models.Model):
+    """
+    One row per prune_change_log run: every entry up to `pruned_through` may be
+    gone. api_changes compares cursors against the highest mark instead of the
+    oldest surviving seq, which has gaps (rolled-back inserts, deletes).
+    """
+    pruned_through = models.BigIntegerField()
+    pruned_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Change log prune"
+
+    def __str__(self):
+        return f"pruned through #{self.pruned_through}"
+
+    @classmethod
+    def high_water_mark(cls):
+        return cls.objects.aggregate(mark=models.Max('pruned_through'))['mark'] or 0
+
+
+class ChangeLoggedModel(models.Model):
+    """
+    Abstract base: save() writes the row and its ChangeLogEntry atomically.
+    Deletes (including cascades and queryset.delete()) are logged by the
+    post_delete handler in app_admin.signals, which runs inside the delete's
+    transaction.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        created = self._state.adding
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            ChangeLogEntry.record(
+                self, ChangeLogEntry.ACTION_CREATE if created else ChangeLogEntry.ACTION_UPDATE, using=using,
+            )
@@ -0,0 +1,125 @@
+# app_admin/refdata.py
+"""
+Process-wide cache of the reference tables: states, districts and event
+categories, with their labels rendered once and the choice tuples forms,
+filters and the admin need.
+
+Everything is loaded in three queries (names of related rows joined in), so
+rendering a district or event label never touches the database again. Each
+process keeps its copy until the version counter moves. The counter lives in
+the shared cache (settings.CACHES, the database cache by default), and every
+save or delete of a dimension row bumps it after commit (see
+app_admin.signals), so an admin edit made in one process shows up in all of
+them within REFERENCE_DATA_CHECK_SECONDS. Checking the version is one cache
+read, made at most that often per process rather than once per label (with
+the database cache each read is a query). The process that made the edit
+checks again straight away.
+"""
+import time
+from collections import namedtuple
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import DimDistrict, DimEventCategory, DimState
+
+VERSION_KEY = 'refdata:version'
+
+State = namedtuple('State', 'id name label')
+District = namedtuple('District', 'id name code state_id label')
+EventCategory = namedtuple('EventCategory', 'id name event_type_id label')
+
+
+class ReferenceData:
+
+    def __init__(self, version):
+        self.version = version
+        self.states = [
+            State(pk, name, name or '')
+            for pk, name in DimState.objects.order_by('name').values_list('pk', 'name')
+        ]
+        self.districts = [
+            District(pk, name, code, state_id, DimDistrict.label(code, name, state_name))
+            for pk, name, code, state_id, state_name in DimDistrict.objects.order_by('name').values_list(
+                'pk', 'name', 'code', 'state_id', 'state__name',
+            )
+        ]
+        self.events = [
+            EventCategory(pk, name, event_type_id, DimEventCategory.label(name, type_name))
+            for pk, name, event_type_id, type_name in DimEventCategory.objects.order_by('name').values_list(
+                'pk', 'name', 'event_type_id', 'event_type__name',
+            )
+        ]
+        self.state_by_id = {s.id: s for s in self.states}
+        self.district_by_id = {d.id: d for d in self.districts}
+        self.event_by_id = {e.id: e for e in self.events}
+        self._districts_by_state = {}
+        for district in self.districts:
+            self._districts_by_state.setdefault(district.state_id, []).append(district)
+
+    def districts_of(self, state_id):
+        return self._districts_by_state.get(state_id, [])
+
+    def state_choices(self):
+        return [(s.id, s.label) for s in self.states]
+
+    def district_choices(self, state_id=None):
+        """(id, label) for all districts, or for those of one state, by name."""
+        districts = self.districts if state_id is None else self.districts_of(state_id)
+        return [(d.id, d.label) for d in districts]
+
+    def event_choices(self):
+        return [(e.id, e.label) for e in self.events]
+
+
+_current = None
+_checked_at = None  # time.monotonic() of the last version read
+_lock = Lock()
+
+
+def _start_version():
+    version = time.time_ns()
+    if not cache.add(VERSION_KEY, version, None):
+        version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def get():
+    """The current ReferenceData, reloaded if a dimension row changed since it was built."""
+    global _current, _checked_at
+    current, checked_at = _current, _checked_at
+    ttl = getattr(settings, 'REFERENCE_DATA_CHECK_SECONDS', 5)
+    if current is not None and checked_at is not None and time.monotonic() - checked_at < ttl:
+        return current
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = _start_version()
+    _checked_at = time.monotonic()
+    if current is None or current.version != version:
+        with _lock:
+            current = _current
+            if current is None or current.version != version:
+                current = _current = ReferenceData(version)
+    return current
+
+
+def bump_version():
+    """Make every process reload the reference data once the current transaction commits."""
+    expire()
+    transaction.on_commit(_bump)
+
+
+def expire():
+    """Read the version again on the next get() in this process."""
+    global _checked_at
+    _checked_at = None
+
+
+def _bump():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+    expire()
@@ -0,0 +1,229 @@
+# app_admin/rollups.py
+"""
+Incremental maintenance of RegistrationRollup and the analysis summary served
+from it.
+
+Every write that can move a registration between rollup cells (save, delete,
+events M2M change, bulk category/age band updates) snapshots the registration's
+cell keys before the write and applies the difference afterwards:
+-1 on the cells it left, +1 on the cells it entered. Registration saves that
+touch none of the DIMENSION_FIELDS (e.g. bib releases) are skipped.
+"""
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from accounts.models import AGE_BAND_CHOICES, Registration
+from . import summary_cache
+from .dates import calendar_summary, date_key
+from .models import DimEventCategory, DimState, RegistrationRollup
+
+# Registration fields the rollup is keyed by (besides events)
+DIMENSION_FIELDS = ('created_at', 'state', 'district_fk', 'gender', 'category', 'age_band', 'profession')
+
+KEY_FIELDS = ('day', 'state_id', 'district_id', 'event_id', 'gender', 'category', 'age_band', 'profession', 'is_primary')
+
+CHUNK_SIZE = 2000
+
+
+def _day(created_at):
+    if created_at is None:
+        return None
+    if timezone.is_aware(created_at):
+        return timezone.localdate(created_at)
+    return created_at.date()
+
+
+def rollup_keys(pks):
+    """Counter of rollup cell keys (see KEY_FIELDS) for the given registrations, as stored now."""
+    keys = Counter()
+    pks = list(pks)
+    through = Registration.events.through
+    for start in range(0, len(pks), CHUNK_SIZE):
+        chunk = pks[start:start + CHUNK_SIZE]
+        events = {}
+        for reg_id, event_id in (through.objects.filter(registration_id__in=chunk)
+                                 .order_by('registration_id', 'dimeventcategory_id')
+                                 .values_list('registration_id', 'dimeventcategory_id')):
+            events.setdefault(reg_id, []).append(event_id)
+        rows = Registration.objects.filter(pk__in=chunk).order_by().values_list(
+            'pk', 'created_at', 'state_id', 'district_fk_id', 'gender', 'category', 'age_band', 'profession',
+        )
+        for pk, created_at, state_id, district_id, gender, category, band, profession in rows:
+            base = (_day(created_at), state_id, district_id)
+            rest = (gender, category, band, profession or '')
+            event_ids = events.get(pk) or [None]
+            for i, event_id in enumerate(event_ids):
+                keys[base + (event_id,) + rest + (i == 0,)] += 1
+    return keys
+
+
+def apply_delta(delta):
+    """
+    Add the (key -> count change) Counter `delta` to the rollup table. Cells
+    this delta brings down to zero are deleted by pk (count is not indexed).
+    """
+    shrunk = []
+    for key, change in delta.items():
+        if not change:
+            continue
+        lookup = dict(zip(KEY_FIELDS, key))
+        pk = RegistrationRollup.objects.filter(**lookup).values_list('pk', flat=True).first()
+        if pk is None:
+            if change > 0:
+                RegistrationRollup.objects.create(count=change, **lookup)
+        else:
+            RegistrationRollup.objects.filter(pk=pk).update(count=F('count') + change)
+            if change < 0:
+                shrunk.append(pk)
+    for start in range(0, len(shrunk), CHUNK_SIZE):
+        RegistrationRollup.objects.filter(pk__in=shrunk[start:start + CHUNK_SIZE], count__lte=0).delete()
+
+
+def snapshot(pks):
+    return rollup_keys(pks) if pks else Counter()
+
+
+def apply_change(before, pks):
+    """Apply the difference between the `before` snapshot and the current state of `pks`."""
+    after = snapshot(pks)
+    delta = Counter(after)
+    delta.subtract(before)
+    apply_delta(delta)
+
+
+@contextmanager
+def tracking(pks):
+    """Keep the rollup in step with bulk writes to `pks` made inside the block."""
+    pks = list(pks)
+    with transaction.atomic():
+        before = snapshot(pks)
+        yield
+        apply_change(before, pks)
+
+
+def rebuild(batch_size=CHUNK_SIZE):
+    """Recompute the whole table from the registrations. Returns the number of cells."""
+    totals = Counter()
+    pks = Registration.objects.order_by('pk').values_list('pk', flat=True)
+    batch = []
+    for pk in pks.iterator(chunk_size=batch_size):
+        batch.append(pk)
+        if len(batch) >= batch_size:
+            totals.update(rollup_keys(batch))
+            batch = []
+    if batch:
+        totals.update(rollup_keys(batch))
+
+    with transaction.atomic():
+        RegistrationRollup.objects.all().delete()
+        RegistrationRollup.objects.bulk_create(
+            (RegistrationRollup(count=n, **dict(zip(KEY_FIELDS, key))) for key, n in totals.items()),
+            batch_size=500,
+        )
+        summary_cache.bump_data_version()
+    return len(totals)
+
+
+# ------------------------------
+# Serving the analysis summary
+# ------------------------------
+
+def _filtered(params):
+    """
+    Rollup rows matching the analysis filters, plus whether an event filter is
+    applied; None when the filters can't be answered from the rollup.
+    """
+    if params.get('q'):
+        # free-text search needs the registrations themselves
+        return None
+    event_ids = [e for e in params.getlist('event') if e]
+    if len(event_ids) > 1:
+        # a registration in two of the events would be counted twice
+        return None
+
+    qs = RegistrationRollup.objects.all()
+    date_from = parse_date(params.get('date_from') or '')
+    date_to = parse_date(params.get('date_to') or '')
+    if date_from:
+        qs = qs.filter(day__gte=date_from)
+    if date_to:
+        qs = qs.filter(day__lte=date_to)
+    state_ids = params.getlist('state')
+    if state_ids:
+        qs = qs.filter(state_id__in=state_ids)
+    if event_ids:
+        qs = qs.filter(event_id=event_ids[0])
+    if params.get('profession'):
+        qs = qs.filter(profession=params.get('profession'))
+    genders = params.getlist('gender')
+    if genders:
+        qs = qs.filter(gender__in=genders)
+    age_bands = params.getlist('age_band')
+    if age_bands:
+        qs = qs.filter(age_band__in=age_bands)
+    return qs, bool(event_ids)
+
+
+def _grouped(qs, *fields, order_by=None):
+    rows = qs.values(*fields).annotate(n=Sum('count')).filter(n__gt=0)
+    return rows.order_by(*(order_by or fields))
+
+
+def summary_from_rollup(params):
+    """
+    The api_analysis_summary payload computed from RegistrationRollup, or None
+    if the filters need the raw registration query.
+    """
+    filtered = _filtered(params)
+    if filtered is None:
+        return None
+    qs, by_one_event = filtered
+    # with one event filtered every row is a distinct registration; otherwise
+    # count each registration once via its primary row
+    once = qs if by_one_event else qs.filter(is_primary=True)
+
+    state_names = dict(DimState.objects.values_list('pk', 'name'))
+    event_names = dict(DimEventCategory.objects.values_list('pk', 'name'))
+    age_band_labels = dict(AGE_BAND_CHOICES)
+
+    by_state = [
+        {'id': r['state_id'], 'name': state_names.get(r['state_id']) or 'Unknown', 'count': r['n']}
+        for r in _grouped(once, 'state_id', order_by=['-n', 'state_id'])
+    ]
+    by_event = [
+        {'id': r['event_id'], 'name': event_names.get(r['event_id']) or 'Unknown', 'count': r['n']}
+        for r in _grouped(qs, 'event_id', order_by=['-n', 'event_id'])
+    ]
+    by_gender = [{'gender': r['gender'] or 'Unspecified', 'count': r['n']} for r in _grouped(once, 'gender')]
+    by_category = [{'age_group': r['category'] or 'Unspecified', 'count': r['n']} for r in _grouped(once, 'category')]
+    by_age_band = [
+        {'age_band': r['age_band'], 'label': age_band_labels.get(r['age_band'], 'Unspecified'), 'count': r['n']}
+        for r in _grouped(once, 'age_band')
+    ]
+    breakdown = [
+        {
+            'age_group': r['category'] or 'Unspecified',
+            'event': event_names.get(r['event_id']) or 'Unspecified',
+            'gender': r['gender'] or 'Unspecified',
+            'count': r['n'],
+        }
+        for r in _grouped(qs, 'category', 'event_id', 'gender')
+    ]
+    breakdown.sort(key=lambda r: (r['age_group'], r['event'], r['gender']))
+    days = {date_key(r['day']): r['n'] for r in _grouped(once, 'day')}
+
+    return {
+        'total': once.aggregate(n=Sum('count'))['n'] or 0,
+        'by_state': by_state,
+        'by_event': by_event,
+        'by_gender': by_gender,
+        'by_category': by_category,
+        'by_age_band': by_age_band,
+        'breakdown': breakdown,
+        **calendar_summary(days),
+    }
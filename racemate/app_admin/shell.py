@@ -1,35 +1,21 @@
-import datetime
-from app_admin.models import dimDate
-from django.shortcuts import render, redirect
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_POST
 
-def populate_dim_date(request):
-    """Populate the dimDate table with dates from 1950-01-01 to 2099-12-31."""
-    
-    # Clear existing data to avoid duplicates
-    dimDate.objects.all().delete()
-    start_date = datetime.date(1950, 1, 1)
-    end_date = datetime.date(2099, 12, 31)
-    delta = datetime.timedelta(days=1)
-    current_date = start_date
-
-    dates_to_create = []
+from app_admin.dates import DEFAULT_FIRST_DATE, DEFAULT_LAST_DATE, populate
 
-    while current_date <= end_date:
-        dates_to_create.append(
-            dimDate(
-                date=current_date,
-                year=current_date.year,
-                month=current_date.month,
-                day=current_date.day,
-                month_name=current_date.strftime("%B"),
-                day_name=current_date.strftime("%A"),
-                quarter=(current_date.month - 1) // 3 + 1,
-                is_weekend=current_date.weekday() >= 5
-            )
-        )
-        current_date += delta
 
-    # insert in chunks to avoid memory issues
-    dimDate.objects.bulk_create(dates_to_create, batch_size=5000)
-
-    print("✅ dimDate table populated successfully from 1950 to 2099.")
+@staff_member_required
+@require_POST
+def populate_dim_date(request):
+    """
+    Add the dimDate rows missing from 1950-01-01 to 2099-12-31; the same code
+    path as `manage.py populate_dim_date`, which also takes a custom range.
+    """
+    written = populate(DEFAULT_FIRST_DATE, DEFAULT_LAST_DATE)
+    return JsonResponse({
+        'ok': True,
+        'written': written,
+        'from': DEFAULT_FIRST_DATE.isoformat(),
+        'to': DEFAULT_LAST_DATE.isoformat(),
+    })
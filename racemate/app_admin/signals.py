@@ -0,0 +1,29 @@
+# app_admin/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import refdata
+from .models import ChangeLogEntry, ChangeLoggedModel, DimDistrict, DimEventCategory, DimEventType, DimState
+
+
+@receiver(post_delete, dispatch_uid='changelog_deleted')
+def log_delete(sender, instance, using=None, **kwargs):
+    """
+    Log deletes of change-logged models. post_delete runs inside the delete's
+    transaction, and also fires for cascades and queryset.delete().
+    """
+    if isinstance(instance, ChangeLoggedModel):
+        ChangeLogEntry.record(instance, ChangeLogEntry.ACTION_DELETE, using=using)
+
+
+@receiver(post_save, sender=DimState, dispatch_uid='refdata_state_saved')
+@receiver(post_delete, sender=DimState, dispatch_uid='refdata_state_deleted')
+@receiver(post_save, sender=DimDistrict, dispatch_uid='refdata_district_saved')
+@receiver(post_delete, sender=DimDistrict, dispatch_uid='refdata_district_deleted')
+@receiver(post_save, sender=DimEventType, dispatch_uid='refdata_event_type_saved')
+@receiver(post_delete, sender=DimEventType, dispatch_uid='refdata_event_type_deleted')
+@receiver(post_save, sender=DimEventCategory, dispatch_uid='refdata_event_saved')
+@receiver(post_delete, sender=DimEventCategory, dispatch_uid='refdata_event_deleted')
+def reference_data_changed(sender, **kwargs):
+    """Labels and choices cached by app_admin.refdata follow admin edits (event type names are in event labels)."""
+    refdata.bump_version()
@@ -0,0 +1,330 @@
+# app_admin/snapshot.py
+"""
+In-process columnar snapshot of the registrations, for ad-hoc pivots the
+dashboard doesn't cover (district x category x profession x event, ...).
+
+Each dimension is dictionary-encoded: an array of small integer codes per
+column (array.array, which NumPy views without copying) plus the list of
+values the codes stand for. Events are a bitset per registration, 64 events
+per word. refresh() brings the snapshot up to date incrementally: rows with an
+id above the highest one loaded are appended, rows whose updated_at reached
+the newest one seen are re-read and overwritten in place, and a row count
+that no longer matches the table (deletes) falls back to a full reload.
+
+pivot() counts any combination of dimensions over those arrays: with
+np.bincount / np.unique (NumPy is in requirements.txt), or with a Counter
+where it isn't installed.
+"""
+import time
+from array import array
+from collections import Counter
+from datetime import timedelta
+from threading import Lock
+
+from django.conf import settings
+from django.utils import timezone
+
+from accounts.models import Registration
+from .dates import key_date
+from .models import DimDistrict, DimEventCategory, DimState
+
+try:
+    import numpy as np
+except ImportError:  # pivots fall back to pure Python
+    np = None
+
+# pivot dimension -> Registration column
+COLUMNS = {
+    'state': 'state_id',
+    'district': 'district_fk_id',
+    'gender': 'gender',
+    'category': 'category',
+    'profession': 'profession',
+    'age_band': 'age_band',
+    'day': 'created_date_key',
+}
+DIMENSIONS = tuple(COLUMNS) + ('event',)
+# dimensions whose values are ids / integers (querystring filters are converted)
+INTEGER_DIMENSIONS = ('state', 'district', 'day', 'event')
+
+CHUNK_SIZE = 2000
+WORD_BITS = 64
+# group keys up to this many combinations are counted with bincount
+BINCOUNT_LIMIT = 1 << 22
+
+
+class Dictionary:
+    """Values of one column and their codes (position in `values`)."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class RegistrationSnapshot:
+
+    def __init__(self):
+        self.lock = Lock()
+        self.clear()
+
+    def clear(self):
+        self.pks = array('q')
+        self.rows = {}  # pk -> row index
+        self.columns = {name: array('i') for name in COLUMNS}
+        self.dictionaries = {name: Dictionary() for name in DIMENSIONS}
+        self.event_words = []  # array('Q') per 64 event codes
+        self.max_pk = 0
+        self.max_updated = None
+        self.refreshed_at = None
+        self.checked = 0.0
+
+    def __len__(self):
+        return len(self.pks)
+
+    # ----- loading -----
+
+    def refresh(self, force=False):
+        """Apply registrations added or changed since the last refresh (at most every ANALYSIS_SNAPSHOT_REFRESH_SECONDS)."""
+        interval = getattr(settings, 'ANALYSIS_SNAPSHOT_REFRESH_SECONDS', 10)
+        with self.lock:
+            if not force and self.refreshed_at is not None and time.monotonic() - self.checked < interval:
+                return
+            if self.refreshed_at is None:
+                self._load(Registration.objects.all())
+            else:
+                known_pk, since = self.max_pk, self.max_updated
+                self._load(Registration.objects.filter(pk__gt=known_pk))
+                if since is not None:
+                    # updated_at is stamped before commit: a write that committed after
+                    # the last refresh can carry an older stamp, so re-read one interval back
+                    since -= timedelta(seconds=interval)
+                    self._load(Registration.objects.filter(pk__lte=known_pk, updated_at__gte=since))
+            if len(self.pks) != Registration.objects.count():
+                # rows were deleted: start over
+                self.clear()
+                self._load(Registration.objects.all())
+            self.refreshed_at = timezone.now()
+            self.checked = time.monotonic()
+
+    def _load(self, qs):
+        rows = qs.order_by('pk').values_list('pk', 'updated_at', *COLUMNS.values())
+        batch = []
+        for row in rows.iterator(chunk_size=CHUNK_SIZE):
+            batch.append(row)
+            if len(batch) >= CHUNK_SIZE:
+                self._store(batch)
+                batch = []
+        if batch:
+            self._store(batch)
+
+    def _store(self, batch):
+        events = {}
+        through = Registration.events.through
+        for reg_id, event_id in (through.objects.filter(registration_id__in=[row[0] for row in batch])
+                                 .values_list('registration_id', 'dimeventcategory_id')):
+            events.setdefault(reg_id, []).append(event_id)
+
+        event_dictionary = self.dictionaries['event']
+        for pk, updated_at, *values in batch:
+            index = self.rows.get(pk)
+            if index is None:
+                index = self.rows[pk] = len(self.pks)
+                self.pks.append(pk)
+                for name in COLUMNS:
+                    self.columns[name].append(0)
+                for word in self.event_words:
+                    word.append(0)
+            for name, value in zip(COLUMNS, values):
+                self.columns[name][index] = self.dictionaries[name].encode(value)
+
+            bits = [0] * len(self.event_words)
+            for event_id in events.get(pk, ()):
+                code = event_dictionary.encode(event_id)
+                while code // WORD_BITS >= len(self.event_words):
+                    self.event_words.append(array('Q', bytes(8 * len(self.pks))))
+                    bits.append(0)
+                bits[code // WORD_BITS] |= 1 << (code % WORD_BITS)
+            for word, value in zip(self.event_words, bits):
+                word[index] = value
+
+            self.max_pk = max(self.max_pk, pk)
+            if updated_at is not None and (self.max_updated is None or updated_at > self.max_updated):
+                self.max_updated = updated_at
+
+    # ----- pivots -----
+
+    def _allowed_codes(self, filters):
+        """{dimension: set of codes} for the filter values; a value never seen matches nothing."""
+        allowed = {}
+        for name, values in filters.items():
+            dictionary = self.dictionaries[name]
+            allowed[name] = {dictionary.codes[v] for v in values if v in dictionary.codes}
+        return allowed
+
+    def _row_events(self, index):
+        codes = []
+        for w, word in enumerate(self.event_words):
+            bits = word[index]
+            while bits:
+                low = bits & -bits
+                codes.append(w * WORD_BITS + low.bit_length() - 1)
+                bits ^= low
+        return codes
+
+    def _count_python(self, dims, allowed):
+        """Counter of code tuples (dims without 'event', then the event code or -1)."""
+        wanted_events = allowed.pop('event', None)
+        columns = [self.columns[name] for name in dims if name != 'event']
+        filters = [(self.columns[name], codes) for name, codes in allowed.items()]
+        by_event = 'event' in dims
+        counts = Counter()
+        for index in range(len(self.pks)):
+            if any(column[index] not in codes for column, codes in filters):
+                continue
+            key = tuple(column[index] for column in columns)
+            if wanted_events is None and not by_event:
+                counts[key] += 1
+                continue
+            events = self._row_events(index)
+            if wanted_events is not None:
+                events = [code for code in events if code in wanted_events]
+                if not events:
+                    continue
+            if by_event:
+                for code in events or [-1]:
+                    counts[key + (code,)] += 1
+            else:
+                counts[key] += 1
+        return counts
+
+    def _event_hits(self, rows, code):
+        word = np.frombuffer(self.event_words[code // WORD_BITS], dtype=np.uint64)[rows]
+        return (word >> np.uint64(code % WORD_BITS)) & np.uint64(1) == 1
+
+    def _count_numpy(self, dims, allowed):
+        """The same Counter as _count_python, computed on the code arrays."""
+        wanted_events = allowed.pop('event', None)
+        mask = np.ones(len(self.pks), dtype=bool)
+        for name, codes in allowed.items():
+            column = np.frombuffer(self.columns[name], dtype=np.int32)
+            mask &= np.isin(column, np.fromiter(codes, dtype=np.int32, count=len(codes)))
+        rows = np.flatnonzero(mask)
+
+        event_codes = None
+        if wanted_events is not None or 'event' in dims:
+            candidates = sorted(wanted_events) if wanted_events is not None else range(len(self.dictionaries['event']))
+            hits = [(code, self._event_hits(rows, code)) for code in candidates]
+            if 'event' in dims:
+                # one row per (registration, event); registrations without events once, as -1
+                parts = [(rows[hit], np.full(int(hit.sum()), code)) for code, hit in hits]
+                if wanted_events is None:
+                    no_event = np.ones(len(rows), dtype=bool)
+                    for code, hit in hits:
+                        no_event &= ~hit
+                    parts.append((rows[no_event], np.full(int(no_event.sum()), -1)))
+                rows = np.concatenate([p[0] for p in parts]) if parts else rows[:0]
+                event_codes = np.concatenate([p[1] for p in parts]) if parts else np.zeros(0, dtype=np.int64)
+            else:
+                any_hit = np.zeros(len(rows), dtype=bool)
+                for code, hit in hits:
+                    any_hit |= hit
+                rows = rows[any_hit]
+
+        # mixed-radix group key over the selected code columns
+        radices, columns = [], []
+        for name in dims:
+            if name == 'event':
+                radices.append(len(self.dictionaries['event']) + 1)
+                columns.append(event_codes + 1)  # -1 (no event) becomes 0
+            else:
+                radices.append(max(1, len(self.dictionaries[name])))
+                columns.append(np.frombuffer(self.columns[name], dtype=np.int32)[rows])
+        order = [name for name in dims if name != 'event'] + (['event'] if 'event' in dims else [])
+        keys = np.zeros(len(rows), dtype=np.int64)
+        size = 1
+        for radix, column in zip(radices, columns):
+            keys = keys * radix + column
+            size *= radix
+        if size <= BINCOUNT_LIMIT:
+            tally = np.bincount(keys, minlength=1)
+            found = np.flatnonzero(tally)
+            totals = tally[found]
+        else:
+            found, totals = np.unique(keys, return_counts=True)
+
+        counts = Counter()
+        for key, n in zip(found.tolist(), totals.tolist()):
+            codes = {}
+            for name, radix in zip(reversed(dims), reversed(radices)):
+                key, codes[name] = divmod(key, radix)
+            if 'event' in codes:
+                codes['event'] -= 1
+            counts[tuple(codes[name] for name in order)] = n
+        return counts
+
+    def pivot(self, dims, filters=None):
+        """
+        Registration counts grouped by `dims` (names from DIMENSIONS), for the
+        registrations matching `filters` ({dimension: [values]}). Grouping by
+        event counts a registration once per event (once with event None if
+        it has none); an event filter keeps only the filtered events.
+        Returns [(values tuple in `dims` order, count)], largest counts first.
+        """
+        with self.lock:
+            allowed = self._allowed_codes(filters or {})
+            key_space = 1
+            for name in dims:
+                key_space *= len(self.dictionaries[name]) + 1
+            # combined group keys must fit in int64
+            counter = self._count_numpy if np is not None and key_space < 1 << 62 else self._count_python
+            counts = counter(list(dims), allowed)
+            order = [name for name in dims if name != 'event'] + (['event'] if 'event' in dims else [])
+            out = []
+            for codes, n in counts.items():
+                decoded = {}
+                for name, code in zip(order, codes):
+                    decoded[name] = None if code < 0 else self.dictionaries[name].values[code]
+                out.append((tuple(decoded[name] for name in dims), n))
+        out.sort(key=lambda item: (-item[1], tuple(str(v) for v in item[0])))
+        return out
+
+
+_snapshot = RegistrationSnapshot()
+
+
+def get_snapshot():
+    """The process-wide snapshot, refreshed if ANALYSIS_SNAPSHOT_REFRESH_SECONDS have passed."""
+    _snapshot.refresh()
+    return _snapshot
+
+
+def labels(dims, results):
+    """Display values for pivot() results: names for states, districts and events, ISO dates for days."""
+    names = {}
+    if 'state' in dims:
+        names['state'] = dict(DimState.objects.values_list('pk', 'name'))
+    if 'district' in dims:
+        names['district'] = dict(DimDistrict.objects.values_list('pk', 'name'))
+    if 'event' in dims:
+        names['event'] = dict(DimEventCategory.objects.values_list('pk', 'name'))
+    for values, n in results:
+        row = {}
+        for name, value in zip(dims, values):
+            if name in names:
+                row[name] = {'id': value, 'name': names[name].get(value) if value is not None else None}
+            elif name == 'day':
+                row[name] = key_date(value).isoformat() if value else None
+            else:
+                row[name] = value
+        row['count'] = n
+        yield row
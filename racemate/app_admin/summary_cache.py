@@ -0,0 +1,107 @@
+# app_admin/summary_cache.py
+"""
+Response cache for api_analysis_summary.
+
+Entries are keyed by the normalized filter parameters and stamped with the
+data version they were computed at. The data version is a counter in the
+shared cache (settings.CACHES, the database cache by default, so every
+process sees the same counter) that every registration write bumps after
+its transaction commits (see bump_data_version). A stale entry is never
+served and no TTL has to guess how long data stays fresh. A lookup is one get_many() round trip:
+the current version and the entry together.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+VERSION_KEY = 'analysis_summary:data_version'
+ENTRY_PREFIX = 'analysis_summary:entry:'
+
+# filter params that change the summary, and how each is normalized
+MULTI_VALUE_PARAMS = ('state', 'event', 'gender', 'age_band')
+DATE_PARAMS = ('date_from', 'date_to')
+
+
+def _new_version():
+    # after an eviction the counter restarts from a fresh, larger value, so
+    # entries stamped with an old number can't match by accident
+    return time.time_ns()
+
+
+def bump_data_version():
+    """Invalidate every cached summary once the current transaction commits."""
+    transaction.on_commit(_bump)
+
+
+def _bump():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, _new_version(), None)
+
+
+def _start_version():
+    version = _new_version()
+    if not cache.add(VERSION_KEY, version, None):
+        version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def data_version():
+    """
+    The current data version, for other caches of registration-derived
+    results (e.g. the bib list facet counts) to stamp their keys with.
+    """
+    version = cache.get(VERSION_KEY)
+    return _start_version() if version is None else version
+
+
+def normalized_params(params):
+    """The filters as a canonical dict: sorted multi-value lists, ISO dates, trimmed text."""
+    out = {}
+    for name in MULTI_VALUE_PARAMS:
+        values = sorted({v.strip() for v in params.getlist(name) if v.strip()})
+        if values:
+            out[name] = values
+    for name in DATE_PARAMS:
+        parsed = parse_date(params.get(name) or '')
+        if parsed:
+            out[name] = parsed.isoformat()
+    profession = (params.get('profession') or '').strip()
+    if profession:
+        out['profession'] = profession
+    q = ' '.join((params.get('q') or '').split()).lower()
+    if q:
+        out['q'] = q
+    return out
+
+
+def entry_key(params):
+    raw = json.dumps(normalized_params(params), sort_keys=True, separators=(',', ':'))
+    return ENTRY_PREFIX + hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def get_cached(params):
+    """
+    (payload or None, current data version) for `params`. Store a freshly
+    computed payload with store() under the version returned here.
+    """
+    key = entry_key(params)
+    found = cache.get_many([VERSION_KEY, key])
+    version = found.get(VERSION_KEY)
+    if version is None:
+        return None, _start_version()
+    entry = found.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1], version
+    return None, version
+
+
+def store(params, version, payload):
+    timeout = getattr(settings, 'ANALYSIS_SUMMARY_CACHE_SECONDS', 86400)
+    cache.set(entry_key(params), (version, payload), timeout)
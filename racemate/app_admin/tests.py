@@ -1,3 +1,439 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import re
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.http import QueryDict
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Registration
+from app_admin import exports, refdata
+from app_admin.dates import date_key
+from app_admin.exports import EXPORT_KINDS, build_part, claim_part, create_export_job, pk_runs
+from app_admin.models import ChangeLogEntry, ChangeLogPrune, DimDistrict, DimEventCategory, DimEventType, DimState, ExportJob, ExportPart, RegistrationRollup, dimDate
+from app_admin.rollups import KEY_FIELDS, rebuild, summary_from_rollup
+from app_admin.snapshot import DIMENSIONS, RegistrationSnapshot, np
+from app_admin.views import filter_registrations, summary_from_registrations, summary_rows
+
+
+def _normalized(payload):
+    # list order among equal counts is not part of the contract
+    return {
+        key: sorted(json.dumps(item, sort_keys=True) for item in value) if isinstance(value, list) else value
+        for key, value in payload.items()
+    }
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class AnalysisSummaryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        state = DimState.objects.create(name='Uttar Pradesh')
+        lucknow = DimDistrict.objects.create(state=state, name='Lucknow', code='LKO')
+        kanpur = DimDistrict.objects.create(state=state, name='Kanpur', code='KNP')
+        road = DimEventType.objects.create(name='Road')
+        cls.ten_k = DimEventCategory.objects.create(event_type=road, name='10K')
+        cls.half = DimEventCategory.objects.create(event_type=road, name='21K')
+        cls.five_k = DimEventCategory.objects.create(event_type=road, name='5K')
+
+        for i in range(12):
+            reg = Registration.objects.create(
+                name=f'Runner {i}',
+                gender=('male', 'female')[i % 2],
+                date_of_birth=date(1960 + 4 * i, 1 + i % 12, 1 + i),
+                state=state,
+                district_fk=(lucknow, kanpur)[i % 2],
+                mobile_number=f'+9190000000{i:02d}',
+            )
+            if i % 2 == 0:
+                reg.events.add(cls.ten_k)
+            if i % 3 == 0:
+                reg.events.add(cls.half)
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pw', is_staff=True)
+
+    def params(self, query):
+        return QueryDict(query)
+
+    # ----- filtering -----
+
+    def test_event_filter_is_a_semi_join(self):
+        qs = filter_registrations(self.params(f'event={self.ten_k.pk}&event={self.half.pk}'))
+        sql = str(qs.query).upper()
+        self.assertIn('EXISTS', sql)
+        self.assertNotIn('DISTINCT', sql)
+        # registrations in both events are counted once: i % 2 == 0 or i % 3 == 0
+        self.assertEqual(qs.count(), 8)
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN output is SQLite specific')
+    def test_event_filter_plan_probes_the_m2m_index(self):
+        qs = filter_registrations(self.params(f'event={self.ten_k.pk}&event={self.half.pk}')).order_by()
+        plan = qs.explain()
+        self.assertIn('CORRELATED SCALAR SUBQUERY', plan)
+        self.assertRegex(plan, r'SEARCH \S+ USING COVERING INDEX accounts_registration_events_')
+        self.assertNotIn('DISTINCT', plan)
+
+    # ----- raw (single scan) summary -----
+
+    def test_raw_summary_runs_one_scan_and_one_calendar_read(self):
+        params = self.params(f'event={self.ten_k.pk}&event={self.half.pk}&gender=male')
+        with self.assertNumQueries(2):
+            summary_from_registrations(params)
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN output is SQLite specific')
+    def test_raw_summary_plan_is_one_scan_without_sorting(self):
+        plan = summary_rows(filter_registrations(self.params(f'event={self.ten_k.pk}&gender=male'))).explain()
+        # the registrations table is read once (by scan or index), joined rows are index lookups
+        self.assertEqual(len(re.findall(r'(?:SCAN|SEARCH) accounts_registration\b(?!_)', plan)), 1)
+        self.assertIn('LEFT-JOIN', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_raw_summary_counts_each_registration_once(self):
+        payload = summary_from_registrations(self.params(f'event={self.ten_k.pk}&event={self.half.pk}'))
+        self.assertEqual(payload['total'], 8)
+        self.assertEqual(sum(row['count'] for row in payload['by_gender']), 8)
+        self.assertEqual(sum(row['count'] for row in payload['by_state']), 8)
+        # by_event only covers the filtered events; 2 registrations are in both
+        self.assertEqual({row['name']: row['count'] for row in payload['by_event']}, {'10K': 6, '21K': 4})
+
+    def test_raw_summary_without_filters_keeps_unassigned_events(self):
+        payload = summary_from_registrations(self.params(''))
+        self.assertEqual(payload['total'], 12)
+        self.assertEqual({row['name']: row['count'] for row in payload['by_event']},
+                         {'10K': 6, '21K': 4, 'Unknown': 4})
+
+    # ----- calendar breakdowns -----
+
+    def test_created_date_key_is_set_on_save(self):
+        reg = Registration.objects.first()
+        self.assertEqual(reg.created_date_key, date_key(reg.created_at))
+
+    def test_series_is_gap_free_and_joins_dim_date(self):
+        regs = list(Registration.objects.order_by('pk'))
+        # 2 registrations on Fri 2026-01-02, 1 on Mon 2026-01-05, the rest later
+        for reg, day in zip(regs, [date(2026, 1, 2), date(2026, 1, 2), date(2026, 1, 5)]):
+            Registration.objects.filter(pk=reg.pk).update(created_date_key=date_key(day))
+        dimDate.objects.create(date_key=20260103, date=date(2026, 1, 3), year=2026, month=1, day=3,
+                               month_name='January', day_name='Saturday', quarter=1, is_weekend=True)
+
+        payload = summary_from_registrations(self.params('date_to=2026-01-31'))
+        self.assertEqual(payload['series'], [
+            {'day': '2026-01-02', 'count': 2},
+            {'day': '2026-01-03', 'count': 0},
+            {'day': '2026-01-04', 'count': 0},
+            {'day': '2026-01-05', 'count': 1},
+        ])
+        self.assertEqual(payload['by_day_type'], [{'type': 'weekday', 'count': 3}, {'type': 'weekend', 'count': 0}])
+        self.assertEqual(payload['by_month'], [{'month': '2026-01', 'label': 'January 2026', 'count': 3}])
+        self.assertEqual(payload['by_quarter'], [{'quarter': '2026-Q1', 'count': 3}])
+        weekdays = {row['day_name']: row['count'] for row in payload['by_weekday']}
+        self.assertEqual((weekdays['Friday'], weekdays['Monday'], weekdays['Saturday']), (2, 1, 0))
+
+    # ----- rollup summary -----
+
+    def test_rollup_summary_query_count(self):
+        with self.assertNumQueries(11):
+            summary_from_rollup(self.params(f'event={self.ten_k.pk}'))
+
+    def test_rollup_defers_to_raw_for_search_and_several_events(self):
+        self.assertIsNone(summary_from_rollup(self.params('q=runner')))
+        self.assertIsNone(summary_from_rollup(self.params(f'event={self.ten_k.pk}&event={self.half.pk}')))
+
+    def test_rollup_and_raw_summaries_agree(self):
+        for query in ('', f'event={self.ten_k.pk}', f'event={self.five_k.pk}', 'gender=female',
+                      'age_band=56plus&age_band=46to55', 'date_from=2000-01-01'):
+            with self.subTest(query=query):
+                self.assertEqual(
+                    _normalized(summary_from_rollup(self.params(query))),
+                    _normalized(summary_from_registrations(self.params(query))),
+                )
+
+    def test_rollup_follows_mixed_writes(self):
+        regs = list(Registration.objects.order_by('pk'))
+        regs[0].gender = 'female'
+        regs[0].save()
+        regs[1].district_fk = regs[0].district_fk
+        regs[1].date_of_birth = date(2001, 5, 5)  # new age band and category
+        regs[1].save()
+        regs[2].events.add(self.five_k)
+        regs[3].events.remove(self.half)
+        regs[4].events.clear()
+        self.five_k.registrations.add(regs[5], regs[6])
+        self.half.registrations.remove(regs[0])
+        self.ten_k.registrations.clear()
+        regs[7].delete()
+        added = Registration.objects.create(name='Late entry', gender='female', date_of_birth=date(1999, 9, 9),
+                                            state=regs[0].state, district_fk=regs[0].district_fk)
+        added.events.set([self.half, self.five_k])
+        relay = DimEventCategory.objects.create(event_type=self.ten_k.event_type, name='Relay')
+        relay.registrations.add(regs[8], added)
+        relay.delete()  # the cascade removes M2M rows without m2m_changed
+
+        def cells():
+            return sorted(RegistrationRollup.objects.values_list(*KEY_FIELDS, 'count'), key=repr)
+
+        incremental = cells()
+        rebuild()
+        self.assertEqual(incremental, cells())
+        for query in ('', f'event={self.five_k.pk}', f'event={self.half.pk}', 'gender=female',
+                      'age_band=18to29&age_band=30to45'):
+            with self.subTest(query=query):
+                self.assertEqual(
+                    _normalized(summary_from_rollup(self.params(query))),
+                    _normalized(summary_from_registrations(self.params(query))),
+                )
+
+    # ----- pivot snapshot -----
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_numpy_and_python_pivots_agree(self):
+        self.five_k.registrations.add(*Registration.objects.all()[:3])
+        snapshot = RegistrationSnapshot()
+        snapshot.refresh(force=True)
+        ten_k = snapshot.dictionaries['event'].codes[self.ten_k.pk]
+        female = snapshot.dictionaries['gender'].codes['female']
+        cases = [
+            (('gender',), {}),
+            (('district', 'age_band'), {}),
+            (('event',), {}),
+            (('district', 'event'), {'gender': {female}}),
+            (('gender', 'category'), {'event': {ten_k}}),
+            (('event', 'day'), {'event': {ten_k}}),
+            (DIMENSIONS, {}),
+        ]
+        for dims, allowed in cases:
+            with self.subTest(dims=dims, allowed=allowed):
+                self.assertEqual(
+                    snapshot._count_numpy(list(dims), dict(allowed)),
+                    snapshot._count_python(list(dims), dict(allowed)),
+                )
+
+    def test_snapshot_picks_up_late_commits_stamped_before_the_last_refresh(self):
+        snapshot = RegistrationSnapshot()
+        snapshot.refresh(force=True)
+        reg = Registration.objects.filter(gender='male').order_by('pk').first()
+        # committed after the refresh, but stamped (at save) before the newest row it saw
+        Registration.objects.filter(pk=reg.pk).update(
+            gender='female', updated_at=snapshot.max_updated - timedelta(seconds=1),
+        )
+
+        snapshot.refresh(force=True)
+
+        gender = snapshot.dictionaries['gender']
+        self.assertEqual(gender.values[snapshot.columns['gender'][snapshot.rows[reg.pk]]], 'female')
+
+    def test_api_endpoint(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('accounts:api_analysis_summary'), {'q': 'runner'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total'], 12)
+
+    def test_cached_summary_is_invalidated_by_a_committed_write(self):
+        self.client.force_login(self.staff)
+        url = reverse('accounts:api_analysis_summary')
+        self.assertEqual(self.client.get(url).json()['total'], 12)
+        self.assertEqual(self.client.get(url).json()['total'], 12)  # served from the cache
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Registration.objects.create(name='Late entry', gender='female')
+
+        self.assertEqual(self.client.get(url).json()['total'], 13)
+
+
+class ExportJobTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.pks = [Registration.objects.create(name=f'Runner {i}').pk for i in range(3)]
+
+    def test_pk_runs(self):
+        self.assertEqual(pk_runs([1, 2, 3, 5, 7, 8]), '1-3,5,7-8')
+        self.assertEqual(pk_runs([]), '')
+
+    def test_large_selection_is_one_query_parameter(self):
+        label, queryset, rows = EXPORT_KINDS['registrations']
+        qs = queryset(QueryDict('ids=1-300000'))  # past SQLite's variable limit (32766, or 250000 in some builds)
+        self.assertEqual(sorted(qs.values_list('pk', flat=True)), self.pks)
+
+    def test_part_finished_twice_is_counted_once(self):
+        job = create_export_job('registrations', f'ids={pk_runs(self.pks)}', rows_per_part=2)
+        first, second = claim_part(), claim_part()
+
+        build_part(first)
+        build_part(first)  # a worker that re-claimed the part after the lease ran out
+        job.refresh_from_db()
+        self.assertEqual((job.parts_done, job.file), (1, ''))
+
+        build_part(second)
+        job.refresh_from_db()
+        self.assertEqual((job.parts_done, job.status), (2, ExportJob.STATUS_DONE))
+
+        build_part(first)  # finishing after assembly leaves no stray part file
+        self.assertEqual(sorted(p.name for p in (Path(settings.MEDIA_ROOT) / 'exports' / str(job.pk)).iterdir()),
+                         [Path(job.file).name])
+
+    def test_overlapping_builds_of_a_part_use_their_own_temp_files(self):
+        job = create_export_job('registrations', f'ids={pk_runs(self.pks)}', rows_per_part=5)
+        part = claim_part()
+        real_gzip_chunks = exports.gzip_chunks
+
+        def racing_gzip_chunks(chunks):
+            # a second worker re-claims and builds the part while the first is mid-write
+            if racing_gzip_chunks.first:
+                racing_gzip_chunks.first = False
+                build_part(ExportPart.objects.get(pk=part.pk))
+            yield from real_gzip_chunks(chunks)
+        racing_gzip_chunks.first = True
+
+        with mock.patch.object(exports, 'gzip_chunks', racing_gzip_chunks):
+            build_part(part)
+
+        job.refresh_from_db()
+        self.assertEqual((job.parts_done, job.status), (1, ExportJob.STATUS_DONE))
+        with gzip.open(Path(settings.MEDIA_ROOT) / job.file, 'rt', encoding='utf-8-sig') as fh:
+            self.assertEqual(len(fh.read().splitlines()), 1 + len(self.pks))
+        self.assertFalse(list((Path(settings.MEDIA_ROOT) / 'exports' / str(job.pk)).glob('*.tmp')))
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], CHANGE_FEED_SETTLE_SECONDS=0)
+class ChangeFeedTests(TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.seqs = [
+            ChangeLogEntry.objects.create(model='accounts.registration', object_id=i, action='create').seq
+            for i in range(1, 6)
+        ]
+
+    def changes(self, cursor):
+        return self.client.get(reverse('api_changes'), {'cursor': cursor}).json()
+
+    def test_gaps_before_the_cursor_are_not_a_reset(self):
+        # low seqs missing without a prune: rolled-back inserts
+        ChangeLogEntry.objects.filter(seq__lte=self.seqs[2]).delete()
+        feed = self.changes(self.seqs[0])
+        self.assertFalse(feed['reset'])
+        self.assertEqual([c['seq'] for c in feed['changes']], self.seqs[3:])
+
+    def test_cursor_below_the_prune_mark_resets(self):
+        ChangeLogEntry.objects.filter(seq__lte=self.seqs[1]).update(changed_at=timezone.now() - timedelta(days=60))
+        call_command('prune_change_log', days=30, stdout=io.StringIO())
+
+        self.assertEqual(ChangeLogPrune.high_water_mark(), self.seqs[1])
+        self.assertTrue(self.changes(self.seqs[0])['reset'])
+        self.assertFalse(self.changes(self.seqs[1])['reset'])
+
+    def test_unsettled_entries_are_held_back(self):
+        ChangeLogEntry.objects.filter(seq__lte=self.seqs[1]).update(changed_at=timezone.now() - timedelta(minutes=1))
+        with override_settings(CHANGE_FEED_SETTLE_SECONDS=30):
+            feed = self.changes(0)
+        self.assertEqual([c['seq'] for c in feed['changes']], self.seqs[:2])
+        self.assertEqual(feed['cursor'], self.seqs[1])
+        self.assertEqual(len(self.changes(feed['cursor'])['changes']), 3)
+
+
+class DimDateKeyMigrationTests(TransactionTestCase):
+    before = [('app_admin', '0009_registration_rollup')]
+    after = [('app_admin', '0010_dimdate_date_key')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_backfill_keeps_the_first_row_of_repeated_dates(self):
+        old_dim_date = self.migrate(self.before).get_model('app_admin', 'dimDate')
+        first = old_dim_date.objects.create(date=date(2025, 1, 5), year=2025, month=1, day=5)
+        old_dim_date.objects.create(date=date(2025, 1, 5), year=2025, month=1, day=5)
+        other = old_dim_date.objects.create(date=date(2025, 12, 31), year=2025, month=12, day=31)
+
+        new_dim_date = self.migrate(self.after).get_model('app_admin', 'dimDate')
+
+        self.assertEqual(
+            sorted(new_dim_date.objects.values_list('pk', 'date_key')),
+            [(first.pk, 20250105), (other.pk, 20251231)],
+        )
+
+
+class ReferenceDataTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.state = DimState.objects.create(name='Uttar Pradesh')
+        DimDistrict.objects.create(state=cls.state, name='Lucknow', code='LKO')
+
+    def setUp(self):
+        refdata.expire()
+
+    def test_admin_edit_reloads_after_commit(self):
+        self.assertEqual([d.name for d in refdata.get().districts], ['Lucknow'])
+        with self.captureOnCommitCallbacks(execute=True):
+            DimDistrict.objects.create(state=self.state, name='Kanpur', code='KNP')
+        self.assertEqual([d.name for d in refdata.get().districts], ['Kanpur', 'Lucknow'])
+
+    def test_version_bumped_by_another_process_reloads(self):
+        refdata.get()
+        # written without signals, as if by another instance whose bump reached the shared cache
+        DimDistrict.objects.bulk_create([DimDistrict(state=self.state, name='Agra', code='AGR')])
+        self.assertEqual(len(refdata.get().districts), 1)
+        cache.incr(refdata.VERSION_KEY)
+        self.assertEqual(len(refdata.get().districts), 1)  # not checked again until REFERENCE_DATA_CHECK_SECONDS
+        with override_settings(REFERENCE_DATA_CHECK_SECONDS=0):
+            self.assertEqual(len(refdata.get().districts), 2)
+
+
+@override_settings(
+    ALLOWED_HOSTS=['testserver'],
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'racemate_cache'}},
+)
+class ReferenceDataQueryCountTests(TestCase):
+    """Labels come from refdata without a version read (a query on the database cache) per label."""
+
+    @classmethod
+    def setUpTestData(cls):
+        state = DimState.objects.create(name='Uttar Pradesh')
+        districts = DimDistrict.objects.bulk_create(
+            [DimDistrict(state=state, name=f'District {i:02}', code=f'D{i:02}') for i in range(30)]
+        )
+        Registration.objects.bulk_create(
+            [Registration(name=f'Runner {i}', gender='male', state=state, district_fk=district)
+             for i, district in enumerate(districts)]
+        )
+        cls.staff = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+
+    def setUp(self):
+        refdata.expire()
+        self.client.force_login(self.staff)
+
+    def test_district_changelist(self):
+        url = reverse('admin:app_admin_dimdistrict_changelist')
+        self.client.get(url)
+        # session, user, state filter, two counts, the page; was 6 + one version read per district
+        with self.assertNumQueries(6):
+            self.client.get(url)
+
+    def test_bib_list(self):
+        url = reverse('app_bib:registration_bib_list')
+        self.client.get(url)
+        # session, user, two for the ETag, page rows, three cache reads (count, facets), bib jobs
+        with self.assertNumQueries(9):
+            self.client.get(url)
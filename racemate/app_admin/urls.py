@@ -20,6 +20,14 @@ urlpatterns = [
     path('analysis/', views.analysis_dashboard, name='analysis_dashboard'),
     path('analysis/export/csv/', views.analysis_export_csv, name='analysis_export_csv'),
     path('api/analysis/summary/', views.api_analysis_summary, name='api_analysis_summary'),
+    path('api/analysis/pivot/', views.api_analysis_pivot, name='api_analysis_pivot'),
+    path('api/changes/', views.api_changes, name='api_changes'),
+
+    # Background exports
+    path('exports/', views.export_jobs, name='export_jobs'),
+    path('exports/new/', views.export_job_create, name='export_job_create'),
+    path('exports/<int:pk>/status/', views.export_job_status, name='export_job_status'),
+    path('exports/<int:pk>/download/', views.export_job_download, name='export_job_download'),
 
     # Registrations management
     path('registrations/', views.registration_list, name='registration_list'),
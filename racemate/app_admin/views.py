@@ -3,16 +3,27 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse, Http404
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from django.views.decorators.http import require_POST
 from django.db import models as djmodels
-from django.db.models import Count
-from django.db.models.functions import TruncDate
 from django.utils.dateparse import parse_date
 import csv
+from collections import Counter
+from datetime import timedelta
 
-from accounts.models import Registration
+from accounts.models import AGE_BAND_CHOICES, Registration
+from accounts.projections import registration_list_rows
+from accounts.search import search_registrations
 from .forms import RegistrationForm
-from app_admin.models import DimState, DimDistrict, DimEventCategory
+from app_admin.models import ChangeLogEntry, ChangeLogPrune, DimState, DimDistrict, DimEventCategory, ExportJob
+from .exports import EXPORT_KINDS, create_export_job, run_one_part, export_file_path
+from . import refdata, snapshot, summary_cache
+from .dates import calendar_summary, date_key
+from .rollups import summary_from_rollup
 
 
 # ------------------------------
@@ -24,7 +35,7 @@ def registration_list(request):
     """
     Display all registrations in a simple table.
     """
-    registrations = Registration.objects.all()
+    registrations = list(registration_list_rows())
     return render(request, 'app_admin/registration_list.html', {
         'registrations': registrations
     })
@@ -80,49 +91,63 @@ def build_filtered_qs(request):
     """
     Returns filtered queryset of Registration based on GET params.
     """
+    return filter_registrations(request.GET)
+
+
+def filter_registrations(params):
+    """
+    Filter Registration by analysis params (a QueryDict, e.g. request.GET or a
+    querystring stored on an export job).
+    """
     qs = Registration.objects.all()
 
     # Date range
-    date_from = request.GET.get('date_from')
-    date_to = request.GET.get('date_to')
+    date_from = params.get('date_from')
+    date_to = params.get('date_to')
+    # (on the indexed day key; created_at__date can't use an index)
     if date_from:
         d = parse_date(date_from)
         if d:
-            qs = qs.filter(created_at__date__gte=d)
+            qs = qs.filter(created_date_key__gte=date_key(d))
     if date_to:
         d = parse_date(date_to)
         if d:
-            qs = qs.filter(created_at__date__lte=d)
+            qs = qs.filter(created_date_key__lte=date_key(d))
 
     # State filter (multi)
-    state_ids = request.GET.getlist('state')
+    state_ids = params.getlist('state')
     if state_ids:
         qs = qs.filter(state_id__in=state_ids)
 
-    # Event filter (multi)
-    event_ids = request.GET.getlist('event')
+    # Event filter (multi): EXISTS semi-join on the M2M table, so a
+    # registration in several of the events stays one row (no DISTINCT needed)
+    event_ids = params.getlist('event')
     if event_ids:
-        qs = qs.filter(events__in=event_ids)
+        qs = qs.filter(djmodels.Exists(Registration.events.through.objects.filter(
+            registration_id=djmodels.OuterRef('pk'), dimeventcategory_id__in=event_ids,
+        )))
 
     # Profession filter
-    profession = request.GET.get('profession')
+    profession = params.get('profession')
     if profession:
         qs = qs.filter(profession=profession)
 
     # Gender filter (multi)
-    gender_vals = request.GET.getlist('gender')
+    gender_vals = params.getlist('gender')
     if gender_vals:
         qs = qs.filter(gender__in=gender_vals)
 
-    # Quick search (name or mobile)
-    search = request.GET.get('q')
+    # Age band filter (multi, stored band on the event date)
+    age_bands = params.getlist('age_band')
+    if age_bands:
+        qs = qs.filter(age_band__in=age_bands)
+
+    # Quick search: prefix match on name, father's name, mobile, bib, district
+    search = params.get('q')
     if search:
-        qs = qs.filter(
-            djmodels.Q(name__icontains=search) |
-            djmodels.Q(mobile_number__icontains=search)
-        )
+        qs = search_registrations(qs, search)
 
-    return qs.distinct()
+    return qs
 
 
 # ------------------------------
@@ -138,58 +163,145 @@ def api_analysis_summary(request):
       - by_event
       - by_gender
       - by_category (age group)
+      - by_age_band (stored age band)
       - breakdown (category + event + gender)
-      - daily series
+      - daily series (gap-free) and by month / quarter / weekday / weekend
+
+    Served from the RegistrationRollup table unless the filters need the raw
+    registrations (free-text search, several events). Responses are cached
+    until the next registration write (see app_admin.summary_cache).
     """
-    qs = build_filtered_qs(request)
+    payload, version = summary_cache.get_cached(request.GET)
+    if payload is None:
+        if getattr(settings, 'ANALYSIS_USE_ROLLUP', True):
+            payload = summary_from_rollup(request.GET)
+        if payload is None:
+            payload = summary_from_registrations(request.GET)
+        summary_cache.store(request.GET, version, payload)
+    return JsonResponse(payload)
 
-    total = qs.count()
 
-    # By State
-    by_state_qs = qs.values('state__id', 'state__name').annotate(count=Count('id')).order_by('-count')
-    by_state = [{'id': r['state__id'], 'name': r['state__name'] or 'Unknown', 'count': r['count']} for r in by_state_qs]
+@staff_member_required
+def api_analysis_pivot(request):
+    """
+    Registration counts for any combination of dimensions, from the in-process
+    columnar snapshot (app_admin.snapshot) instead of new SQL per combination.
+
+    GET params:
+      by      dimensions to group by, comma separated or repeated:
+              state, district, gender, category, profession, age_band, day, event
+      state, district, gender, category, profession, age_band, day, event
+              optional filters (repeatable; ids for state/district/event,
+              YYYYMMDD keys for day)
+      limit   maximum rows returned (default all)
+
+    Grouping by event counts a registration once per event.
+    """
+    dims = [d.strip() for value in request.GET.getlist('by') for d in value.split(',') if d.strip()]
+    unknown = [d for d in dims if d not in snapshot.DIMENSIONS]
+    if not dims or unknown or len(set(dims)) != len(dims):
+        return HttpResponseBadRequest(f"by must name distinct dimensions among: {', '.join(snapshot.DIMENSIONS)}.")
+    filters = {}
+    try:
+        for name in snapshot.DIMENSIONS:
+            values = [v for v in request.GET.getlist(name) if v != '']
+            if values:
+                filters[name] = [int(v) for v in values] if name in snapshot.INTEGER_DIMENSIONS else values
+        limit = int(request.GET['limit']) if request.GET.get('limit') else None
+    except ValueError:
+        return HttpResponseBadRequest("state, district, day, event and limit must be integers.")
+
+    snap = snapshot.get_snapshot()
+    results = snap.pivot(dims, filters)
+    return JsonResponse({
+        'by': dims,
+        'rows': list(snapshot.labels(dims, results[:limit] if limit is not None else results)),
+        'groups': len(results),
+        'engine': 'numpy' if snapshot.np is not None else 'python',
+        'snapshot': {'registrations': len(snap), 'refreshed_at': snap.refreshed_at.isoformat()},
+    })
 
-    # By Event
-    by_event_qs = qs.values('events__id', 'events__name').annotate(count=Count('id')).order_by('-count')
-    by_event = [{'id': r['events__id'], 'name': r['events__name'] or 'Unknown', 'count': r['count']} for r in by_event_qs]
 
-    # By Gender
-    by_gender_qs = qs.values('gender').annotate(count=Count('id')).order_by('gender')
-    by_gender = [{'gender': r['gender'] or 'Unspecified', 'count': r['count']} for r in by_gender_qs]
+def _nulls_first(value):
+    # sort key matching SQLite's ORDER BY (NULLs first)
+    return (value is not None, value)
 
-    # By Category (age group)
-    by_category_qs = qs.values('category').annotate(count=Count('id')).order_by('category')
-    by_category = [{'age_group': r['category'] or 'Unspecified', 'count': r['count']} for r in by_category_qs]
 
-    # Detailed Breakdown (category + event + gender)
-    breakdown_qs = (
-        qs.values('category', 'events__name', 'gender')
-        .annotate(count=Count('id'))
-        .order_by('category', 'events__name', 'gender')
+def summary_rows(qs):
+    """The one scan summary_from_registrations() counts from: a row per (registration, event)."""
+    return (
+        qs.order_by()
+        .values_list('pk', 'state_id', 'state__name', 'gender', 'category', 'age_band', 'created_date_key',
+                     'events__id', 'events__name')
     )
-    breakdown = [
-        {
-            'age_group': r['category'] or 'Unspecified',
-            'event': r['events__name'] or 'Unspecified',
-            'gender': r['gender'] or 'Unspecified',
-            'count': r['count'],
-        }
-        for r in breakdown_qs
-    ]
-
-    # Daily time series
-    series_qs = qs.annotate(day=TruncDate('created_at')).values('day').annotate(count=Count('id')).order_by('day')
-    series = [{'day': r['day'].isoformat(), 'count': r['count']} for r in series_qs if r['day']]
 
-    return JsonResponse({
-        'total': total,
-        'by_state': by_state,
-        'by_event': by_event,
-        'by_gender': by_gender,
-        'by_category': by_category,
-        'series': series,
-        'breakdown': breakdown,
-    })
+
+def summary_from_registrations(params):
+    """
+    The api_analysis_summary payload from the registrations themselves, in a
+    single scan: one query returns each filtered registration joined to its
+    events (LEFT JOIN, one row per event) with state/event names, and every
+    breakdown is counted from that result in Python. With an event filter,
+    by_event and the breakdown only cover the filtered events.
+    """
+    event_ids = {int(e) for e in params.getlist('event') if str(e).isdigit()}
+    rows = summary_rows(filter_registrations(params))
+
+    seen = set()
+    by_state, state_names = Counter(), {}
+    by_gender, by_category, by_age_band, series = Counter(), Counter(), Counter(), Counter()
+    by_event, event_names, breakdown = Counter(), {}, Counter()
+    for pk, state_id, state_name, gender, category, band, day_key, event_id, event_name in rows.iterator(chunk_size=2000):
+        if pk not in seen:
+            seen.add(pk)
+            by_state[state_id] += 1
+            state_names[state_id] = state_name
+            by_gender[gender] += 1
+            by_category[category] += 1
+            by_age_band[band] += 1
+            series[day_key] += 1
+        if event_ids and event_id not in event_ids:
+            continue
+        by_event[event_id] += 1
+        event_names[event_id] = event_name
+        breakdown[(category, event_name, gender)] += 1
+
+    age_band_labels = dict(AGE_BAND_CHOICES)
+    return {
+        'total': len(seen),
+        'by_state': [
+            {'id': state_id, 'name': state_names[state_id] or 'Unknown', 'count': n}
+            for state_id, n in sorted(by_state.items(), key=lambda kv: (-kv[1], _nulls_first(kv[0])))
+        ],
+        'by_event': [
+            {'id': event_id, 'name': event_names[event_id] or 'Unknown', 'count': n}
+            for event_id, n in sorted(by_event.items(), key=lambda kv: (-kv[1], _nulls_first(kv[0])))
+        ],
+        'by_gender': [
+            {'gender': gender or 'Unspecified', 'count': n}
+            for gender, n in sorted(by_gender.items(), key=lambda kv: _nulls_first(kv[0]))
+        ],
+        'by_category': [
+            {'age_group': category or 'Unspecified', 'count': n}
+            for category, n in sorted(by_category.items(), key=lambda kv: _nulls_first(kv[0]))
+        ],
+        'by_age_band': [
+            {'age_band': band, 'label': age_band_labels.get(band, 'Unspecified'), 'count': n}
+            for band, n in sorted(by_age_band.items(), key=lambda kv: _nulls_first(kv[0]))
+        ],
+        **calendar_summary(series),
+        'breakdown': [
+            {
+                'age_group': category or 'Unspecified',
+                'event': event_name or 'Unspecified',
+                'gender': gender or 'Unspecified',
+                'count': n,
+            }
+            for (category, event_name, gender), n in sorted(
+                breakdown.items(), key=lambda kv: tuple(_nulls_first(v) for v in kv[0])
+            )
+        ],
+    }
 
 
 @staff_member_required
@@ -197,36 +309,49 @@ def analysis_export_csv(request):
     """
     Export filtered registrations to CSV for admin users.
     """
-    qs = build_filtered_qs(request).prefetch_related('events').select_related('state', 'district_fk').order_by('-created_at')
+    qs = build_filtered_qs(request)
 
     response = HttpResponse(content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename="registrations.csv"'
     writer = csv.writer(response)
-    writer.writerow(['id', 'name', 'gender', 'mobile', 'state', 'district', 'events', 'category', 'created_at'])
-
-    for r in qs.iterator():
-        events = "; ".join(e.name for e in r.events.all())
-        writer.writerow([
-            r.id,
-            r.name,
-            r.gender or '',
-            r.mobile_number,
-            r.state.name if r.state else '',
-            r.district_fk.name if r.district_fk else '',
-            events,
-            r.category or '',
-            r.created_at.strftime('%Y-%m-%d %H:%M:%S') if r.created_at else ''
-        ])
+    writer.writerows(analysis_rows(qs.order_by('-created_at')))
     return response
 
 
+def analysis_rows(qs):
+    """
+    Header plus one CSV row per registration in `qs` (also used by export jobs).
+    """
+    yield ['id', 'name', 'gender', 'mobile', 'state', 'district', 'events', 'category', 'created_at']
+
+    # names and joined events come from the flat read row: no joins to the
+    # dimension tables and no events prefetch
+    columns = qs.values_list(
+        'id', 'name', 'gender', 'mobile_number', 'read_row__state_name', 'read_row__district_name',
+        'read_row__events_display', 'category', 'created_at',
+    )
+    for pk, name, gender, mobile, state_name, district_name, events, category, created_at in columns.iterator(chunk_size=2000):
+        yield [
+            pk,
+            name,
+            gender or '',
+            mobile,
+            state_name or '',
+            district_name or '',
+            events or '',
+            category or '',
+            created_at.strftime('%Y-%m-%d %H:%M:%S') if created_at else ''
+        ]
+
+
 @staff_member_required
 def analysis_dashboard(request):
     """
     Render analysis dashboard template with filter data.
     """
-    states = DimState.objects.all().order_by('name')
-    events = DimEventCategory.objects.all().order_by('name')
+    ref = refdata.get()
+    states = ref.states
+    events = ref.events
     professions = [p[0] for p in Registration.PROFESSION_CHOICES]
 
     # Gender list
@@ -247,3 +372,208 @@ def analysis_dashboard(request):
         'genders': genders,
     })
 
+
+
+# ------------------------------
+# Background export jobs
+# ------------------------------
+
+@staff_member_required
+def export_jobs(request):
+    """
+    List recent export jobs with progress and download links.
+    """
+    jobs = list(ExportJob.objects.filter(created_by=request.user).order_by('-created_at')[:25])
+    for job in jobs:
+        job.kind_label = EXPORT_KINDS[job.kind][0] if job.kind in EXPORT_KINDS else job.kind
+    return render(request, 'app_admin/export_jobs.html', {'jobs': jobs})
+
+
+@staff_member_required
+@require_POST
+def export_job_create(request):
+    """
+    Queue a background export. POST: kind (see exports.EXPORT_KINDS) and qs,
+    the querystring of the page's current filters.
+    """
+    kind = request.POST.get('kind', '')
+    if kind not in EXPORT_KINDS:
+        return HttpResponseBadRequest("Unknown export kind.")
+    job = create_export_job(kind, request.POST.get('qs', '') or '', user=request.user)
+    messages.success(request, f"Export #{job.pk} queued ({job.rows_total} rows in {job.parts_total} part(s)).")
+    return redirect('export_jobs')
+
+
+@staff_member_required
+def export_job_status(request, pk):
+    """
+    JSON progress of an export job. A POST also builds one pending part when
+    EXPORT_JOB_RUN_ON_POLL is on (serverless deployments without a worker).
+    """
+    job = get_object_or_404(ExportJob, pk=pk)
+    if request.method == 'POST' and not job.is_finished and getattr(settings, 'EXPORT_JOB_RUN_ON_POLL', True):
+        run_one_part()
+        job.refresh_from_db()
+
+    return JsonResponse({
+        'id': job.pk,
+        'status': job.status,
+        'parts_done': job.parts_done,
+        'parts_total': job.parts_total,
+        'percent': job.percent,
+        'finished': job.is_finished,
+        'size': job.size,
+        'error': job.error,
+        'download_url': reverse('export_job_download', args=[job.pk]) if job.file else None,
+    })
+
+
+def _parse_range(header, size):
+    """
+    Parse a single "bytes=start-end" Range header against `size`.
+    Returns (start, end) inclusive, None when absent/ignored, or False if unsatisfiable.
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    start, _, end = header[len('bytes='):].strip().partition('-')
+    try:
+        if start == '':
+            # suffix range: last N bytes
+            length = int(end)
+            if length <= 0:
+                return False
+            return max(0, size - length), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _file_chunks(path, start, length, block_size=64 * 1024):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            data = fh.read(min(block_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+@staff_member_required
+def export_job_download(request, pk):
+    """
+    Download a finished export. Honours single-range "Range: bytes=..." requests
+    (and If-Range) so interrupted downloads can resume.
+    """
+    job = get_object_or_404(ExportJob, pk=pk, status=ExportJob.STATUS_DONE)
+    path = export_file_path(job)
+    if not path.exists():
+        raise Http404("Export file is no longer available.")
+
+    size = path.stat().st_size
+    etag = f'"export-{job.pk}-{size}"'
+    last_modified = http_date(path.stat().st_mtime)
+
+    byte_range = _parse_range(request.headers.get('Range'), size)
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range not in (etag, last_modified):
+        # file changed since the partial download started: send it whole
+        byte_range = None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        response = StreamingHttpResponse(_file_chunks(path, 0, size), content_type='application/gzip')
+        response['Content-Length'] = str(size)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_file_chunks(path, start, end - start + 1),
+                                         content_type='application/gzip', status=206)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    response['Content-Disposition'] = f'attachment; filename="{path.name}"'
+    return response
+
+
+# ------------------------------
+# Change feed
+# ------------------------------
+
+CHANGES_PAGE_SIZE = 500
+CHANGES_MAX_PAGE_SIZE = 5000
+
+
+@staff_member_required
+def api_changes(request):
+    """
+    Incremental sync: entries of the change log after `cursor`, oldest first.
+
+    GET params:
+      cursor  last seq the client has seen (default 0 = from the beginning);
+              "latest" returns no changes, just the current head to start from
+      limit   page size (default 500, max 5000)
+      model   optional filter, repeatable: accounts.registration,
+              app_results.participation, app_bib.timeentry
+
+    Response: {"changes": [...], "cursor": <pass back next time>, "has_more": bool,
+    "reset": bool}. Each change names the model, object id and action; clients
+    re-fetch or drop those objects instead of reloading whole tables. "reset"
+    means entries after the cursor were pruned (prune_change_log): reload fully.
+
+    Seqs are handed out at insert but become visible at commit, so the feed
+    only serves entries older than CHANGE_FEED_SETTLE_SECONDS and stops before
+    the first newer one; a write transaction open longer than that can still
+    commit below a cursor already served.
+    """
+    entries = ChangeLogEntry.objects.all()
+    models_filter = [m.lower() for m in request.GET.getlist('model') if m]
+    if models_filter:
+        entries = entries.filter(model__in=models_filter)
+
+    # entries from the first unsettled seq on are held back (changed_at is indexed)
+    horizon = timezone.now() - timedelta(seconds=settings.CHANGE_FEED_SETTLE_SECONDS)
+    unsettled = ChangeLogEntry.objects.filter(changed_at__gt=horizon).order_by('seq').values_list('seq', flat=True).first()
+    if unsettled is not None:
+        entries = entries.filter(seq__lt=unsettled)
+
+    raw_cursor = request.GET.get('cursor', '0') or '0'
+    if raw_cursor == 'latest':
+        head = entries.order_by('-seq').values_list('seq', flat=True).first() or 0
+        return JsonResponse({'changes': [], 'cursor': head, 'has_more': False, 'reset': False})
+    try:
+        cursor = max(0, int(raw_cursor))
+        limit = min(max(1, int(request.GET.get('limit', CHANGES_PAGE_SIZE))), CHANGES_MAX_PAGE_SIZE)
+    except ValueError:
+        return HttpResponseBadRequest("cursor and limit must be integers.")
+
+    rows = list(
+        entries.filter(seq__gt=cursor).order_by('seq')
+        .values_list('seq', 'model', 'object_id', 'action', 'changed_at')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # seqs have gaps (rolled-back inserts), so compare against the recorded prune mark
+    reset = bool(cursor and cursor < ChangeLogPrune.high_water_mark())
+
+    return JsonResponse({
+        'changes': [
+            {'seq': seq, 'model': model, 'id': object_id, 'action': action, 'at': changed_at.isoformat()}
+            for seq, model, object_id, action, changed_at in rows
+        ],
+        'cursor': rows[-1][0] if rows else cursor,
+        'has_more': has_more,
+        'reset': reset,
+    })
@@ -19,3 +19,12 @@ class TimeEntryAdmin(admin.ModelAdmin):
     list_filter = ('created_at',)
     search_fields = ('bib_id', 'note')
     ordering = ('-created_at',)
+
+BibJob = apps.get_model('app_bib', 'BibJob')
+
+@admin.register(BibJob)
+class BibJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'processed', 'total', 'generated', 'skipped', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('last_pk', 'created_at', 'started_at', 'finished_at', 'updated_at')
+    ordering = ('-created_at',)
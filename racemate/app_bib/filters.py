@@ -1,29 +1,28 @@
 
 # /filters.py
+import hashlib
+
 import django_filters
 from django import forms
-from datetime import date
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Q
 
-from accounts.models import Registration
+from accounts.models import AGE_BAND_CHOICES, Registration
+from app_admin import refdata, summary_cache
 
 
 class RegistrationFilter(django_filters.FilterSet):
     """
     Filters for Bib List Page.
-    Supports: district, gender, age group.
+    Supports: district, gender, age group, bib lookup.
 
     This implementation discovers the model used for `district_fk` at runtime
     (so we don't need to import District directly and won't crash if it lives
     in another app).
     """
-    AGE_GROUP_CHOICES = [
-        ('under18', 'Under 18'),
-        ('18to29', '18–29'),
-        ('30to45', '30–45'),
-        ('46to55', '46–55'),
-        ('56plus', '56+'),
-    ]
+    AGE_GROUP_CHOICES = AGE_BAND_CHOICES
 
     # We'll initialize district queryset in __init__ below to avoid importing District statically.
     district_fk = django_filters.ModelChoiceFilter(
@@ -47,9 +46,22 @@ class RegistrationFilter(django_filters.FilterSet):
         widget=forms.Select(attrs={'class': 'form-select'})
     )
 
+    bib = django_filters.CharFilter(
+        label='Bib',
+        method='filter_bib',
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'LKO-U23-M-0001 or 0001'})
+    )
+
     class Meta:
         model = Registration
-        fields = ['district_fk', 'gender', 'age_group']
+        fields = ['district_fk', 'gender', 'age_group', 'bib']
+
+    # dropdown filter -> column its facet counts group on
+    FACETS = {
+        'district_fk': 'district_fk',
+        'gender': 'gender',
+        'age_group': 'age_band',
+    }
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -65,8 +77,12 @@ class RegistrationFilter(django_filters.FilterSet):
                     qs = DistrictModel.objects.order_by('name')
                 except Exception:
                     qs = DistrictModel.objects.all()
-                # assign the queryset to the filter so the <select> is populated
+                # the queryset validates the submitted id; the <select> is
+                # populated from the cached reference data (labels pre-rendered,
+                # no per-option state lookups)
                 self.filters['district_fk'].queryset = qs
+                widget = self.form.fields['district_fk'].widget
+                widget.choices = [('', self.form.fields['district_fk'].empty_label)] + refdata.get().district_choices()
         except FieldDoesNotExist:
             # If the field isn't present, leave the queryset as empty to avoid crashing.
             # Template will still render a disabled/empty select unless you handle it there.
@@ -75,46 +91,83 @@ class RegistrationFilter(django_filters.FilterSet):
             # Any other error (safety net): leave the queryset empty but don't crash.
             self.filters['district_fk'].queryset = Registration.objects.none()
 
-    def _safe_date(self, year, month, day):
-        """Return a valid date for year/month/day; fallback to day=1 if invalid (Feb 29 handling)."""
-        try:
-            return date(year, month, day)
-        except ValueError:
-            return date(year, month, 1)
-
     def filter_age_group(self, queryset, name, value):
         """
-        Filter registrations by age group using date_of_birth ranges.
-        Excludes registrations with null date_of_birth.
+        Filter registrations by their stored age band (indexed, computed on the
+        event date). Registrations without a date_of_birth have no band.
         """
-        today = date.today()
-
-        def years_ago(n):
-            return self._safe_date(today.year - n, today.month, today.day)
-
-        qs = queryset.filter(date_of_birth__isnull=False)
-
-        if value == 'under18':
-            cutoff = years_ago(18)
-            return qs.filter(date_of_birth__gt=cutoff)
-
-        if value == '18to29':
-            upper = years_ago(18)
-            lower = years_ago(29)
-            return qs.filter(date_of_birth__range=(lower, upper))
-
-        if value == '30to45':
-            upper = years_ago(30)
-            lower = years_ago(45)
-            return qs.filter(date_of_birth__range=(lower, upper))
-
-        if value == '46to55':
-            upper = years_ago(46)
-            lower = years_ago(55)
-            return qs.filter(date_of_birth__range=(lower, upper))
-
-        if value == '56plus':
-            cutoff = years_ago(56)
-            return qs.filter(date_of_birth__lte=cutoff)
-
+        if value in dict(AGE_BAND_CHOICES):
+            return queryset.filter(age_band=value)
         return queryset
+
+    def filter_bib(self, queryset, name, value):
+        """
+        Help-desk bib lookup on the stored bib parts (all indexed):
+        digits only -> trailing number (bib_seq), otherwise public or full bib.
+        """
+        value = (value or '').strip().upper()
+        if not value:
+            return queryset
+        if value.isdigit():
+            return queryset.filter(bib_seq=int(value))
+        return queryset.filter(Q(bib_public=value) | Q(bib_id=value))
+
+    # ----- facet counts -----
+
+    def active_filters(self):
+        """Cleaned filter values; an unbound filterset (no querystring) has none."""
+        return getattr(self.form, 'cleaned_data', {}) if self.is_bound else {}
+
+    def queryset_without(self, excluded, queryset=None):
+        """`queryset` (default: the filterset's) filtered by every active filter except `excluded`."""
+        qs = self.queryset if queryset is None else queryset
+        for name, value in self.active_filters().items():
+            if name != excluded:
+                qs = self.filters[name].filter(qs, value)
+        return qs
+
+    def facet_counts(self, queryset=None):
+        """
+        {filter name: {value: registrations}} for each dropdown in FACETS,
+        counting what each choice would return combined with the other active
+        filters: one grouped query per facet over `queryset` (default: the
+        filterset's, which must not be filtered already). Cached per filter combination
+        until the next registration write (app_admin.summary_cache data
+        version), for at most BIB_LIST_COUNT_CACHE_SECONDS.
+        """
+        if self.is_bound and not self.is_valid():
+            return {}
+        timeout = getattr(settings, 'BIB_LIST_COUNT_CACHE_SECONDS', 60)
+        active = sorted(
+            (name, str(getattr(value, 'pk', value)))
+            for name, value in self.active_filters().items() if value not in (None, '')
+        )
+        source = f'{summary_cache.data_version()}|{active}'
+        key = 'bib_list_facets:' + hashlib.md5(source.encode('utf-8')).hexdigest()
+        counts = cache.get(key) if timeout > 0 else None
+        if counts is None:
+            counts = {
+                name: dict(
+                    self.queryset_without(name, queryset).order_by().values(column)
+                    .annotate(n=Count('pk')).values_list(column, 'n')
+                )
+                for name, column in self.FACETS.items()
+            }
+            if timeout > 0:
+                cache.set(key, counts, timeout)
+        return counts
+
+    def add_facet_counts(self, counts):
+        """Show each dropdown choice with the number of registrations it would return."""
+        for name, column in self.FACETS.items():
+            facet = counts.get(name)
+            if facet is None:
+                continue
+            # relabel the rendered options only: the field's own choices (which
+            # django-filter prefixes with the empty choice) still validate input
+            widget = self.form.fields[name].widget
+            options = []
+            for value, label in widget.choices:
+                key = getattr(value, 'value', value)  # ModelChoiceIteratorValue -> pk
+                options.append((key, f"{label} ({facet.get(key, 0)})" if key != '' else label))
+            widget.choices = options
@@ -0,0 +1,38 @@
+# app_bib/management/commands/run_bib_jobs.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from app_bib.models import BibJob
+
+
+class Command(BaseCommand):
+    help = "Process queued bib generation jobs in resumable chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help="Registrations per committed chunk (default 500).")
+        parser.add_argument('--once', action='store_true',
+                            help="Drain the queue once and exit instead of polling forever.")
+        parser.add_argument('--sleep', type=float, default=5.0,
+                            help="Seconds to wait between polls when the queue is empty.")
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        while True:
+            # running jobs are picked up too: a worker that died mid-job left them there
+            jobs = list(
+                BibJob.objects.filter(status__in=[BibJob.STATUS_PENDING, BibJob.STATUS_RUNNING])
+                .order_by('created_at')
+            )
+            for job in jobs:
+                self.stdout.write(f"Running {job}")
+                job.run(chunk_size=chunk_size)
+                self.stdout.write(f"  -> {job.status}: generated {job.generated}, skipped {job.skipped}")
+                if job.error:
+                    self.stderr.write(f"  error: {job.error}")
+
+            if options['once']:
+                break
+            if not jobs:
+                time.sleep(options['sleep'])
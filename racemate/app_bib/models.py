@@ -1,6 +1,13 @@
-from django.db import models
+import time
 
-class TimeEntry(models.Model):
+from django.conf import settings
+from django.db import models, transaction
+from django.http import QueryDict
+from django.utils import timezone
+
+from app_admin.models import ChangeLoggedModel
+
+class TimeEntry(ChangeLoggedModel):
     bib_id = models.CharField(max_length=50)
     lap_time = models.DurationField()
     note = models.CharField(max_length=255, blank=True)
@@ -13,3 +20,119 @@ class TimeEntry(models.Model):
 
     def __str__(self):
         return f"Bib {self.bib_id} — {self.lap_time}"
+
+
+class BibJob(models.Model):
+    """
+    A persisted "generate bibs" request for a filtered bib list.
+
+    Work happens in chunks (see run_chunk); every chunk commits its bibs and the
+    job's progress cursor together, so a killed worker or a request timeout never
+    loses finished work and the next run resumes after `last_pk`.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    querystring = models.TextField(blank=True, help_text="Bib list filters the job was submitted with.")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    generated = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    last_pk = models.BigIntegerField(default=0, help_text="Resume cursor: highest registration id handled.")
+    error = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Bib generation job"
+        verbose_name_plural = "Bib generation jobs"
+
+    def __str__(self):
+        return f"Bib job #{self.pk} ({self.status}) {self.processed}/{self.total}"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    @property
+    def percent(self):
+        if not self.total:
+            return 100 if self.is_finished else 0
+        return min(100, int(self.processed * 100 / self.total))
+
+    def candidates(self):
+        """Registrations matched by the job's filters that still have no bib."""
+        # imported here to keep app_bib.models free of import cycles
+        from accounts.models import Registration
+        from .filters import RegistrationFilter
+
+        fs = RegistrationFilter(data=QueryDict(self.querystring), queryset=Registration.objects.pending_bibs())
+        return fs.qs
+
+    def run_chunk(self, chunk_size=500):
+        """
+        Process the next `chunk_size` candidates after `last_pk`.
+        Returns True while more work may remain, False once the job is finished.
+        """
+        from accounts.models import Registration
+
+        with transaction.atomic():
+            job = BibJob.objects.select_for_update().get(pk=self.pk)
+            if job.is_finished:
+                self.__dict__.update(job.__dict__)
+                return False
+
+            if job.status == self.STATUS_PENDING:
+                job.status = self.STATUS_RUNNING
+                job.started_at = timezone.now()
+
+            chunk_pks = list(
+                job.candidates()
+                .filter(pk__gt=job.last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if chunk_pks:
+                released = Registration.release_bibs(Registration.objects.filter(pk__in=chunk_pks))
+                job.generated += len(released)
+                job.skipped += len(chunk_pks) - len(released)
+                job.processed += len(chunk_pks)
+                job.last_pk = chunk_pks[-1]
+            else:
+                job.status = self.STATUS_DONE
+                job.finished_at = timezone.now()
+            job.save()
+
+        self.__dict__.update(job.__dict__)
+        return not job.is_finished
+
+    def run(self, chunk_size=500, time_budget=None):
+        """
+        Run chunks until the job finishes or `time_budget` seconds have passed.
+        A failing chunk marks the job as failed; earlier chunks stay committed.
+        """
+        deadline = time.monotonic() + time_budget if time_budget else None
+        try:
+            while self.run_chunk(chunk_size=chunk_size):
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+        except Exception as exc:
+            BibJob.objects.filter(pk=self.pk).update(
+                status=self.STATUS_FAILED, error=str(exc), finished_at=timezone.now()
+            )
+            self.refresh_from_db()
+        return self
@@ -0,0 +1,153 @@
+# app_bib/pagination.py
+"""
+Keyset ("seek") pagination for the bib list.
+
+Instead of OFFSET n, each page continues from the last row the client saw:
+WHERE (sort_field, id) > (last_value, last_id) ORDER BY sort_field, id.
+That costs the same on page 1 and page 10,000. The position is handed back
+to the client as an opaque cursor string that also remembers the sort it
+was made for.
+
+NULL sort values (no bib yet, no district, no DOB) always sort last.
+"""
+import base64
+import hashlib
+import json
+from datetime import date
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import F, Q
+
+
+def encode_cursor(sort, value, pk, direction):
+    if isinstance(value, date):
+        value = value.isoformat()
+    raw = json.dumps({'s': sort, 'v': value, 'k': pk, 'd': direction}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, sort):
+    """
+    Return (value, pk, direction) for a cursor made for `sort`, or None if the
+    token is missing, malformed or belongs to a different sort order.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if data.get('s') != sort or data.get('d') not in ('next', 'prev'):
+            return None
+        return data.get('v'), int(data['k']), data['d']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _after(field, desc, nulls_last, value, pk):
+    """
+    Q for rows strictly after (value, pk) in ORDER BY field [DESC], pk [DESC].
+    """
+    op = 'lt' if desc else 'gt'
+    same_value_later_pk = Q(**{f'pk__{op}': pk})
+    if value is None:
+        if nulls_last:
+            return Q(**{f'{field}__isnull': True}) & same_value_later_pk
+        return Q(**{f'{field}__isnull': False}) | (Q(**{f'{field}__isnull': True}) & same_value_later_pk)
+
+    q = Q(**{f'{field}__{op}': value}) | (Q(**{field: value}) & same_value_later_pk)
+    if nulls_last:
+        q |= Q(**{f'{field}__isnull': True})
+    return q
+
+
+def _order(field, desc, nulls_last):
+    expr = F(field).desc if desc else F(field).asc
+    if nulls_last:
+        return [expr(nulls_last=True), '-pk' if desc else 'pk']
+    return [expr(nulls_first=True), '-pk' if desc else 'pk']
+
+
+class KeysetPage:
+    """
+    The slice of rows for one keyset page, with cursors for its neighbours.
+    """
+
+    def __init__(self, object_list, has_next, has_previous, next_cursor=None, prev_cursor=None):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def keyset_page(qs, sort, field, desc, cursor, per_page):
+    """
+    Fetch one page of `qs` ordered by `field` (then pk) starting at `cursor`.
+    `sort` is the public sort key the cursors are tied to.
+    """
+    position = decode_cursor(cursor, sort)
+    qs = qs.annotate(seek_value=F(field))
+
+    if position is None:
+        direction = 'next'
+        page_qs = qs.order_by(*_order(field, desc, nulls_last=True))
+    else:
+        value, pk, direction = position
+        if direction == 'next':
+            page_qs = qs.filter(_after(field, desc, True, value, pk)).order_by(*_order(field, desc, nulls_last=True))
+        else:
+            # walk backwards: flip the order (NULLs now come first), then flip the page back
+            page_qs = qs.filter(_after(field, not desc, False, value, pk)).order_by(*_order(field, not desc, nulls_last=False))
+
+    rows = list(page_qs[:per_page + 1])
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if direction == 'next':
+        has_next, has_previous = more, position is not None
+    else:
+        rows.reverse()
+        has_next, has_previous = True, more
+
+    page = KeysetPage(rows, has_next=has_next, has_previous=has_previous)
+    if rows:
+        first, last = rows[0], rows[-1]
+        if has_next:
+            page.next_cursor = encode_cursor(sort, last.seek_value, last.pk, 'next')
+        if has_previous:
+            page.prev_cursor = encode_cursor(sort, first.seek_value, first.pk, 'prev')
+    return page
+
+
+def cached_count(qs, key_source, timeout):
+    """
+    COUNT(*) of `qs`, cached for `timeout` seconds under a key derived from
+    `key_source` (the filter querystring). timeout <= 0 disables caching.
+    """
+    if timeout <= 0:
+        return qs.count()
+    key = 'bib_list_count:' + hashlib.md5(key_source.encode('utf-8')).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = qs.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that takes an already known (cached) count instead of running COUNT(*).
+    """
+
+    def __init__(self, *args, count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if count is not None:
+            # Paginator.count is a cached_property: pre-seed it
+            self.__dict__['count'] = count
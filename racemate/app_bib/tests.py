@@ -1,3 +1,84 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import Registration
+from app_bib.filters import RegistrationFilter
+from app_admin.models import DimDistrict, DimState
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        state = DimState.objects.create(name='Uttar Pradesh')
+        cls.district = DimDistrict.objects.create(state=state, name='Lucknow', code='LKO')
+        for i in range(3):
+            Registration.objects.create(
+                name=f'Runner {i}', gender='male', date_of_birth=date(1990, 1, 1 + i),
+                state=state, district_fk=cls.district,
+            )
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pw', is_staff=True)
+
+    def test_unchanged_pages_answer_304(self):
+        self.client.force_login(self.staff)
+        for name in ('app_bib:start_list', 'app_bib:registration_bib_list', 'app_results:list'):
+            with self.subTest(page=name):
+                url = reverse(name)
+                first = self.client.get(url)
+                self.assertEqual(first.status_code, 200)
+                # the first response may set the CSRF cookie, which is part of the ETag
+                etag = self.client.get(url)['ETag']
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_a_write_changes_the_etag(self):
+        self.client.force_login(self.staff)
+        url = reverse('app_bib:registration_bib_list')
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+
+        reg = Registration.objects.first()
+        reg.name = 'Renamed'
+        reg.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_anonymous_requests_still_redirect(self):
+        response = self.client.get(reverse('app_bib:registration_bib_list'), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 302)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class FacetCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        state = DimState.objects.create(name='Uttar Pradesh')
+        cls.lucknow = DimDistrict.objects.create(state=state, name='Lucknow', code='LKO')
+        cls.kanpur = DimDistrict.objects.create(state=state, name='Kanpur', code='KNP')
+        for i, (gender, district) in enumerate([('male', cls.lucknow), ('male', cls.kanpur), ('female', cls.lucknow)]):
+            Registration.objects.create(
+                name=f'Runner {i}', gender=gender, date_of_birth=date(1990, 1, 1),
+                state=state, district_fk=district,
+            )
+
+    def test_counts_without_a_querystring(self):
+        counts = RegistrationFilter(data=None, queryset=Registration.objects.all()).facet_counts()
+        self.assertEqual(counts['gender'], {'male': 2, 'female': 1})
+        self.assertEqual(counts['district_fk'], {self.lucknow.pk: 2, self.kanpur.pk: 1})
+
+    def test_each_facet_ignores_its_own_filter(self):
+        counts = RegistrationFilter(data={'gender': 'female'}, queryset=Registration.objects.all()).facet_counts()
+        self.assertEqual(counts['gender'], {'male': 2, 'female': 1})
+        self.assertEqual(counts['district_fk'], {self.lucknow.pk: 1})
+
+    def test_landing_page_shows_counts(self):
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        response = self.client.get(reverse('app_bib:registration_bib_list'))
+        self.assertContains(response, 'Lucknow (Uttar Pradesh) (2)')
+        self.assertContains(response, 'Female (1)')
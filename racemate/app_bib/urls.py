@@ -11,4 +11,5 @@ urlpatterns = [
     path('start-list/export/', views.start_list_export_csv, name='start_list_export_csv'),  # <-- new
     path('time-entry/', views.time_entry_list_create, name='time_entry'),
     path('registrations/bibs/generate-bibs/', views.generate_bibs_view, name='generate_bibs'),
+    path('registrations/bibs/jobs/<int:pk>/', views.bib_job_status, name='bib_job_status'),
 ]
@@ -34,7 +34,9 @@
 from django.db import models
 from datetime import timedelta
 
-class Participation(models.Model):
+from app_admin.models import ChangeLoggedModel
+
+class Participation(ChangeLoggedModel):
     # existing fields...
     start_entry = models.OneToOneField(
         "accounts.Registration",
@@ -195,26 +195,18 @@ from django.shortcuts import render, get_object_or_404
 from django.http import JsonResponse, HttpResponseBadRequest
 from django.views.decorators.http import require_POST
 from django.contrib.admin.views.decorators import staff_member_required
-from django.db.models import Sum
 from django.utils.dateparse import parse_datetime
 from django.apps import apps
 from datetime import timedelta
 
 from .models import Participation
+from accounts.conditional import conditional_page
+from accounts.projections import lap_model, result_rows
 
 # registration model
 Registration = apps.get_model("accounts", "Registration")
 
 
-# Try to find lap model automatically
-def find_lap_model():
-    for appcfg in apps.get_app_configs():
-        for m in appcfg.get_models():
-            if m.__name__.lower() == "lap":
-                return m
-    return None
-
-
 def _format_timedelta_for_display(td):
     """Return H:MM:SS or M:SS human readable string for a timedelta."""
     if td is None:
@@ -255,98 +247,27 @@ def _parse_mmss_to_timedelta(mmss_str):
     return None
 
 
+def results_sources():
+    sources = [(Registration.objects.all(), 'updated_at'), (Participation.objects.all(), 'updated_at')]
+    LapModel, lap_fk = lap_model()
+    if LapModel is not None:
+        # laps have no timestamp; the summed duration moves with any edit
+        sources.append((LapModel.objects.all(), Sum('duration')))
+    return sources
+
+
 @staff_member_required
+@conditional_page(results_sources)
 def results_list(request):
     """
     Render results / participation list.
 
-    Attaches safe attributes to each Registration instance so the template can
-    simply render `entry.category_display`, `entry.gender_display`, and
-    `entry.total_lap_time_display` without risking VariableDoesNotExist.
+    Rows are projected by accounts.projections.result_rows: the registration
+    and participation columns the template shows, with lap totals summed in a
+    single grouped query per chunk rather than one aggregate per entry.
+    Polls while nothing changed get 304 Not Modified (see accounts.conditional).
     """
-
-    # load registrations and prefetch/select related participation to avoid N+1
-    entries_qs = Registration.objects.all().select_related("participation")
-
-    LapModel = find_lap_model()
-
-    # evaluate into list so we can attach attributes safely
-    entries = list(entries_qs)
-
-    for e in entries:
-        # --- compute total_lap_time (timedelta) if LapModel exists ---
-        e.total_lap_time = None
-        if LapModel:
-            try:
-                # prefer relationships named 'registration' or 'start_entry'
-                if hasattr(LapModel, 'registration'):
-                    agg = LapModel.objects.filter(registration=e).aggregate(total=Sum('duration'))
-                    e.total_lap_time = agg.get('total')
-                elif hasattr(LapModel, 'start_entry'):
-                    agg = LapModel.objects.filter(start_entry=e).aggregate(total=Sum('duration'))
-                    e.total_lap_time = agg.get('total')
-            except Exception:
-                e.total_lap_time = None
-
-        # fallback to participation value if aggregate is empty
-        try:
-            if (not e.total_lap_time) and getattr(e, "participation", None):
-                e.total_lap_time = getattr(e.participation, "total_lap_time", None)
-        except Exception:
-            pass
-
-        # Attach display string for lap time
-        try:
-            e.total_lap_time_display = _format_timedelta_for_display(e.total_lap_time)
-        except Exception:
-            e.total_lap_time_display = None
-
-        # --- compute category_display robustly ---
-        display_cat = '—'
-        try:
-            part = getattr(e, 'participation', None)
-            if part:
-                ag = getattr(part, 'age_group', None)
-                if ag:
-                    display_cat = ag
-                    e.category_display = display_cat
-                    # ensure participation remains attached
-                    e.participation = part
-                    # continue to next entry
-                    continue
-        except Exception:
-            # ignore and fall back
-            pass
-
-        try:
-            cat = getattr(e, 'category', None)
-            if cat:
-                display_cat = cat
-                e.category_display = display_cat
-                continue
-        except Exception:
-            pass
-
-        try:
-            age_cat = getattr(e, 'age_category', None)
-            if age_cat:
-                display_cat = age_cat
-                e.category_display = display_cat
-                continue
-        except Exception:
-            pass
-
-        e.category_display = display_cat
-
-        # --- compute gender_display safely ---
-        try:
-            gfunc = getattr(e, 'get_gender_display', None)
-            if callable(gfunc):
-                e.gender_display = gfunc()
-            else:
-                e.gender_display = getattr(e, 'gender', '') or ''
-        except Exception:
-            e.gender_display = getattr(e, 'gender', '') or ''
+    entries = list(result_rows())
 
     # render
     return render(request, "app_results/results_list.html", {"entries": entries})
@@ -110,6 +110,7 @@
 
 
 # racemate/settings.py
+from datetime import date
 from pathlib import Path
 import os,re
 
@@ -213,6 +214,23 @@ DATABASES = {
     }
 }
 
+# Cache shared by every process: the data-version counters that invalidate
+# cached analysis summaries, facet counts and reference data live here, so a
+# per-process cache would let other instances serve stale results. The default
+# is the database cache (table created by `createcachetable`, which build.sh and
+# app_admin's 0011 migration run). CACHE_BACKEND=locmem gives a per-process
+# cache for single-process development.
+if os.environ.get("CACHE_BACKEND", "database").lower() == "locmem":
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'racemate_cache',
+            'OPTIONS': {'MAX_ENTRIES': int(os.environ.get("CACHE_MAX_ENTRIES", "5000"))},
+        }
+    }
+
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
     'allauth.account.auth_backends.AuthenticationBackend',
@@ -231,6 +249,85 @@ ACCOUNT_SESSION_REMEMBER = True
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'webmaster@localhost'
 
+# Outbox (accounts.OutboundEmail) delivery limits for the send_outbox command
+EMAIL_OUTBOX_RATE_PER_SECOND = float(os.environ.get("EMAIL_OUTBOX_RATE_PER_SECOND", "10"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+# Without a send_outbox worker (Vercel), the outbox is drained over HTTP: Vercel
+# Cron (see vercel.json) GETs /accounts/cron/send-outbox/ with
+# "Authorization: Bearer $CRON_SECRET", and staff can POST to the same URL.
+# Each call sends at most one batch of EMAIL_OUTBOX_REQUEST_BATCH_SIZE, so it
+# stays inside the function time limit at EMAIL_OUTBOX_RATE_PER_SECOND.
+CRON_SECRET = os.environ.get("CRON_SECRET", "")
+EMAIL_OUTBOX_REQUEST_BATCH_SIZE = int(os.environ.get("EMAIL_OUTBOX_REQUEST_BATCH_SIZE", "50"))
+
+# Race day (YYYY-MM-DD). Categories and stored age bands are computed as of this
+# date; unset means "today" (then run refresh_age_bands and recategorize daily).
+EVENT_DATE = date.fromisoformat(os.environ["EVENT_DATE"]) if os.environ.get("EVENT_DATE") else None
+
+# Analysis dashboard: answer the summary API from the incrementally maintained
+# RegistrationRollup table (rebuild with `manage.py rebuild_rollups`).
+ANALYSIS_USE_ROLLUP = os.environ.get("ANALYSIS_USE_ROLLUP", "True").lower() in ("1", "true", "yes")
+# Cached summary responses are invalidated by registration writes; this only
+# bounds how long unused entries occupy the cache.
+ANALYSIS_SUMMARY_CACHE_SECONDS = int(os.environ.get("ANALYSIS_SUMMARY_CACHE_SECONDS", "86400"))
+# Ad-hoc pivots (api/analysis/pivot/) read an in-process columnar snapshot of
+# the registrations; it picks up new and changed rows at most this often.
+# Pivots are vectorized with numpy (in requirements.txt; without it they fall
+# back to pure Python).
+ANALYSIS_SNAPSHOT_REFRESH_SECONDS = int(os.environ.get("ANALYSIS_SNAPSHOT_REFRESH_SECONDS", "10"))
+
+# Duplicate detection (Registration.mobile_normalized / aadhar_hash): country code
+# assumed for bare 10-digit mobiles, the key Aadhaar numbers are hashed with
+# (after changing it run `dedupe_report --rebuild-keys`), and how many duplicate
+# checks one client may make per minute on the public register form.
+PHONE_DEFAULT_COUNTRY_CODE = os.environ.get("PHONE_DEFAULT_COUNTRY_CODE", "91")
+AADHAAR_HASH_KEY = os.environ.get("AADHAAR_HASH_KEY") or SECRET_KEY
+DUPLICATE_CHECK_RATE_PER_MINUTE = int(os.environ.get("DUPLICATE_CHECK_RATE_PER_MINUTE", "30"))
+# Reverse proxies in front of the app that append the client address to
+# X-Forwarded-For (Vercel's edge is one). Throttles key on the entry the outermost
+# of them added; 0 means use REMOTE_ADDR and ignore the header.
+TRUSTED_PROXY_COUNT = int(os.environ.get("TRUSTED_PROXY_COUNT", "1" if os.environ.get("VERCEL") else "0"))
+
+# Change feed (app_admin api/changes/): seq is allocated at insert, not at
+# commit, so a transaction still open when a client polls can commit a seq
+# below the cursor it was just given. The feed only serves entries older than
+# this many seconds (and stops before any newer one); keep it above the longest
+# write transaction.
+CHANGE_FEED_SETTLE_SECONDS = int(os.environ.get("CHANGE_FEED_SETTLE_SECONDS", "5"))
+
+# Compiled category rulebooks (app_admin.CategoryRule) are cached per process;
+# other processes see rule edits after this many seconds.
+CATEGORY_RULES_CACHE_SECONDS = int(os.environ.get("CATEGORY_RULES_CACHE_SECONDS", "300"))
+# Reference data (app_admin.refdata: state, district and event labels/choices)
+# is cached per process; each process re-reads its version counter from the
+# cache at most this often, so other processes see admin edits within it.
+REFERENCE_DATA_CHECK_SECONDS = int(os.environ.get("REFERENCE_DATA_CHECK_SECONDS", "5"))
+
+# Bibs: issue a bib as soon as the public registration form is saved.
+# Numbers are leased per worker in blocks of BIB_HILO_BLOCK_SIZE; a block's unused
+# numbers are lost when the worker exits. Serverless instances (Vercel sets VERCEL)
+# start cold all the time and the counter stops at 9999, so they lease one at a time.
+BIB_ISSUE_ON_REGISTER = os.environ.get("BIB_ISSUE_ON_REGISTER", "True").lower() in ("1", "true", "yes")
+BIB_HILO_BLOCK_SIZE = int(os.environ.get("BIB_HILO_BLOCK_SIZE", "1" if os.environ.get("VERCEL") else "20"))
+# Bib generation jobs: chunk size, and whether the progress poll may run a chunk
+# itself (needed on Vercel, where no run_bib_jobs worker is running).
+BIB_JOB_CHUNK_SIZE = int(os.environ.get("BIB_JOB_CHUNK_SIZE", "500"))
+BIB_JOB_RUN_ON_POLL = os.environ.get("BIB_JOB_RUN_ON_POLL", "True").lower() in ("1", "true", "yes")
+
+# Bib list paging: cursor (keyset) pagination instead of ?page=N, and how long
+# the filtered row count is cached (0 = count on every request).
+BIB_LIST_KEYSET_PAGINATION = os.environ.get("BIB_LIST_KEYSET_PAGINATION", "True").lower() in ("1", "true", "yes")
+BIB_LIST_COUNT_CACHE_SECONDS = int(os.environ.get("BIB_LIST_COUNT_CACHE_SECONDS", "60"))
+
+# Start list, bib list and results answer repeat polls with 304 Not Modified
+# while the underlying tables are unchanged (accounts.conditional).
+LIST_CONDITIONAL_GET = os.environ.get("LIST_CONDITIONAL_GET", "True").lower() in ("1", "true", "yes")
+
+# Background CSV exports (app_admin.exports): rows per id-range part, and whether
+# the status poll may build a part itself when no run_export_jobs worker runs.
+EXPORT_ROWS_PER_PART = int(os.environ.get("EXPORT_ROWS_PER_PART", "20000"))
+EXPORT_JOB_RUN_ON_POLL = os.environ.get("EXPORT_JOB_RUN_ON_POLL", "True").lower() in ("1", "true", "yes")
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',},